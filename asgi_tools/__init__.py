@@ -48,8 +48,10 @@ from .response import (  # noqa
 )
 from .middleware import (  # noqa
     RequestMiddleware, ResponseMiddleware, LifespanMiddleware,
-    RouterMiddleware, StaticFilesMiddleware
+    RouterMiddleware, StaticFilesMiddleware, CompressionMiddleware
 )
 from .app import App, HTTPView  # noqa
+from .broadcast import Broadcast  # noqa
+from .connections import WebSocketManager  # noqa
 
 from http_router import NotFound, MethodNotAllowed  # noqa
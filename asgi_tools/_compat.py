@@ -2,6 +2,7 @@
 
 import asyncio
 import inspect
+import math
 import sys
 import typing as t
 from pathlib import Path
@@ -27,10 +28,10 @@ except ImportError:
             """Emulate orjson."""
             return dumps(content, ensure_ascii=False, separators=(',', ':')).encode('utf-8')  # type: ignore # noqa
 
-    def json_loads(obj: t.Union[bytes, str]) -> t.Any:  # type: ignore
+    def json_loads(obj: t.Union[bytes, bytearray, memoryview, str]) -> t.Any:  # type: ignore
         """Emulate orjson."""
-        if isinstance(obj, bytes):
-            obj = obj.decode('utf-8')
+        if not isinstance(obj, str):
+            obj = str(obj, 'utf-8')
         return loads(obj)
 
 
@@ -43,12 +44,26 @@ else:
     create_task = asyncio.ensure_future
 
 
+# Python 3.11+
+asyncio_timeout = getattr(asyncio, 'timeout', None)
+
+
+# Python 3.9, 3.10 tell the watcher's cancellations by the message (3.11+ count them)
+WATCH_CANCEL: t.Tuple[str, ...] = ('aio_watch',) if (3, 9) <= sys.version_info < (3, 11) else ()
+
+
 try:
     import aiofile
 except ImportError:
     aiofile = None
 
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
 try:
     import trio
 
@@ -134,6 +149,48 @@ async def aio_wait(*aws: t.Awaitable, strategy: str = ALL_COMPLETED) -> t.Any:
     return [t.result() for t in done]
 
 
+async def aio_timeout(timeout: float, fn: t.Callable[..., t.Awaitable], *args) -> t.Any:
+    """Call the given coroutine function, raise TimeoutError when it takes too long."""
+    if trio and current_async_library() == 'trio':
+        with trio.move_on_after(timeout):
+            return await fn(*args)
+        raise TimeoutError
+
+    if curio and current_async_library() == 'curio':
+        try:
+            return await curio.timeout_after(timeout, fn, *args)
+        except curio.TaskTimeout:
+            raise TimeoutError
+
+    try:
+        return await asyncio_deadline(timeout, fn, *args)
+    except asyncio.TimeoutError:
+        raise TimeoutError
+
+
+async def aio_watch(aw: t.Awaitable, watcher: t.Callable[..., t.Awaitable], *args) -> bool:
+    """Await the given awaitable in the current task, cancel it when the watcher completes.
+
+    Return True if the awaitable has been completed, False when it has been cancelled.
+    """
+    if trio and current_async_library() == 'trio':
+        return await trio_watch(aw, watcher, *args)
+
+    # Curio doesn't support cancel scopes
+    if curio and current_async_library() == 'curio':
+        async def curio_watcher():
+            await watcher(*args)
+            return False
+
+        async def curio_main():
+            await aw
+            return True
+
+        return await aio_wait(curio_main(), curio_watcher(), strategy=FIRST_COMPLETED)
+
+    return await asyncio_watch(aw, watcher, *args)
+
+
 async def aio_cancel(task: t.Union[asyncio.Task, t.Any]):
     """Cancel asyncio task / trio nursery."""
     if isinstance(task, asyncio.Task):
@@ -146,22 +203,57 @@ async def aio_cancel(task: t.Union[asyncio.Task, t.Any]):
         return await task.cancel()
 
 
-async def aio_stream_file(filepath: t.Union[str, Path], chunk_size: int = 32 * 1024) -> t.AsyncGenerator[bytes, None]:  # noqa
+def aio_channel(maxsize: int = 0) -> t.Tuple[t.Callable[[], t.Awaitable], t.Callable[[t.Any], t.Awaitable]]:  # noqa
+    """Create a notification-based channel and return its (receive, send) coroutines.
+
+    The channel is unbounded by default, with a given maxsize senders wait for free space.
+    """
+    if trio and current_async_library() == 'trio':
+        send_channel, receive_channel = trio.open_memory_channel(maxsize or math.inf)
+        return receive_channel.receive, send_channel.send
+
+    if curio and current_async_library() == 'curio':
+        queue = curio.Queue(maxsize)
+        return queue.get, queue.put
+
+    queue = asyncio.Queue(maxsize)  # type: ignore
+    return queue.get, queue.put  # type: ignore
+
+
+async def aio_run_in_thread(fn: t.Callable, *args) -> t.Any:
+    """Run the given sync function in a worker thread."""
+    if trio and current_async_library() == 'trio':
+        return await trio.to_thread.run_sync(fn, *args)
+
+    if curio and current_async_library() == 'curio':
+        return await curio.run_in_thread(fn, *args)
+
+    return await asyncio.get_event_loop().run_in_executor(None, fn, *args)
+
+
+async def aio_stream_file(filepath: t.Union[str, Path], chunk_size: int = 32 * 1024, offset: int = 0, length: int = None) -> t.AsyncGenerator[bytes, None]:  # noqa
+    """Stream the given file (or its part, when an offset/length is given) by chunks."""
 
     if trio and current_async_library() == 'trio':
         async with await trio.open_file(filepath, 'rb') as fp:
+            await fp.seek(offset)
             while True:
-                chunk = await fp.read(chunk_size)
+                chunk = await fp.read(chunk_size if length is None else min(chunk_size, length))
                 if not chunk:
                     break
+                if length is not None:
+                    length -= len(chunk)
                 yield chunk
 
     elif curio and current_async_library() == 'curio':
         async with curio.aopen(filepath, 'rb') as fp:
+            await fp.seek(offset)
             while True:
-                chunk = await fp.read(chunk_size)
+                chunk = await fp.read(chunk_size if length is None else min(chunk_size, length))
                 if not chunk:
                     break
+                if length is not None:
+                    length -= len(chunk)
                 yield chunk
 
     else:
@@ -169,10 +261,112 @@ async def aio_stream_file(filepath: t.Union[str, Path], chunk_size: int = 32 * 1
             raise RuntimeError('`aiofile` is required to return files with asyncio')
 
         async with aiofile.AIOFile(filepath, mode='rb') as fp:
-            async for chunk in aiofile.Reader(fp, chunk_size=chunk_size):
+            while True:
+                size = chunk_size if length is None else min(chunk_size, length)
+                chunk = await fp.read(size, offset)
+                if not chunk:
+                    break
+                offset += len(chunk)
+                if length is not None:
+                    length -= len(chunk)
                 yield chunk
 
 
 async def trio_jockey(coro: t.Awaitable, channel):
     """Wait for the given coroutine and send result back to the given channel."""
     await channel.send(await coro)
+
+
+async def trio_watch(aw: t.Awaitable, watcher: t.Callable[..., t.Awaitable], *args) -> bool:
+    """Await the given awaitable in the current trio task, cancel it when the watcher completes."""
+    completed = True
+
+    async def trio_watcher(scope):
+        nonlocal completed
+        await watcher(*args)
+        completed = False
+        scope.cancel()
+
+    async with trio.open_nursery() as nursery:
+        nursery.start_soon(trio_watcher, nursery.cancel_scope)
+        await aw
+        nursery.cancel_scope.cancel()
+
+    return completed
+
+
+async def asyncio_watch(aw: t.Awaitable, watcher: t.Callable[..., t.Awaitable], *args) -> bool:
+    """Await the given awaitable in the current asyncio task, cancel it when the watcher completes."""  # noqa
+    task = asyncio.current_task()
+    state = {'finished': False, 'cancelled': False}
+
+    def on_done(fut: asyncio.Future):
+        if not (state['finished'] or fut.cancelled()):
+            state['cancelled'] = True
+            task.cancel(*WATCH_CANCEL)  # type: ignore
+
+    watcher_task: asyncio.Future = asyncio.ensure_future(watcher(*args))
+    watcher_task.add_done_callback(on_done)
+    try:
+        await aw
+        return True
+
+    except asyncio.CancelledError as exc:
+        # Outer cancellations (even coinciding with the watcher's one) are propagated
+        if not (state['cancelled'] and watcher_task.done()) or cancelled_outside(task, exc):
+            raise
+
+        error = watcher_task.exception()
+        if error:
+            raise error
+
+        return False
+
+    finally:
+        state['finished'] = True
+        watcher_task.cancel()
+
+
+def cancelled_outside(task: t.Any, exc: asyncio.CancelledError) -> bool:
+    """Withdraw the watcher's cancellation, check whether the task is cancelled by others."""
+    # Python 3.11+
+    uncancel = getattr(task, 'uncancel', None)
+    if uncancel:
+        return uncancel() > 0
+
+    # Python 3.9, 3.10 (the first cancellation's message is delivered)
+    return bool(WATCH_CANCEL) and exc.args != WATCH_CANCEL
+
+
+async def asyncio_deadline(timeout: float, fn: t.Callable[..., t.Awaitable], *args) -> t.Any:
+    """Call the given coroutine function in the current asyncio task with a timeout.
+
+    The current task is cancelled on the deadline (asyncio.wait_for spawns a task per call
+    before Python 3.12).
+    """
+    task = asyncio.current_task()
+
+    # Custom tasks (e.g. test runners' ones) may not support the cancellations by timers
+    if not isinstance(task, asyncio.Task):
+        return await asyncio.wait_for(fn(*args), timeout)
+
+    # Python 3.11+
+    if asyncio_timeout is not None:
+        async with asyncio_timeout(timeout):
+            return await fn(*args)
+
+    expired = []
+
+    def expire():
+        expired.append(True)
+        task.cancel()
+
+    handle = asyncio.get_event_loop().call_later(timeout, expire)
+    try:
+        return await fn(*args)
+    except asyncio.CancelledError:
+        if expired:
+            raise TimeoutError
+        raise
+    finally:
+        handle.cancel()
@@ -3,7 +3,8 @@
 import inspect
 import logging
 import typing as t
-from functools import partial
+from collections import OrderedDict
+from functools import partial, update_wrapper
 
 from http_router import Router as HTTPRouter, PrefixedRoute
 from http_router.typing import TYPE_METHODS
@@ -18,19 +19,97 @@ from .middleware import (
 from .request import Request
 from .response import ResponseError, Response
 from .utils import to_awaitable, iscoroutinefunction
-from .typing import Scope, Receive, Send, F
+from .typing import Scope, Receive, Send, F, ASGIApp
 
 
 HTTP_METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'DELETE', 'CONNECT', 'OPTIONS', 'TRACE', 'PATCH'}
 
 
+class RouteCache:
+    """A bounded LRU cache of the router's results.
+
+    Not found/method not allowed results are kept separately with a lower size limit, so scans
+    over random paths don't evict the matched routes.
+
+    :param maxsize: Max number of the matched routes to keep (0 disables the cache)
+    :param negative_maxsize: Max number of the failed lookups to keep (maxsize / 4 by default)
+
+    """
+
+    __slots__ = 'maxsize', 'negative_maxsize', 'matches', 'negatives', 'hits', 'misses'
+
+    def __init__(self, maxsize: int = 1024, negative_maxsize: int = None):
+        """Initialize the cache."""
+        self.maxsize = maxsize
+        self.negative_maxsize = maxsize // 4 if negative_maxsize is None else negative_maxsize
+        self.matches: OrderedDict = OrderedDict()
+        self.negatives: OrderedDict = OrderedDict()
+        self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        """Get a number of the cached results."""
+        return len(self.matches) + len(self.negatives)
+
+    def get(self, key: t.Hashable) -> t.Any:
+        """Get a cached result (a route match or a router's exception class)."""
+        for storage in (self.matches, self.negatives):
+            value = storage.get(key)
+            if value is not None:
+                storage.move_to_end(key)
+                self.hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    def set(self, key: t.Hashable, value: t.Any):
+        """Cache the given result."""
+        if isinstance(value, type):
+            storage, maxsize = self.negatives, self.negative_maxsize
+        else:
+            storage, maxsize = self.matches, self.maxsize
+
+        if maxsize > 0:
+            storage[key] = value
+            if len(storage) > maxsize:
+                storage.popitem(last=False)
+
+    def clear(self):
+        """Drop the cached results."""
+        self.matches.clear()
+        self.negatives.clear()
+
+
 class Router(HTTPRouter):
-    """Rebind router errors."""
+    """Rebind router errors, invalidate the cache when routes are changed."""
 
     NotFound: t.ClassVar[t.Type[Exception]] = ASGINotFound
     RouterError: t.ClassVar[t.Type[Exception]] = ASGIError
     MethodNotAllowed: t.ClassVar[t.Type[Exception]] = ASGIMethodNotAllowed
 
+    def __init__(self, *args, cache_size: int = 1024, **kwargs):
+        """Initialize the router's cache."""
+        super(Router, self).__init__(*args, **kwargs)
+        self.cache = RouteCache(cache_size)
+
+    def __route__(self, root: HTTPRouter, *args, **kwargs):
+        """Bind self as a nested router."""
+        invalidate_cache(root)
+        return super(Router, self).__route__(root, *args, **kwargs)
+
+    def bind(self, target: t.Any, *args, max_body_size: int = None, **kwargs):
+        """Bind a target and clear the cache.
+
+        :param max_body_size: Max size of the requests' bodies for the route (see
+                              :py:meth:`Request.stream`)
+
+        """
+        invalidate_cache(self)
+        if max_body_size is not None:
+            target = limit_body_size(target, max_body_size)
+
+        return super(Router, self).bind(target, *args, **kwargs)
+
 
 class HTTPView:
     """Class-based view pattern for handling HTTP method dispatching.
@@ -78,6 +157,14 @@ class HTTPView:
         return method(request, **opts)
 
 
+def find_route(router: Router, path: str, method: str) -> t.Any:
+    """Find a route's match, return the routing error's type if it's not found."""
+    try:
+        return router(path, method)
+    except (ASGINotFound, ASGIMethodNotAllowed) as exc:
+        return type(exc)
+
+
 class AppInternalMiddleware(BaseMiddeware):
     """Process responses."""
 
@@ -116,6 +203,19 @@ class App:
     :param trim_last_slash: Consider "/path" and "/path/" as the same
     :type trim_last_slash: bool, False
 
+    :param route_cache_size: Max number of the router's results to cache (0 disables the cache)
+    :type route_cache_size: int, 1024
+
+    :param compile_pipeline: Compile the registered middlewares into a dispatcher per scope type
+                             when the app starts (see :meth:`App.compile`)
+    :type compile_pipeline: bool, False
+
+    :param max_body_size: Reject requests with bodies bigger than the size in bytes
+                          (413 Request Entity Too Large). Could be overridden for a route with
+                          `app.route('/upload', max_body_size=...)`. A mounted application
+                          applies its own limit to its routes.
+    :type max_body_size: int, 0 (unlimited)
+
     """
 
     exception_handlers: t.Dict[
@@ -126,7 +226,9 @@ class App:
     def __init__(self, *, debug: bool = False,
                  logger: logging.Logger = asgi_logger,
                  static_url_prefix: str = '/static',
-                 static_folders: t.Union[str, t.List[str]] = None, trim_last_slash: bool = False):
+                 static_folders: t.Union[str, t.List[str]] = None, trim_last_slash: bool = False,
+                 route_cache_size: int = 1024, compile_pipeline: bool = False,
+                 max_body_size: int = 0):
         """Initialize router and lifespan middleware."""
 
         # Register base exception handlers
@@ -134,23 +236,33 @@ class App:
 
         # Setup routing
         self.router = router = Router(
-            trim_last_slash=trim_last_slash, validator=callable, converter=to_awaitable)
+            trim_last_slash=trim_last_slash, validator=callable, converter=to_awaitable,
+            cache_size=route_cache_size)
+        get_cached, set_cached = router.cache.get, router.cache.set
 
         # Setup logging
         self.logger = logger
 
+        # Limit requests' bodies
+        self.max_body_size = max_body_size
+
         async def process(request: Request, receive: Receive, send: Send) -> t.Optional[Response]:
             """Find and call a callback, parse a response, handle exceptions."""
             scope = request.scope
-            path = f"{ scope.get('root_path', '') }{ scope['path'] }"
-            try:
-                match = router(path, scope.get('method', 'GET'))
-            except ASGINotFound:
+            key = root_path, path, method = (
+                scope.get('root_path', ''), scope['path'], scope.get('method', 'GET'))
+            match = get_cached(key)
+            if match is None:
+                match = find_route(router, f"{ root_path }{ path }", method)
+                set_cached(key, match)
+
+            if match is ASGINotFound:
                 raise ResponseError.NOT_FOUND()
-            except ASGIMethodNotAllowed:
+
+            if match is ASGIMethodNotAllowed:
                 raise ResponseError.METHOD_NOT_ALLOWED()
 
-            scope['path_params'] = {} if match.params is None else match.params
+            scope['path_params'] = {} if match.params is None else dict(match.params)
             response = await match.target(request)  # type: ignore
             if response is None and request['type'] == 'websocket':
                 return None
@@ -164,6 +276,14 @@ class App:
         self.lifespan = LifespanMiddleware(
             self.__internal__, ignore_errors=not debug, logger=self.logger)
 
+        # Setup middlewares
+        self.internal_middlewares: t.List = []
+        self.classic_middlewares: t.List[ASGIApp] = []
+        self.compile_pipeline = compile_pipeline
+        self.__dispatch__: t.Optional[ASGIApp] = None
+        if compile_pipeline:
+            self.on_startup(self.compile)
+
         # Enable middleware for static files
         if static_folders and static_url_prefix:
             md = StaticFilesMiddleware.setup(folders=static_folders, url_prefix=static_url_prefix)
@@ -181,8 +301,6 @@ class App:
 
             self.exception_handlers[Exception] = handle_unknown_exception
 
-        self.internal_middlewares: t.List = []
-
     def __route__(self, router: Router, *prefixes: str, methods: TYPE_METHODS = None, **params):
         """Mount self as a nested application."""
         def target(request):
@@ -191,12 +309,26 @@ class App:
         for prefix in prefixes:
             route = RouteApp(prefix, set(), target=self)
             router.dynamic.insert(0, route)
+
+        invalidate_cache(router)
         return self
 
+    @property
+    def route_cache(self) -> RouteCache:
+        """The router's cache (see :class:`RouteCache` hits/misses counters)."""
+        return self.router.cache
+
     async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """Convert the given scope into a request and process."""
+        if self.compile_pipeline:
+            dispatch = self.__dispatch__ or self.compile()
+            return await dispatch(scope, receive, send)
+
         scope['app'] = self
         request = Request(scope, receive, send)
+        if self.max_body_size:
+            request.max_body_size = self.max_body_size
+
         try:
             await self.lifespan(request, receive, send)
         except BaseException as exc:  # Handle exceptions
@@ -228,17 +360,102 @@ class App:
                 else:
                     self.internal_middlewares.append(md)
 
-            app = self.__process__
-            for md in reversed(self.internal_middlewares):
-                app = partial(md, app)
-
-            self.__internal__.bind(app)
+            self.__internal__.bind(self.__chain__())
 
         else:
-            self.lifespan.bind(md(self.lifespan.app))
+            # Keep the layers to reuse them when the pipeline is compiled
+            layer = md(self.lifespan.app)
+            self.classic_middlewares.append(layer)
+            self.lifespan.bind(layer)
 
+        self.__dispatch__ = None
         return md
 
+    def __chain__(self) -> t.Callable[..., t.Awaitable]:
+        """Chain the internal middlewares."""
+        app = self.__process__
+        for md in reversed(self.internal_middlewares):
+            app = partial(md, app)
+
+        return app
+
+    def compile(self) -> ASGIApp:
+        """Compile the registered middlewares into a single dispatch function.
+
+        The dispatch function calls the handler of the scope's type directly: lifespan scopes
+        go to the lifespan middleware, the others start from the outermost middleware which
+        processes them. The :class:`~asgi_tools.middleware.BaseMiddeware` layers are linked
+        to the next layer's `__process__` when it's the same for every scope type, so their
+        `scope['type'] in self.scopes` checks are skipped. A layer is linked to the next one
+        as is when the scope types go different ways (the next layer checks them). Custom
+        layers (with their own `__call__`) are called as is.
+
+        The registered middlewares are reused, they are not initialized again. Only the known
+        scope types (http, websocket, lifespan and the middlewares' ones) are supported.
+
+        The method is called on the app's startup when `compile_pipeline` is enabled and after
+        any middleware has been registered later.
+        """
+        internal = self.__chain__()
+
+        async def http(request: Request, receive: Receive, send: Send):
+            response = await internal(request, receive, send)
+            await response(request, receive, send)
+
+        stypes = {'http', 'websocket'}
+        for layer in self.classic_middlewares:
+            stypes.update(getattr(layer, 'scopes', ()))
+        stypes.discard('lifespan')
+
+        handlers: t.Dict[str, t.Callable[..., t.Awaitable]] = {
+            stype: http if stype == 'http' else internal for stype in stypes}
+        default = self.link_layers(handlers, internal)
+        handlers['lifespan'] = self.lifespan.__process__
+        get_handler = handlers.get
+        handle_exc = self.handle_exc
+        max_body_size = self.max_body_size
+
+        async def dispatch(scope: Scope, receive: Receive, send: Send):
+            scope['app'] = self
+            request = Request(scope, receive, send)
+            if max_body_size:
+                request.max_body_size = max_body_size
+
+            try:
+                await get_handler(scope['type'], default)(request, receive, send)
+            except BaseException as exc:  # Handle exceptions
+                response = await handle_exc(request, exc)
+                if response is ...:
+                    raise
+
+                await parse_response(response)(scope, receive, send)
+
+        self.__dispatch__ = dispatch
+        return dispatch
+
+    def link_layers(self, handlers: t.Dict[str, t.Callable[..., t.Awaitable]],
+                    default: t.Callable[..., t.Awaitable]) -> t.Callable[..., t.Awaitable]:
+        """Link the classic middlewares from the innermost one, update the given handlers.
+
+        Return the handler for the unknown scope types.
+        """
+        link: ASGIApp = self.__internal__
+        for layer in self.classic_middlewares:
+            if not isinstance(layer, BaseMiddeware) or \
+                    type(layer).__call__ is not BaseMiddeware.__call__:
+                handlers.update(dict.fromkeys(handlers, layer))
+                default = link = layer
+                continue
+
+            # Skip the next layer's check when every scope type goes the same way
+            hops = set(handlers.values())
+            layer.bind(hops.pop() if len(hops) == 1 else link)
+            for stype in layer.scopes & handlers.keys():
+                handlers[stype] = layer.__process__
+            link = layer
+
+        return default
+
     def route(self, *args, **kwargs) -> t.Callable:
         """Register a route."""
         return self.router.route(*args, **kwargs)
@@ -281,8 +498,35 @@ class RouteApp(PrefixedRoute):
 
         def app(request: Request):
             subrequest = request.__copy__(path=request.path[len(path):])
+            if target.max_body_size:
+                subrequest.max_body_size = target.max_body_size
+
             receive = t.cast(Receive, request.receive)
             send = t.cast(Send, request.send)
             return target.__internal__.app(subrequest, receive, send)
 
         super(RouteApp, self).__init__(path, methods, app)
+
+
+def limit_body_size(target: t.Callable, max_body_size: int) -> t.Callable:
+    """Set the max body size for the target's requests.
+
+    The original target is available as the wrapper's `__wrapped__` attribute.
+    """
+
+    def limited(request: Request, *args, **opts):
+        request.max_body_size = max_body_size
+        return target(request, *args, **opts)
+
+    return update_wrapper(limited, target, updated=())
+
+
+def invalidate_cache(router: HTTPRouter):
+    """Clear the given router's caches."""
+    if isinstance(router, Router):
+        router.cache.clear()
+
+    # Some versions of http-router cache matches with lru_cache
+    cache_clear = getattr(router.match, 'cache_clear', None)
+    if cache_clear is not None:
+        cache_clear()
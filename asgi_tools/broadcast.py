@@ -0,0 +1,245 @@
+"""Publish events to many SSE/Websocket subscribers."""
+
+from __future__ import annotations
+
+import typing as t
+from collections import deque
+
+from ._compat import aio_channel, aio_watch
+from .response import (
+    ResponseSSE, ResponseWebSocket, encode_sse_event, encode_websocket_msg)
+from .typing import Receive, Scope, Send
+
+
+# Event encoders by subscription formats
+FORMATS: t.Dict[str, t.Callable[[t.Any], t.Any]] = {
+    'raw': lambda event: event,
+    'sse': encode_sse_event,
+    'websocket': encode_websocket_msg,
+}
+
+# Policies for subscribers which queues are full
+OVERFLOW = ('drop', 'disconnect')
+
+
+class Subscription:
+    """A subscriber's bounded queue of encoded events (an async iterator).
+
+    :param broadcast: The subscription's broadcast
+    :param topics: Subscribe to the topics (every event when empty)
+    :param format: Encode events to the format (raw, sse, websocket)
+    :param queue_size: Max number of pending events
+    :param overflow: What to do when the queue is full: drop the oldest events or disconnect
+    """
+
+    __slots__ = ('broadcast', 'topics', 'format', 'queue_size', 'overflow', 'queue', 'dropped',
+                 'closed', 'waiting', '_channel')
+
+    def __init__(self, broadcast: Broadcast, topics: t.Tuple[str, ...], format: str = 'raw',
+                 queue_size: int = 100, overflow: str = 'drop'):
+        """Initialize the subscription."""
+        assert format in FORMATS, f"Unsupported format: {format}"
+        assert overflow in OVERFLOW, f"Unsupported overflow policy: {overflow}"
+        self.broadcast = broadcast
+        self.topics = topics
+        self.format = format
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.queue: t.Deque = deque()
+        self.dropped = 0
+        self.closed = False
+        self.waiting = False
+        self._channel: t.Optional[t.Tuple[t.Callable, t.Callable]] = None
+
+    def __aiter__(self) -> Subscription:
+        """Iterate over the events."""
+        return self
+
+    async def __anext__(self) -> t.Any:
+        """Wait for the next event."""
+        queue = self.queue
+        while not queue:
+            if self.closed:
+                raise StopAsyncIteration
+
+            if self._channel is None:
+                self._channel = aio_channel()
+
+            self.waiting = True
+            await self._channel[0]()
+
+        return queue.popleft()
+
+    def push(self, event: t.Any) -> bool:
+        """Put the encoded event into the queue, return True if the subscriber has to be woken."""
+        if self.closed:
+            return False
+
+        queue = self.queue
+        if len(queue) >= self.queue_size:
+            self.dropped += 1
+            if self.overflow == 'disconnect':
+                # Nobody waits for the full queue
+                queue.clear()
+                self.detach()
+                return False
+
+            queue.popleft()
+
+        queue.append(event)
+        return self.waiting
+
+    async def wake(self):
+        """Wake the waiting subscriber."""
+        if self.waiting:
+            self.waiting = False
+            await self._channel[1](None)  # type: ignore
+
+    def detach(self):
+        """Stop receiving new events (the pending ones are still available)."""
+        self.closed = True
+        self.broadcast.unsubscribe(self)
+
+    async def close(self):
+        """Close the subscription."""
+        self.detach()
+        await self.wake()
+
+
+class ResponseSubscription(ResponseSSE):
+    """Stream the subscription's events (they are encoded already) as SSE."""
+
+    __slots__ = ()
+
+    def prepare_chunk(self, chunk: bytes) -> bytes:
+        """The chunks are prepared by the broadcast."""
+        return chunk
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Close the subscription when the response is finished."""
+        try:
+            await super(ResponseSubscription, self).__call__(scope, receive, send)
+        finally:
+            await self.__content__.close()  # type: ignore
+
+
+class Broadcast:
+    """Publish events to many subscribers, every event is encoded once per format.
+
+    :param queue_size: Max number of pending events per subscriber
+    :type queue_size: int
+    :param overflow: What to do with slow subscribers which queues are full:
+                     'drop' the oldest events or 'disconnect' the subscribers
+    :type overflow: str
+
+    .. code-block:: python
+
+        broadcast = Broadcast(queue_size=32)
+
+        @app.route('/events')
+        async def events(request):
+            return broadcast.sse('prices')
+
+        @app.route('/ws')
+        async def websocket(request):
+            async with ResponseWebSocket(request) as ws:
+                await broadcast.websocket(ws, 'prices')
+
+        await broadcast.publish({'data': '42'}, 'prices')
+
+    """
+
+    def __init__(self, queue_size: int = 100, overflow: str = 'drop'):
+        """Initialize the broadcast."""
+        assert overflow in OVERFLOW, f"Unsupported overflow policy: {overflow}"
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.subscriptions: t.Set[Subscription] = set()
+        self.topics: t.Dict[t.Optional[str], t.Set[Subscription]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of subscriptions."""
+        return len(self.subscriptions)
+
+    def subscribe(self, *topics: str, format: str = 'raw', queue_size: int = None,
+                  overflow: str = None) -> Subscription:
+        """Subscribe to the given topics (to every event when the topics are empty)."""
+        subscription = Subscription(
+            self, topics, format=format,
+            queue_size=self.queue_size if queue_size is None else queue_size,
+            overflow=overflow or self.overflow)
+
+        self.subscriptions.add(subscription)
+        for topic in topics or (None,):
+            self.topics.setdefault(topic, set()).add(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove the given subscription."""
+        self.subscriptions.discard(subscription)
+        for topic in subscription.topics or (None,):
+            subscriptions = self.topics.get(topic)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self.topics[topic]
+
+    async def publish(self, event: t.Any, topic: str = None) -> int:
+        """Publish the given event to the topic's subscribers (to everyone when topic is None).
+
+        Subscribers without topics receive every event. Return the number of subscribers.
+        """
+        if topic is None:
+            subscriptions: t.Iterable[Subscription] = tuple(self.subscriptions)
+        else:
+            topics = self.topics
+            subscriptions = (*topics.get(topic, ()), *topics.get(None, ()))
+
+        encoded: t.Dict[str, t.Any] = {}
+        for subscription in subscriptions:
+            fmt = subscription.format
+            try:
+                data = encoded[fmt]
+            except KeyError:
+                data = encoded[fmt] = FORMATS[fmt](event)
+
+            if subscription.push(data):
+                await subscription.wake()
+
+        return len(subscriptions)  # type: ignore
+
+    def sse(self, *topics: str, queue_size: int = None, overflow: str = None,
+            **kwargs) -> ResponseSubscription:
+        """Subscribe to the given topics and return a SSE response."""
+        subscription = self.subscribe(
+            *topics, format='sse', queue_size=queue_size, overflow=overflow)
+        return ResponseSubscription(subscription, **kwargs)
+
+    async def websocket(self, ws: ResponseWebSocket, *topics: str, queue_size: int = None,
+                        overflow: str = None):
+        """Send the given topics events to the accepted websocket until it's disconnected.
+
+        The client's messages are ignored.
+        """
+        subscription = self.subscribe(
+            *topics, format='websocket', queue_size=queue_size, overflow=overflow)
+
+        async def forward():
+            # The encoded messages are shared by the subscribers
+            async for msg in subscription:
+                await ws.send(dict(msg))
+
+        async def listen():
+            while ws.partner_state != ws.STATES.disconnected:
+                await ws.receive(raw=True)
+
+        try:
+            await aio_watch(forward(), listen)
+        finally:
+            await subscription.close()
+
+    async def close(self):
+        """Close all the subscriptions."""
+        for subscription in tuple(self.subscriptions):
+            await subscription.close()
@@ -0,0 +1,218 @@
+"""Manage live websocket connections."""
+
+from __future__ import annotations
+
+import typing as t
+from time import monotonic
+
+from ._compat import aio_channel, aio_timeout, aio_watch
+from .response import ResponseWebSocket
+from .typing import Message
+
+
+# Close codes
+GOING_AWAY = 1001
+
+
+def message_size(msg: Message) -> int:
+    """Get the given websocket message's payload size in bytes."""
+    data = msg.get('bytes')
+    if data:
+        return len(data)
+
+    text = msg.get('text')
+    if text:
+        return len(text) if text.isascii() else len(text.encode())
+
+    return 0
+
+
+class WebSocketConnection:
+    """A registered websocket with its traffic counters.
+
+    :param ws: The websocket
+    """
+
+    __slots__ = ('ws', 'started', 'last_received', 'last_activity', 'messages_in', 'messages_out',
+                 'bytes_in', 'bytes_out', 'pending', 'closed_by', 'notify_close')
+
+    def __init__(self, ws: ResponseWebSocket):
+        """Initialize the connection."""
+        self.ws = ws
+        self.started = self.last_received = self.last_activity = monotonic()
+        self.messages_in = self.messages_out = 0
+        self.bytes_in = self.bytes_out = 0
+        self.pending = 0
+        self.closed_by: t.Optional[str] = None
+        self.notify_close: t.Optional[t.Callable[[t.Any], t.Awaitable]] = None
+
+    def __repr__(self) -> str:
+        """Represent the connection."""
+        return (f"<WebSocketConnection in={self.bytes_in} out={self.bytes_out} "
+                f"pending={self.pending}>")
+
+
+class WebSocketManager:
+    """Register live websockets, close the idle ones and all of them on shutdown.
+
+    :param idle_timeout: Close websockets without any messages for the seconds
+    :type idle_timeout: float
+    :param receive_timeout: Close websockets without messages from clients for the seconds
+    :type receive_timeout: float
+    :param close_code: A code to close the websockets with on timeouts/shutdown
+    :type close_code: int
+
+    ASGI has no ping messages (servers answer the clients' pings themselves), so the manager
+    enforces only the idle and receive timeouts.
+
+    .. code-block:: python
+
+        manager = WebSocketManager(idle_timeout=60)
+        manager.bind_lifespan(app)
+
+        @app.route('/ws')
+        async def websocket(request):
+            async def handler(ws):
+                async for msg in ws:
+                    await ws.send(msg)
+
+            async with ResponseWebSocket(request) as ws:
+                await manager.run(ws, handler)
+
+    """
+
+    def __init__(self, idle_timeout: float = None, receive_timeout: float = None,
+                 close_code: int = GOING_AWAY):
+        """Initialize the manager."""
+        self.idle_timeout = idle_timeout
+        self.receive_timeout = receive_timeout
+        self.close_code = close_code
+        self.connections: t.Set[WebSocketConnection] = set()
+        self.closing = False
+        self.notify_closed: t.Optional[t.Callable[[t.Any], t.Awaitable]] = None
+        self.bytes_in = self.bytes_out = 0
+
+    def __len__(self) -> int:
+        """Return the number of live websockets."""
+        return len(self.connections)
+
+    def bind_lifespan(self, lifespan: t.Any):
+        """Close the websockets on shutdown (the lifespan is an App or a LifespanMiddleware)."""
+        lifespan.on_shutdown(self.close)
+
+    @property
+    def stats(self) -> t.Dict[str, int]:
+        """Return the manager's counters."""
+        return {
+            'connections': len(self.connections),
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'pending': sum(connection.pending for connection in self.connections),
+        }
+
+    def register(self, ws: ResponseWebSocket) -> WebSocketConnection:
+        """Register the given websocket and count its traffic."""
+        connection = WebSocketConnection(ws)
+        receive, send = ws._receive, ws._send
+
+        async def counted_receive() -> Message:
+            msg = await receive()
+            size = message_size(msg)
+            connection.messages_in += 1
+            connection.bytes_in += size
+            connection.last_received = connection.last_activity = monotonic()
+            self.bytes_in += size
+            return msg
+
+        async def counted_send(msg: Message):
+            size = message_size(msg)
+            connection.messages_out += 1
+            connection.bytes_out += size
+            connection.last_activity = monotonic()
+            self.bytes_out += size
+
+            connection.pending += 1
+            try:
+                await send(msg)
+            finally:
+                connection.pending -= 1
+
+        ws._receive, ws._send = counted_receive, counted_send
+        self.connections.add(connection)
+        return connection
+
+    async def unregister(self, connection: WebSocketConnection):
+        """Stop tracking the given connection, notify the closing manager about the last one."""
+        self.connections.discard(connection)
+        if self.notify_closed and not self.connections:
+            notify_closed, self.notify_closed = self.notify_closed, None
+            await notify_closed(None)
+
+    async def run(self, ws: ResponseWebSocket,
+                  handler: t.Callable[[ResponseWebSocket], t.Awaitable]):
+        """Run the handler for the registered websocket, close it on timeouts/shutdown."""
+        connection = self.register(ws)
+        try:
+            if not await aio_watch(handler(ws), self.watch, connection):
+                await ws.close(self.close_code)
+
+        finally:
+            await self.unregister(connection)
+
+    async def watch(self, connection: WebSocketConnection):
+        """Wait for the connection's timeouts or the manager's shutdown."""
+        wait_close, connection.notify_close = aio_channel()
+        while not self.closing:
+            timeout = self.get_timeout(connection)
+            if timeout is None:
+                connection.closed_by = await wait_close()
+                return
+
+            if timeout <= 0:
+                return
+
+            try:
+                connection.closed_by = await aio_timeout(timeout, wait_close)
+                return
+
+            except TimeoutError:
+                continue
+
+        connection.closed_by = 'shutdown'
+
+    def get_timeout(self, connection: WebSocketConnection) -> t.Optional[float]:
+        """Get seconds until the connection expires, mark the expired connection."""
+        deadlines = []
+        if self.idle_timeout:
+            deadlines.append(('idle', connection.last_activity + self.idle_timeout))
+
+        if self.receive_timeout:
+            deadlines.append(('receive', connection.last_received + self.receive_timeout))
+
+        if not deadlines:
+            return None
+
+        reason, deadline = min(deadlines, key=lambda item: item[1])
+        timeout = deadline - monotonic()
+        if timeout <= 0:
+            connection.closed_by = reason
+
+        return timeout
+
+    async def close(self, timeout: float = 5.0):
+        """Close all the websockets, wait for them to finish up to the given timeout."""
+        self.closing = True
+        if not self.connections:
+            return
+
+        wait_closed, self.notify_closed = aio_channel(1)
+        for connection in tuple(self.connections):
+            if connection.notify_close:
+                await connection.notify_close('shutdown')
+
+        try:
+            await aio_timeout(timeout, wait_closed)
+        except TimeoutError:
+            pass
+        finally:
+            self.notify_closed = None
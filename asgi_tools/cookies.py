@@ -0,0 +1,99 @@
+"""Parse Cookie headers and serialize Set-Cookie headers."""
+
+import re
+import typing as t
+from email.utils import formatdate
+from functools import lru_cache
+from http.cookies import Morsel, _quote  # type: ignore
+from time import time
+
+
+UNQUOTE_RE = re.compile(r'\\(?:([0-3][0-7][0-7])|(.))')
+
+# Cookie attributes names (see http.cookies.Morsel)
+ATTRIBUTES: t.Dict[str, str] = dict(Morsel._reserved)  # type: ignore
+FLAGS: t.Set[str] = set(Morsel._flags)  # type: ignore
+
+
+def parse_cookie(header: str) -> t.Dict[str, str]:
+    """Parse the given Cookie header into a dictionary.
+
+    Malformed pairs are skipped, only quoted values are unquoted.
+    """
+    cookies = {}
+    for chunk in header.split(';'):
+        name, _, value = chunk.partition('=')
+        name = name.strip()
+        if not name:
+            continue
+
+        value = value.strip()
+        if len(value) > 1 and value[0] == '"' and value[-1] == '"':
+            value = unquote(value)
+
+        cookies[name] = value
+
+    return cookies
+
+
+def unquote(value: str) -> str:
+    """Unquote the given cookie's value (the same way as http.cookies does)."""
+    value = value[1:-1]
+    if '\\' not in value:
+        return value
+
+    return UNQUOTE_RE.sub(unquote_char, value)
+
+
+def unquote_char(match: t.Match) -> str:
+    """Decode an escaped char."""
+    octal, char = match.groups()
+    return chr(int(octal, 8)) if octal else char
+
+
+def dump_cookie(morsel: Morsel) -> bytes:
+    """Serialize the given morsel into a Set-Cookie header's value.
+
+    The result is the same as `Morsel.OutputString()` returns.
+    """
+    # Morsels keep all the attributes in the same order
+    attrs = tuple(morsel.values())
+    expires = morsel['expires']
+    if isinstance(expires, int):
+        attrs = tuple(
+            formatdate(time() + expires, usegmt=True) if name == 'expires' else value
+            for name, value in morsel.items())
+
+    try:
+        encoded = dump_attrs(attrs)
+    except TypeError:  # unhashable values
+        encoded = dump_attrs.__wrapped__(attrs)
+
+    return f"{ morsel.key }={ morsel.coded_value }{ encoded }".encode('latin-1')
+
+
+@lru_cache(maxsize=1024)
+def dump_attrs(attrs: t.Tuple) -> str:
+    """Serialize the given cookie's attributes values."""
+    result = ''
+    for name, value in sorted(zip(ATTRIBUTES, attrs)):
+        if value == '':
+            continue
+
+        if name in FLAGS:
+            if value:
+                result += f"; { ATTRIBUTES[name] }"
+
+        elif name == 'max-age' and isinstance(value, int):
+            result += f"; Max-Age={ value:d}"
+
+        elif name == 'comment' and isinstance(value, str):
+            result += f"; Comment={ _quote(value) }"
+
+        else:
+            result += f"; { ATTRIBUTES[name] }={ value }"
+
+    return result
+
+
+# pylama: ignore=E501
@@ -1,5 +1,6 @@
 """Work with multipart."""
 
+from collections import deque
 from io import BytesIO
 import typing as t
 from cgi import parse_header
@@ -8,6 +9,7 @@ from urllib.parse import unquote_to_bytes
 
 from multidict import MultiDict
 
+from . import ASGIDecodeError
 from .multipart import QueryStringParser, MultipartParser, BaseParser
 from .request import Request
 
@@ -21,13 +23,36 @@ async def read_formdata(request: Request, max_size: int, upload_to: t.Optional[t
         reader = FormReader(request.charset)
 
     parser = reader.init_parser(request, max_size)
-    async for chunk in request.stream():
+    async for chunk in request.stream(max_size):
         parser.write(chunk)
 
     parser.finalize()
     return reader.form
 
 
+async def stream_formdata(
+        request: Request, max_size: int = 0) -> t.AsyncGenerator["FormPart", None]:
+    """Iterate over the parts of the given multipart request while its body is being received."""
+    if request.content_type != 'multipart/form-data':
+        raise ASGIDecodeError('Invalid Content Type')
+
+    reader = MultipartStreamReader(request, max_size)
+    parts = reader.parts
+    while True:
+        while parts:
+            part = parts.popleft()
+            yield part
+
+            # Skip the part's data which hasn't been consumed
+            async for _ in part:
+                pass
+
+        if not await reader.feed():
+            if not reader.finished:
+                raise ASGIDecodeError('Unexpected end of multipart data')
+            break
+
+
 class FormReader:
     """Process querystring form data."""
 
@@ -87,6 +112,7 @@ class MultipartReader(FormReader):
             'header_value': self.on_header_value,
             'part_data': self.on_part_data,
             'part_end': self.on_part_end,
+            'end': self.on_end,
         }, max_size=max_size)
 
     def on_header_field(self, data: bytes, start: int, end: int):
@@ -130,6 +156,105 @@ class MultipartReader(FormReader):
         self.partdata = BytesIO()
         self.headers = {}
 
+    def on_end(self, data: bytes, start: int, end: int):
+        pass
+
+
+class MultipartStreamReader(MultipartReader):
+    """Process multipart formdata part by part."""
+
+    __slots__ = ('form', 'curname', 'curvalue', 'charset', 'name', 'partdata', 'headers',
+                 'upload_to', 'file_memory_limit', 'parser', 'stream', 'parts', 'part', 'finished')
+
+    def __init__(self, request: Request, max_size: int):
+        super(MultipartStreamReader, self).__init__(request.charset, None, 0)
+        self.part: t.Optional[FormPart] = None
+        self.finished = False
+        self.parts: t.Deque[FormPart] = deque()
+        self.stream = request.stream(max_size).__aiter__()
+        self.parser = self.init_parser(request, max_size)
+
+    async def feed(self) -> bool:
+        """Write a next chunk from the request's stream to the parser."""
+        try:
+            chunk = await self.stream.__anext__()
+        except StopAsyncIteration:
+            return False
+
+        try:
+            self.parser.write(chunk)
+        except (LookupError, ValueError):
+            raise ASGIDecodeError('Invalid Encoding')
+
+        return True
+
+    def on_headers_finished(self, data: bytes, start: int, end: int):
+        charset = self.charset
+        headers = {
+            name.decode(charset): value.decode(charset) for name, value in self.headers.items()}
+        _, options = parse_header(headers['content-disposition'])
+        self.part = part = FormPart(self, options['name'], options.get('filename'), headers)
+        self.parts.append(part)
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self.part is not None and end > start:
+            self.part.chunks.append(data[start:end])
+
+    def on_part_end(self, data: bytes, start: int, end: int):
+        if self.part is not None:
+            self.part.finished = True
+            self.part = None
+
+        self.headers = {}
+
+    def on_end(self, data: bytes, start: int, end: int):
+        self.finished = True
+
+
+class FormPart:
+    """A part of multipart formdata.
+
+    :param name: The part's field name
+    :param filename: The part's filename (None for regular fields)
+    :param headers: The part's headers
+
+    Iterate the part to get its data chunks.
+    """
+
+    __slots__ = 'name', 'filename', 'headers', 'chunks', 'finished', 'reader'
+
+    def __init__(self, reader: MultipartStreamReader, name: str,
+                 filename: t.Optional[str], headers: t.Dict[str, str]):
+        self.reader = reader
+        self.name = name
+        self.filename = filename
+        self.headers = headers
+        self.chunks: t.Deque[bytes] = deque()
+        self.finished = False
+
+    def __repr__(self) -> str:
+        return f"<FormPart {self.name!r} {self.filename or ''}>"
+
+    @property
+    def content_type(self) -> t.Optional[str]:
+        return self.headers.get('content-type')
+
+    async def __aiter__(self) -> t.AsyncGenerator[bytes, None]:
+        chunks = self.chunks
+        while True:
+            while chunks:
+                yield chunks.popleft()
+
+            if self.finished:
+                break
+
+            if not await self.reader.feed():
+                raise ASGIDecodeError('Unexpected end of multipart data')
+
+    async def read(self) -> bytes:
+        """Read the part's data into memory."""
+        return b''.join([chunk async for chunk in self])
+
 
 def unquote_plus(value: bytearray) -> bytes:
     value = value.replace(b'+', b' ')
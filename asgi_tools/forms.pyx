@@ -2,6 +2,7 @@
 
 """Work with multipart."""
 
+from collections import deque
 from io import BytesIO
 from cgi import parse_header
 from pathlib import Path
@@ -10,6 +11,7 @@ from urllib.parse import unquote_to_bytes
 
 from multidict import MultiDict
 
+from . import ASGIDecodeError
 from .multipart cimport QueryStringParser, MultipartParser, BaseParser
 
 
@@ -23,13 +25,36 @@ async def read_formdata(object request, int max_size, object upload_to,
         reader = FormReader(request.charset)
 
     parser = reader.init_parser(request, max_size)
-    async for chunk in request.stream():
+    async for chunk in request.stream(max_size):
         parser.write(chunk)
 
     parser.finalize()
     return reader.form
 
 
+async def stream_formdata(object request, int max_size=0):
+    """Iterate over the parts of the given multipart request while its body is being received."""
+    cdef str content_type = request.content_type
+    if content_type != 'multipart/form-data':
+        raise ASGIDecodeError('Invalid Content Type')
+
+    reader = MultipartStreamReader(request, max_size)
+    parts = reader.parts
+    while True:
+        while parts:
+            part = parts.popleft()
+            yield part
+
+            # Skip the part's data which hasn't been consumed
+            async for _ in part:
+                pass
+
+        if not await reader.feed():
+            if not reader.finished:
+                raise ASGIDecodeError('Unexpected end of multipart data')
+            break
+
+
 cdef class FormReader:
     """Parse querystring form data."""
 
@@ -98,6 +123,7 @@ cdef class MultipartReader(FormReader):
             'header_value': self.on_header_value,
             'part_data': self.on_part_data,
             'part_end': self.on_part_end,
+            'end': self.on_end,
         }, max_size=max_size)
 
     def on_header_field(self, data: bytes, start: int, end: int):
@@ -141,6 +167,100 @@ cdef class MultipartReader(FormReader):
         self.partdata = BytesIO()
         self.headers = {}
 
+    def on_end(self, data: bytes, start: int, end: int):
+        pass
+
+
+cdef class MultipartStreamReader(MultipartReader):
+    """Parse multipart formdata part by part."""
+
+    cdef public object parts
+    cdef public bint finished
+    cdef object part
+    cdef object stream
+    cdef BaseParser parser
+
+    def __init__(self, object request, int max_size):
+        MultipartReader.__init__(self, request.charset, None, 0)
+        self.part = None
+        self.finished = False
+        self.parts = deque()
+        self.stream = request.stream(max_size).__aiter__()
+        self.parser = self.init_parser(request, max_size)
+
+    async def feed(self):
+        """Write a next chunk from the request's stream to the parser."""
+        try:
+            chunk = await self.stream.__anext__()
+        except StopAsyncIteration:
+            return False
+
+        try:
+            self.parser.write(chunk)
+        except (LookupError, ValueError):
+            raise ASGIDecodeError('Invalid Encoding')
+
+        return True
+
+    def on_headers_finished(self, data: bytes, start: int, end: int):
+        charset = self.charset
+        headers = {
+            name.decode(charset): value.decode(charset) for name, value in self.headers.items()}
+        _, options = parse_header(headers['content-disposition'])
+        self.part = part = FormPart(self, options['name'], options.get('filename'), headers)
+        self.parts.append(part)
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self.part is not None and end > start:
+            self.part.chunks.append(data[start:end])
+
+    def on_part_end(self, data: bytes, start: int, end: int):
+        if self.part is not None:
+            self.part.finished = True
+            self.part = None
+
+        self.headers = {}
+
+    def on_end(self, data: bytes, start: int, end: int):
+        self.finished = True
+
+
+class FormPart:
+    """A part of multipart formdata."""
+
+    __slots__ = 'name', 'filename', 'headers', 'chunks', 'finished', 'reader'
+
+    def __init__(self, reader, name, filename, headers):
+        self.reader = reader
+        self.name = name
+        self.filename = filename
+        self.headers = headers
+        self.chunks = deque()
+        self.finished = False
+
+    def __repr__(self):
+        return f"<FormPart {self.name!r} {self.filename or ''}>"
+
+    @property
+    def content_type(self):
+        return self.headers.get('content-type')
+
+    async def __aiter__(self):
+        chunks = self.chunks
+        while True:
+            while chunks:
+                yield chunks.popleft()
+
+            if self.finished:
+                break
+
+            if not await self.reader.feed():
+                raise ASGIDecodeError('Unexpected end of multipart data')
+
+    async def read(self):
+        """Read the part's data into memory."""
+        return b''.join([chunk async for chunk in self])
+
 
 cdef dict _hextobyte = {
     (a + b).encode(): bytes.fromhex(a + b)
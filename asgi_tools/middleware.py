@@ -1,17 +1,24 @@
 """ASGI-Tools Middlewares."""
 
 import abc
+import gzip
 import inspect
+import os
+import time
+import zlib
 import typing as t
+from collections import OrderedDict
 from functools import partial
 from pathlib import Path
 
 from http_router import Router
 
 from . import ASGIError, asgi_logger
+from ._compat import aio_stream_file, aio_run_in_thread, brotli
 from .request import Request
-from .response import parse_response, ResponseError, ResponseFile, Response, ResponseRedirect
-from .typing import Scope, Receive, Send, ASGIApp
+from .response import (
+    parse_etags, parse_response, ResponseError, ResponseFile, Response, ResponseRedirect)
+from .typing import Scope, Receive, Send, ASGIApp, Message
 
 
 class BaseMiddeware(metaclass=abc.ABCMeta):
@@ -348,6 +355,16 @@ class StaticFilesMiddleware(BaseMiddeware):
     :type url_prefix: str, "/static"
     :param folders: Paths to folders with static files
     :type folders: list[str]
+    :param cache_size: Keep small files in memory up to the given size in bytes (0 disables the cache)
+    :type cache_size: int, 0
+    :param cache_file_size: The maximum size of a file to cache
+    :type cache_file_size: int, 256KB
+    :param cache_check_interval: An interval (in seconds) to check cached files for changes
+    :type cache_check_interval: float, 1.0
+    :param index: Index the folders on start and serve only the indexed files with the
+                  headers prepared by the index, without looking into filesystem
+                  (call :meth:`reindex` to pick up the changed files)
+    :type index: bool, False
 
     .. code-block:: python
 
@@ -358,10 +375,16 @@ class StaticFilesMiddleware(BaseMiddeware):
 
         app = StaticFilesMiddleware(app, folders=['static'])
 
+    The cached files are kept with ready headers and gzip/brotli compressed variants
+    (brotli requires `brotli` package) which are choosen by `Accept-Encoding`.
+    Cache metrics are available at :attr:`cache` (`hits`, `misses`, `hit_ratio`, `size`).
+
     """
 
     def __init__(self, app: ASGIApp = None, url_prefix: str = '/static',
-                 folders: t.Union[str, t.List[str]] = None) -> None:
+                 folders: t.Union[str, t.List[str]] = None, cache_size: int = 0,
+                 cache_file_size: int = 256 * 1024, cache_check_interval: float = 1.0,
+                 index: bool = False) -> None:
         """Initialize the middleware. """
         super(StaticFilesMiddleware, self).__init__(app)
         self.url_prefix = url_prefix
@@ -369,6 +392,37 @@ class StaticFilesMiddleware(BaseMiddeware):
         if isinstance(folders, str):
             folders = [folders]
         self.folders: t.List[Path] = [Path(folder) for folder in folders]
+        self.cache: t.Optional[StaticFilesCache] = StaticFilesCache(
+            cache_size, cache_file_size, cache_check_interval) if cache_size else None
+        self.index: t.Optional[t.Dict[str, ResponseFile]] = None
+        if index:
+            self.reindex()
+
+    def reindex(self) -> None:
+        """Walk through the folders, index the files with their stats and prepared headers.
+
+        Symlinks outside the folders are skipped. Call the method when the files are changed.
+        """
+        index: t.Dict[str, ResponseFile] = {}
+        for folder in self.folders:
+            root = folder.resolve()
+            for dirpath, _, filenames in os.walk(root):
+                for name in filenames:
+                    filepath = Path(dirpath, name)
+                    key = filepath.relative_to(root).as_posix()
+                    if key in index:
+                        continue
+
+                    filepath = filepath.resolve()
+                    if root not in filepath.parents:
+                        continue
+
+                    try:
+                        index[key] = ResponseFile(filepath)
+                    except ASGIError:
+                        continue
+
+        self.index = index
 
     async def __process__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Serve static files for self url prefix."""
@@ -378,17 +432,465 @@ class StaticFilesMiddleware(BaseMiddeware):
             return await self.app(scope, receive, send)
 
         filename = path[len(url_prefix):].strip('/')
+        cache = self.cache
+        if cache is not None and (scope['method'] not in {'GET', 'HEAD'} or any(
+                name in CACHE_BYPASS_HEADERS for name, _ in scope['headers'])):
+            cache = None
+
+        if cache is not None:
+            cached = cache.get(filename)
+            if cached is not None:
+                return await cached(scope, receive, send)
+
+        response = self.find_file(filename, headers_only=scope['method'] == 'HEAD')
+        if response is None:
+            return await ResponseError(status_code=404)(scope, receive, send)
+
+        if cache is not None:
+            cached = await cache.load(filename, response)
+            if cached is not None:
+                return await cached(scope, receive, send)
+
+        await response(scope, receive, send)
+
+    def find_file(self, filename: str, headers_only: bool = False) -> t.Optional[ResponseFile]:
+        """Find the given file in the index (without filesystem calls) or the folders."""
+        if self.index is not None:
+            indexed = self.index.get(filename)
+            return indexed and indexed.clone(headers_only=headers_only)
+
         for folder in self.folders:
-            filepath = folder.joinpath(filename).resolve()
             try:
-                response: t.Optional[Response] = ResponseFile(
-                    filepath, headers_only=scope['method'] == 'HEAD')
+                return ResponseFile(folder.joinpath(filename).resolve(), headers_only=headers_only)
+            except ASGIError:
+                continue
+
+        return None
+
+
+# Range and conditional requests (except If-None-Match) are served by ResponseFile
+CACHE_BYPASS_HEADERS = {b'range', b'if-range', b'if-modified-since'}
+
+COMPRESSIBLE_TYPES = {
+    'application/javascript', 'application/json', 'application/xml', 'image/svg+xml',
+    'application/x-javascript', 'application/manifest+json', 'application/wasm',
+    'application/ld+json', 'application/xhtml+xml', 'application/rss+xml',
+    'application/atom+xml', 'application/x-ndjson',
+}
+
+
+def is_compressible(content_type: str) -> bool:
+    """Check the given content type is worth to be compressed."""
+    content_type = content_type.partition(';')[0].strip().lower()
+    return content_type.startswith('text/') or content_type in COMPRESSIBLE_TYPES
+
+
+class CachedFile:
+    """A static file which is served from memory."""
+
+    __slots__ = (
+        'filepath', 'mtime', 'length', 'checked_at', 'etag', 'headers', 'body', 'encoded', 'size')
+
+    def __init__(self, response: ResponseFile, body: bytes) -> None:
+        """Keep the response's headers and body (call `compress` to add the encoded bodies)."""
+        self.filepath = response.filepath
+        self.mtime = response.stat.st_mtime
+        self.length = response.stat.st_size
+        self.checked_at = time.monotonic()
+        self.etag = response.etag
+        self.headers = [
+            (name, value) for name, value in response.msg_start()['headers']
+            if name != b'content-length'
+        ]
+        self.body = body
+        self.encoded: t.Dict[str, bytes] = {}
+        self.size = len(body)
+
+    def compress(self) -> None:
+        """Compress the body with brotli and gzip (it's slow, run the method in a thread)."""
+        body = self.body
+        if brotli is not None:
+            compressed = brotli.compress(body)
+            if len(compressed) < len(body):
+                self.encoded['br'] = compressed
+
+        compressed = gzip.compress(body)
+        if len(compressed) < len(body):
+            self.encoded['gzip'] = compressed
+
+        self.headers.append((b'vary', b'accept-encoding'))
+        self.size = len(body) + sum(len(data) for data in self.encoded.values())
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Send the file."""
+        accept_encoding = if_none_match = b''
+        for name, value in scope['headers']:
+            if name == b'accept-encoding':
+                accept_encoding = value
+            elif name == b'if-none-match':
+                if_none_match = value
+
+        if if_none_match and (if_none_match.strip() == b'*' or self.etag in parse_etags(
+                if_none_match.decode('latin-1'))):
+            await send({"type": "http.response.start", "status": 304, "headers": [
+                (name, value) for name, value in self.headers
+                if name in {b'etag', b'last-modified', b'vary'}
+            ]})
+            return await send({"type": "http.response.body", "body": b""})
+
+        body, headers = self.body, self.headers
+        encoding = accept_encoding and self.encoded and negotiate_encoding(
+            accept_encoding.decode('latin-1'), self.encoded)
+        if encoding:
+            body = self.encoded[encoding]
+            headers = headers + [(b'content-encoding', encoding.encode('latin-1'))]
+
+        await send({
+            "type": "http.response.start", "status": 200,
+            "headers": headers + [(b'content-length', str(len(body)).encode())]})
+        await send({"type": "http.response.body", "body": b"" if scope['method'] == 'HEAD' else body})
+
+
+class StaticFilesCache:
+    """Keep static files in memory (LRU limited by the total size in bytes)."""
+
+    __slots__ = 'max_size', 'max_file_size', 'check_interval', 'files', 'size', 'hits', 'misses'
+
+    def __init__(self, max_size: int, max_file_size: int, check_interval: float = 1.0) -> None:
+        """Initialize the cache."""
+        self.max_size = max_size
+        self.max_file_size = min(max_file_size, max_size)
+        self.check_interval = check_interval
+        self.files: t.OrderedDict[str, CachedFile] = OrderedDict()
+        self.size = self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached files."""
+        return len(self.files)
+
+    @property
+    def hit_ratio(self) -> float:
+        """Return the cache hit ratio."""
+        total = self.hits + self.misses
+        return total and self.hits / total
+
+    def get(self, key: str) -> t.Optional[CachedFile]:
+        """Get a cached file, check the file's mtime/size if the interval has passed."""
+        cached = self.files.get(key)
+        if cached is not None:
+            now = time.monotonic()
+            if now - cached.checked_at > self.check_interval:
+                cached.checked_at = now
+                try:
+                    stat = os.stat(cached.filepath)
+                    valid = (stat.st_mtime, stat.st_size) == (cached.mtime, cached.length)
+                except OSError:
+                    valid = False
+
+                if not valid:
+                    self.pop(key)
+                    cached = None
+
+        if cached is None:
+            self.misses += 1
+            return None
+
+        self.files.move_to_end(key)
+        self.hits += 1
+        return cached
+
+    async def load(self, key: str, response: ResponseFile) -> t.Optional[CachedFile]:
+        """Read the given file response into the cache."""
+        if response.stat.st_size > self.max_file_size:
+            return None
+
+        body = b''.join([chunk async for chunk in aio_stream_file(response.filepath)])
+        cached = CachedFile(response, body)
+        if is_compressible(response.file_type):
+            await aio_run_in_thread(cached.compress)
+
+        self.pop(key)
+        self.files[key] = cached
+        self.size += cached.size
+        while self.size > self.max_size:
+            self.pop(next(iter(self.files)))
+
+        return cached
+
+    def pop(self, key: str) -> None:
+        """Remove a file from the cache."""
+        cached = self.files.pop(key, None)
+        if cached is not None:
+            self.size -= cached.size
+
+    def clear(self) -> None:
+        """Clear the cache."""
+        self.files.clear()
+        self.size = 0
+
+
+class CompressionMiddleware(BaseMiddeware):
+    """Compress responses with gzip, deflate or brotli, negotiated by `Accept-Encoding`.
+
+    :param minimum_size: Don't compress responses smaller than the size (in bytes)
+    :type minimum_size: int, 500
+    :param level: A compression level
+    :type level: int, 6
+    :param encodings: Supported encodings in the order of preference
+                      (brotli requires `brotli` package)
+    :type encodings: list[str], ['br', 'gzip', 'deflate']
+    :param executor_size: Compress bodies bigger than the size (in bytes) in a thread pool
+    :type executor_size: int, 512KB
+
+    Bodies are compressed incrementally, streamed SSE responses are flushed on every event.
+    Only text responses and the known text-like types (JSON, XML, JavaScript, SVG, etc) are
+    compressed, responses which have `Content-Encoding` already are skipped. Strong ETags of
+    the compressed responses are weakened.
+
+    .. code-block:: python
+
+        from asgi_tools import App, CompressionMiddleware
+
+        app = App()
+        app.middleware(CompressionMiddleware.setup(minimum_size=1024))
+
+    """
+
+    scopes = {'http'}
+
+    def __init__(self, app: ASGIApp = None, minimum_size: int = 500, level: int = 6,
+                 encodings: t.Sequence[str] = ('br', 'gzip', 'deflate'),
+                 executor_size: int = 512 * 1024) -> None:
+        """Initialize the middleware."""
+        super(CompressionMiddleware, self).__init__(app)
+        self.minimum_size = minimum_size
+        self.level = level
+        self.encodings = [enc for enc in encodings if enc in COMPRESSORS and (enc != 'br' or brotli)]
+        self.executor_size = executor_size
+
+    async def __process__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Wrap the send function to compress responses."""
+        accept_encoding = None
+        for name, value in scope['headers']:
+            if name == b'accept-encoding':
+                accept_encoding = value.decode('latin-1')
                 break
 
-            except ASGIError:
-                response = None
+        encoding = accept_encoding and scope['method'] != 'HEAD' and \
+            negotiate_encoding(accept_encoding, self.encodings)
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
 
-        response = response or ResponseError(status_code=404)
-        await response(scope, receive, send)
+        responder = CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+def negotiate_encoding(accept_encoding: str, encodings: t.Iterable[str]) -> t.Optional[str]:
+    """Choose an encoding from the given Accept-Encoding header value."""
+    accepted = {}
+    for item in accept_encoding.lower().split(','):
+        name, _, params = item.partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+
+    # The highest quality wins, the encodings order is used for equal qualities
+    default = accepted.get('*', 0.0)
+    encoding, quality = None, 0.0
+    for name in encodings:
+        value = accepted.get(name, default)
+        if value > quality:
+            encoding, quality = name, value
+
+    return encoding
+
+
+class CompressionResponder:
+    """Compress the response's messages and send them to the server."""
+
+    __slots__ = 'middleware', 'encoding', 'transport', 'start', 'compressor', 'sse'
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send) -> None:
+        """Initialize the responder."""
+        self.middleware = middleware
+        self.encoding = encoding
+        self.transport = send
+        self.start: t.Optional[Message] = None
+        self.compressor: t.Optional[t.Any] = None
+        self.sse = False
+
+    async def send(self, message: Message) -> None:
+        """Process an ASGI message."""
+        if message['type'] == 'http.response.start':
+            if self.should_compress(message):
+                self.start = message
+                return
+
+            return await self.transport(message)
+
+        start = self.start
+        if start is not None:
+            self.start = None
+            return await self.send_first(start, message)
+
+        compressor = self.compressor
+        if compressor is None or message['type'] != 'http.response.body':
+            return await self.transport(message)
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+        body = await self.compress(body, self.sse and body.endswith(b'\n\n'), not more_body)
+        if body or not more_body:
+            await self.transport({'type': 'http.response.body', 'body': body, 'more_body': more_body})
+
+    def should_compress(self, start: Message) -> bool:
+        """Check the response's status and headers."""
+        status = start['status']
+        if status < 200 or status in {204, 206, 304}:
+            return False
+
+        for name, value in start.get('headers', []):
+            name = name.lower()
+            if name == b'content-encoding':
+                return False
+
+            if name == b'content-type':
+                content_type = value.decode('latin-1')
+                if not is_compressible(content_type):
+                    return False
+
+                self.sse = content_type.startswith('text/event-stream')
+
+            elif name == b'content-length' and \
+                    value.isdigit() and int(value) < self.middleware.minimum_size:
+                return False
+
+        return True
+
+    async def send_first(self, start: Message, message: Message) -> None:
+        """Decide to compress the response by its first body message."""
+        if message['type'] != 'http.response.body':
+            await self.transport(start)
+            return await self.transport(message)
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+        if not more_body and len(body) < self.middleware.minimum_size:
+            await self.transport(start)
+            return await self.transport(message)
+
+        self.compressor = COMPRESSORS[self.encoding](self.middleware.level)
+        headers = self.prepare_headers(start.get('headers', []))
+        body = await self.compress(body, self.sse, not more_body)
+        if not more_body:
+            headers.append((b'content-length', str(len(body)).encode('latin-1')))
+
+        await self.transport({**start, 'headers': headers})
+        await self.transport({'type': 'http.response.body', 'body': body, 'more_body': more_body})
+
+    def prepare_headers(
+            self, headers: t.Iterable[t.Tuple[bytes, bytes]]) -> t.List[t.Tuple[bytes, bytes]]:
+        """Prepare the compressed response's headers.
+
+        The content length is removed, strong ETags are weakened (the compressed body isn't
+        byte-identical to the original one) and `accept-encoding` is merged into `Vary`.
+        """
+        result = []
+        vary = False
+        for name, value in headers:
+            lname = name.lower()
+            if lname == b'content-length':
+                continue
+
+            if lname == b'etag' and not value.startswith(b'W/'):
+                value = b'W/"' + value.strip(b'"') + b'"'
+
+            elif lname == b'vary':
+                vary = True
+                tokens = {token.strip().lower() for token in value.split(b',')}
+                if not tokens & {b'accept-encoding', b'*'}:
+                    value += b', accept-encoding'
+
+            result.append((name, value))
+
+        result.append((b'content-encoding', self.encoding.encode('latin-1')))
+        if not vary:
+            result.append((b'vary', b'accept-encoding'))
+
+        return result
+
+    async def compress(self, body: bytes, flush: bool, finish: bool) -> bytes:
+        """Compress the given body (in a thread pool for big bodies)."""
+        if len(body) >= self.middleware.executor_size:
+            return await aio_run_in_thread(self.compressor.process, body, flush, finish)  # type: ignore
+
+        return self.compressor.process(body, flush, finish)  # type: ignore
+
+
+class ZlibCompressor:
+    """Compress data with zlib."""
+
+    __slots__ = 'compressobj',
+
+    wbits = 16 + zlib.MAX_WBITS  # gzip
+
+    def __init__(self, level: int) -> None:
+        """Initialize the compressor."""
+        self.compressobj = zlib.compressobj(level, zlib.DEFLATED, self.wbits)
+
+    def process(self, data: bytes, flush: bool = False, finish: bool = False) -> bytes:
+        """Compress the given data, flush or finish the stream."""
+        compressobj = self.compressobj
+        output = compressobj.compress(data)
+        if finish:
+            return output + compressobj.flush()
+
+        if flush:
+            return output + compressobj.flush(zlib.Z_SYNC_FLUSH)
+
+        return output
+
+
+class DeflateCompressor(ZlibCompressor):
+    """Compress data with deflate."""
+
+    __slots__ = ()
+
+    wbits = zlib.MAX_WBITS
+
+
+class BrotliCompressor:
+    """Compress data with brotli."""
+
+    __slots__ = 'compressor',
+
+    def __init__(self, level: int) -> None:
+        """Initialize the compressor."""
+        self.compressor = brotli.Compressor(quality=level)
+
+    def process(self, data: bytes, flush: bool = False, finish: bool = False) -> bytes:
+        """Compress the given data, flush or finish the stream."""
+        compressor = self.compressor
+        output = compressor.process(data)
+        if finish:
+            return output + compressor.finish()
+
+        if flush:
+            return output + compressor.flush()
+
+        return output
+
+
+COMPRESSORS: t.Dict[str, t.Callable] = {
+    'br': BrotliCompressor,
+    'gzip': ZlibCompressor,
+    'deflate': DeflateCompressor,
+}
 
 # pylama: ignore=E501
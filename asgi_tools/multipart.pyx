@@ -282,7 +282,7 @@ cdef class MultipartParser(BaseParser):
         cdef bytes boundary = self.boundary
         cdef unsigned int boundary_len = len(boundary)
         cdef char ch
-        cdef int boundary_end, prev_index
+        cdef int boundary_pos, prev_index
 
         while idx < data_len:
             ch = data[idx]
@@ -390,45 +390,51 @@ cdef class MultipartParser(BaseParser):
                 # We're processing our part data right now.  During this, we
                 # need to efficiently search for our boundary, since any data
                 # on any number of lines can be a part of the current data.
-                # We use the Boyer-Moore-Horspool algorithm to efficiently
-                # search through the remainder of the buffer looking for our
-                # boundary.
+                # We look for the whole boundary with bytes.find and step byte
+                # by byte only when a boundary candidate has been found.
 
                 # Save the current value of our index.  We use this in case we
                 # find part of a boundary, but it doesn't match fully.
                 prev_index = index
 
-                # Set up variables.
-                boundary_end = boundary_len - 1
-                boundary_chars = self.boundary_chars
-
                 # If our index is 0, we're starting a new part, so start our
                 # search.
                 if index == 0:
-                    # Search forward until we either hit the end of our buffer,
-                    # or reach a character that's in our boundary.
-                    idx += boundary_end
-                    while idx < data_len - 1 and data[idx] not in boundary_chars:
-                        idx += boundary_len
-
-                    # Reset i back the length of our boundary, which is the
-                    # earliest possible location that could be our match (i.e.
-                    # if we've just broken out of our loop since we saw the
-                    # last character in our boundary)
-                    idx -= boundary_end
-                    ch = data[idx]
+                    boundary_pos = data.find(boundary, idx, data_len)
+                    if boundary_pos == -1:
+                        # The boundary may start at the end of the buffer
+                        boundary_pos = data.find(
+                            CR, max(idx, data_len - <int>boundary_len + 1), data_len)
+                        while boundary_pos != -1 and \
+                                not boundary.startswith(data[boundary_pos:data_len]):
+                            boundary_pos = data.find(CR, boundary_pos + 1, data_len)
+
+                        # No candidates, the rest of the buffer is the part data
+                        if boundary_pos == -1:
+                            idx = data_len
+                            continue
+
+                        index = data_len - boundary_pos
+
+                    else:
+                        index = boundary_len
+
+                    # We found a boundary candidate, so we send the existing data.
+                    if self.part_data_pos != -1:
+                        if boundary_pos > self.part_data_pos:
+                            self.callback('part_data', data, self.part_data_pos, boundary_pos)
+                        self.part_data_pos = -1
+
+                    # Keep the matched bytes in case the boundary isn't matched fully.
+                    self.lookbehind[:index] = boundary[:index]
+                    idx = boundary_pos + index
+                    continue
 
                 # Now, we have a couple of cases here.  If our index is before
                 # the end of the boundary...
                 if index < boundary_len:
                     # If the character matches...
                     if boundary[index] == ch:
-                        # If we found a match for our boundary, we send the
-                        # existing data.
-                        if index == 0 and self.part_data_pos != -1:
-                            self.callback('part_data', data, self.part_data_pos, idx)
-                            self.part_data_pos = -1
-
                         # The current character matches, so continue!
                         index += 1
                     else:
@@ -529,8 +535,9 @@ cdef class MultipartParser(BaseParser):
                     state = STATE_START_BOUNDARY
 
             elif state == STATE_END:
-                # Do nothing and just consume a byte in the end state.
-                pass
+                # Do nothing and just consume the rest data in the end state.
+                idx = data_len
+                continue
 
             else:
                 raise ValueError(f"Reached an unknown state {state} at {idx}")
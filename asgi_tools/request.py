@@ -6,15 +6,15 @@ from __future__ import annotations
 
 import typing as t
 from cgi import parse_header
-from http import cookies
 
-from multidict import MultiDict
+from multidict import MultiDict, MultiDictProxy
 from yarl import URL
 
 from . import ASGIDecodeError, DEFAULT_CHARSET
 from ._compat import json_loads
+from .cookies import parse_cookie
 from .typing import Scope, Receive, Send, JSONType
-from .utils import parse_headers, CIMultiDict
+from .utils import parse_headers, parse_query, CIMultiDict
 
 
 class Request(t.MutableMapping):
@@ -24,21 +24,27 @@ class Request(t.MutableMapping):
     :param receive: an asynchronous callable which lets the application
                     receive event messages from the client
 
+    The request's `max_body_size` attribute limits the size of the request's body in bytes
+    (0 is unlimited, see :py:meth:`stream`).
+
     """
 
-    _is_read: bool = False
-    _url: t.Optional[URL] = None
-    _body: t.Optional[bytes] = None
-    _form: t.Optional[MultiDict] = None
-    _headers: t.Optional[CIMultiDict] = None
-    _media: t.Optional[t.Dict[str, str]] = None
-    _cookies: t.Optional[t.Dict[str, str]] = None
+    __slots__ = ('scope', 'receive', 'send', 'max_body_size', '_is_read', '_url', '_body',
+                 '_form', '_headers', '_media', '_cookies')
 
     def __init__(self, scope: Scope, receive: Receive = None, send: Send = None) -> None:
         """Create a request based on the given scope."""
         self.scope = scope
         self.receive = receive
         self.send = send
+        self.max_body_size = 0
+        self._is_read = False
+        self._url: t.Optional[URL] = None
+        self._body: t.Optional[t.Union[bytes, bytearray]] = None
+        self._form: t.Optional[MultiDict] = None
+        self._headers: t.Optional[CIMultiDict] = None
+        self._media: t.Optional[t.Dict[str, str]] = None
+        self._cookies: t.Optional[t.Dict[str, str]] = None
 
     def __repr__(self):
         """Represent the request."""
@@ -66,11 +72,15 @@ class Request(t.MutableMapping):
 
     def __getattr__(self, name: str) -> t.Any:
         """Proxy the request's unknown attributes to scope."""
+        if name.startswith('__'):
+            raise AttributeError(name)
         return self.scope[name]
 
     def __copy__(self, **mutations) -> Request:
         """Copy the request to a new one."""
-        return Request(dict(self.scope, **mutations), self.receive, self.send)
+        request = Request(dict(self.scope, **mutations), self.receive, self.send)
+        request.max_body_size = self.max_body_size
+        return request
 
     @property
     def url(self) -> URL:
@@ -90,7 +100,7 @@ class Request(t.MutableMapping):
         """
         if self._url is None:
             scope = self.scope
-            host = self.headers.get('host')
+            host = self.get_header(b'host')
             if host is None and ('server' in scope):
                 host, port = scope['server']
                 if port:
@@ -124,6 +134,29 @@ class Request(t.MutableMapping):
             self._headers = parse_headers(self.scope['headers'])
         return self._headers
 
+    def get_header(self, name: t.Union[bytes, str], default: str = None) -> t.Optional[str]:
+        """Get a header's value without parsing the all headers.
+
+        .. code-block:: python
+
+            request = Request(scope)
+
+            assert request.get_header(b'content-type')
+            assert request.get_header(b'authorization')
+
+        :param name: A header's name (lowercased bytes is the fastest way)
+        :param default: A value to return when the header is not found
+
+        """
+        if isinstance(name, str):
+            name = name.lower().encode('latin-1')
+
+        for key, value in self.scope['headers']:
+            if key == name:
+                return value.decode('latin-1')
+
+        return default
+
     @property
     def cookies(self) -> t.Dict[str, str]:
         """A lazy property that parses the current scope's cookies and returns a dictionary.
@@ -135,12 +168,8 @@ class Request(t.MutableMapping):
 
         """
         if self._cookies is None:
-            self._cookies = {}
-            cookie = self.headers.get('cookie')
-            if cookie:
-                for chunk in cookie.split(';'):
-                    key, _, val = chunk.partition('=')
-                    self._cookies[key.strip()] = cookies._unquote(val.strip())  # type: ignore
+            cookie = self.get_header(b'cookie')
+            self._cookies = parse_cookie(cookie) if cookie else {}
 
         return self._cookies
 
@@ -148,7 +177,7 @@ class Request(t.MutableMapping):
     def media(self) -> t.Dict[str, str]:
         """Prepare a media data for the request."""
         if self._media is None:
-            content_type, opts = parse_header(self.headers.get('content-type', ''))
+            content_type, opts = parse_header(self.get_header(b'content-type') or '')
             self._media = dict(opts, content_type=content_type)
 
         return self._media
@@ -159,19 +188,21 @@ class Request(t.MutableMapping):
         return self.media.get('charset', DEFAULT_CHARSET)
 
     @property
-    def query(self) -> MultiDict:
+    def query(self) -> MultiDictProxy:
         """A lazy property that parse the current query string and returns it as a
-        :py:class:`multidict.MultiDict`.
+        :py:class:`multidict.MultiDictProxy`.
+
+        The query string is parsed without building :py:attr:`url`.
 
         """
-        return self.url.query
+        return parse_query(self.scope['query_string'])
 
     @property
     def content_type(self) -> str:
         """Get a content type for the current scope."""
         return self.media['content_type']
 
-    async def stream(self) -> t.AsyncGenerator:
+    async def stream(self, max_size: int = 0) -> t.AsyncGenerator:
         """Stream the request's body.
 
         The method provides byte chunks without storing the entire body to memory.
@@ -182,6 +213,9 @@ class Request(t.MutableMapping):
             You can only read stream once. Second call raises an error. Save a readed stream into a
             variable if you need.
 
+        :param max_size: Reject bodies bigger than the size in bytes with
+                         `413 Request Entity Too Large` (`max_body_size` by default)
+
         """
         if not self.receive:
             raise RuntimeError('Request doesnt have a receive coroutine')
@@ -189,35 +223,68 @@ class Request(t.MutableMapping):
         if self._is_read:
             raise RuntimeError('Stream has been read')
 
+        if not max_size or 0 < self.max_body_size < max_size:
+            max_size = self.max_body_size
+
+        if max_size:
+            check_content_length(self, max_size)
+
         self._is_read = True
         message = await self.receive()
-        yield message.get('body', b'')
+        body = message.get('body', b'')
+        size = len(body)
+        if max_size and size > max_size:
+            raise too_large()
+
+        yield body
         while message.get('more_body'):
             message = await self.receive()
-            yield message.get('body', b'')
+            body = message.get('body', b'')
+            if max_size:
+                size += len(body)
+                if size > max_size:
+                    raise too_large()
+
+            yield body
 
     async def body(self) -> bytes:
         """Read and return the request's body as bytes.
 
         `body = await request.body()`
         """
-        if self._body is None:
+        body = self._body
+        if body is None:
             chunks = []
             async for chunk in self.stream():
                 chunks.append(chunk)
 
-            self._body = b"".join(chunks)
+            body = self._body = b"".join(chunks)
+
+        elif not isinstance(body, bytes):
+            body = self._body = bytes(body)
+
+        return body
+
+    async def body_view(self) -> memoryview:
+        """Read the request's body and return it as a memoryview without extra copies.
+
+        The view could be passed to consumers which support buffers (`orjson.loads` and etc).
+
+        `view = await request.body_view()`
+        """
+        if self._body is None:
+            self._body = await read_body(self)
 
-        return self._body
+        return memoryview(self._body)
 
     async def text(self) -> str:
         """Read and return the request's body as a string.
 
         `text = await request.text()`
         """
-        body = await self.body()
+        body = await self.body_view()
         try:
-            return body.decode(self.charset or DEFAULT_CHARSET)
+            return str(body, self.charset or DEFAULT_CHARSET)
         except (LookupError, ValueError):
             raise ASGIDecodeError('Invalid Encoding')
 
@@ -228,10 +295,46 @@ class Request(t.MutableMapping):
 
         """
         try:
-            return json_loads(await self.body())
+            return json_loads(await self.body_view())
         except (LookupError, ValueError):
             raise ASGIDecodeError('Invalid JSON')
 
+    async def json_stream(self, max_size: int = 0) -> t.AsyncGenerator[JSONType, None]:
+        """Parse the request's body as NDJSON (newline delimited JSON) while it's being received.
+
+        :param max_size: Reject bodies bigger than the size in bytes (413 Request Entity Too Large)
+
+        .. code-block:: python
+
+            async for record in request.json_stream():
+                await db.insert(record)
+
+        """
+        buffer = bytearray()
+        stream = self.stream(max_size)
+        try:
+            async for chunk in stream:
+                end = chunk.rfind(b'\n')
+                if end == -1:
+                    buffer += chunk
+                    continue
+
+                buffer += chunk[:end]
+                for line in buffer.split(b'\n'):
+                    if line.strip():
+                        yield json_loads(line)
+
+                buffer = bytearray(chunk[end + 1:])
+
+            if buffer.strip():
+                yield json_loads(buffer)
+
+        except (LookupError, ValueError):
+            raise ASGIDecodeError('Invalid JSON')
+
+        finally:
+            await stream.aclose()
+
     async def form(self, max_size: int = 0, upload_to: t.Callable = None,
                    file_memory_limit: int = 1024 * 1024) -> MultiDict:
         """Read and return the request's multipart formdata as a multidict.
@@ -241,6 +344,11 @@ class Request(t.MutableMapping):
 
         `formdata = await request.form()`
 
+        :param max_size: Reject bodies bigger than the size in bytes (413 Request Entity Too Large)
+        :param upload_to: A callable to get a path for uploaded files
+        :param file_memory_limit: Max size of a file to keep in memory (bigger files are stored
+                                  to temporary files)
+
         """
         from .forms import read_formdata
 
@@ -252,6 +360,27 @@ class Request(t.MutableMapping):
 
         return self._form
 
+    def form_stream(self, max_size: int = 0) -> t.AsyncGenerator:
+        """Iterate over the request's multipart formdata parts while the body is being received.
+
+        Every part has `name`, `filename`, `headers` and is an async iterator over its data,
+        so big files may be sent to a storage without keeping them in memory.
+        Any subsequent calls to :py:meth:`body`, :py:meth:`form` will raise an error.
+
+        .. code-block:: python
+
+            async for part in request.form_stream():
+                if part.filename:
+                    async for chunk in part:
+                        await storage.write(chunk)
+                else:
+                    value = await part.read()
+
+        """
+        from .forms import stream_formdata
+
+        return stream_formdata(self, max_size)
+
     async def data(self, raise_errors: bool = False) -> t.Union[str, bytes, JSONType, MultiDict]:
         """The method checks Content-Type Header and parse the request's data automatically.
 
@@ -276,3 +405,41 @@ class Request(t.MutableMapping):
             if raise_errors:
                 raise
             return await self.body()
+
+
+async def read_body(request: Request) -> t.Union[bytes, bytearray]:
+    """Read the given request's body into a single buffer.
+
+    A single chunk is returned as is, others are appended to a bytearray without keeping them.
+    """
+    body: t.Optional[bytes] = None
+    buffer: t.Optional[bytearray] = None
+    async for chunk in request.stream():
+        if buffer is not None:
+            buffer += chunk
+
+        elif body is None:
+            body = chunk
+
+        else:
+            buffer = bytearray(body)
+            buffer += chunk
+
+    if buffer is None:
+        return body or b''
+
+    return buffer
+
+
+def check_content_length(request: Request, max_size: int):
+    """Reject the request when its content-length is bigger than the given size."""
+    content_length = request.get_header(b'content-length')
+    if content_length and content_length.isdigit() and int(content_length) > max_size:
+        raise too_large()
+
+
+def too_large() -> BaseException:
+    """Build 413 Request Entity Too Large error."""
+    from .response import ResponseError
+
+    return ResponseError.REQUEST_ENTITY_TOO_LARGE()
@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
-from email.utils import formatdate
+import binascii
+from abc import ABCMeta
+from copy import copy
+from email.utils import formatdate, parsedate_to_datetime
 from enum import Enum
 from functools import partial
 from hashlib import md5
@@ -12,62 +15,113 @@ from multidict import MultiDict
 from pathlib import Path
 from urllib.parse import quote, quote_plus
 from stat import S_ISDIR
+from time import monotonic
 import os
 import typing as t
 
 from . import DEFAULT_CHARSET, ASGIError, ASGIConnectionClosed
-from ._compat import aio_wait, FIRST_COMPLETED, aio_stream_file, json_dumps
+from ._compat import (
+    aio_sleep, aio_spawn, aio_cancel, aio_channel, aio_timeout, aio_watch, aio_stream_file,
+    json_dumps)
+from .cookies import dump_cookie
 from .request import Request
-from .typing import Message, ResponseContent, Scope, Receive, Send
+from .typing import Message, ResponseContent, Scope, ScopeHeaders, Receive, Send
 
 
-class Response:
-    """A base class to make ASGI_ responses.
+# Range headers with more ranges are ignored (the whole file is sent)
+MAX_RANGES = 16
 
-    :param content: A response's body
-    :type content: str | bytes
-    :param status_code: An HTTP status code
-    :type status_code: int
-    :param headers: A dictionary of HTTP headers
-    :type headers: dict[str, str]
-    :param content_type: A string with the content-type
-    :type content_type: str
+
+def encode_content_type(content_type: t.Optional[str], charset: str) -> t.Optional[bytes]:
+    """Encode the given content type for a header (add a charset to text types)."""
+    if not content_type:
+        return None
+
+    if content_type.startswith('text/'):
+        content_type = f"{content_type}; charset={charset}"
+
+    return content_type.encode('latin-1')
+
+
+class StatusCode:
+    """Get a response's status code or a response class' default one.
+
+    The responses keep their status codes in `_status` attributes, so the response classes
+    are able to override the default status code with `status_code = ...` class attributes.
     """
 
-    headers: MultiDict  #: Multidict of response's headers
-    cookies: cookies.SimpleCookie
-    """ Set/Update cookies
+    __slots__ = ()
+
+    def __get__(self, response: t.Optional[BaseResponse], owner: t.Type[BaseResponse]) -> int:
+        """Get the status code."""
+        if response is None:
+            return owner._status_code
+
+        return response._status
+
+    def __set__(self, response: BaseResponse, value: int) -> None:
+        """Set the response's status code."""
+        response._status = value
 
-    * `response.cookies[name] = value` ``str`` -- set a cookie's value
-    * `response.cookies[name]['path'] = value` ``str`` -- set a cookie's path
-    * `response.cookies[name]['expires'] = value` ``int`` -- set a cookie's expire
-    * `response.cookies[name]['domain'] = value` ``str`` -- set a cookie's domain
-    * `response.cookies[name]['max-age'] = value` ``int`` -- set a cookie's max-age
-    * `response.cookies[name]['secure'] = value` ``bool``-- is the cookie should only be sent if request is SSL
-    * `response.cookies[name]['httponly'] = value` ``bool`` -- is the cookie should be available through HTTP request only (not from JS)
-    * `response.cookies[name]['samesite'] = value` ``str`` -- set a cookie's strategy ('lax'|'strict'|'none')
 
+class BaseResponse:
+    """Implement the responses' logic without an instance layout.
+
+    The instance layouts (slots) are declared by the concrete classes. The exception
+    responses (:class:`ResponseRedirect`, :class:`ResponseError`) can't share slots with
+    :py:class:`BaseException`, so they are based on the class and registered as
+    :class:`Response` virtual subclasses.
     """
+
+    if not t.TYPE_CHECKING:
+        __slots__ = ()
+
     charset: str = DEFAULT_CHARSET
     content_type: t.Optional[str] = None
-    status_code: int = HTTPStatus.OK.value
+    status_code = StatusCode()
+
+    # Pre-encoded content-type header and default status code (per class)
+    _content_type_header: t.Optional[bytes] = None
+    _status_code: int = HTTPStatus.OK.value
+
+    # The instance attributes
+    __content__: t.Any
+    _status: int
+    _headers: t.Optional[MultiDict]
+    _raw_headers: t.Optional[ScopeHeaders]
+    _cookies: t.Optional[cookies.SimpleCookie]
+
+    def __init_subclass__(cls, **kwargs):
+        """Pre-encode the class' content type, keep the class' default status code."""
+        super().__init_subclass__(**kwargs)
+        cls._content_type_header = encode_content_type(cls.content_type, cls.charset)
+        status_code = cls.__dict__.get('status_code')
+        if isinstance(status_code, int):
+            cls._status_code = status_code
+            delattr(cls, 'status_code')
 
     def __init__(
             self, content: ResponseContent = None, status_code: int = None,
             headers: dict = None, content_type: str = None):
         """Setup the response."""
         self.content = content
-        self.headers: MultiDict = MultiDict(headers or {})
-        self.cookies: cookies.SimpleCookie = cookies.SimpleCookie()
-        if status_code is not None:
-            self.status_code = status_code
-
-        content_type = content_type or self.content_type
-        if content_type:
-            self.headers.setdefault(
-                'content-type', content_type.startswith('text/') and
-                f"{content_type}; charset={self.charset}" or content_type
-            )
+        self._headers = self._cookies = None
+        raw_headers: ScopeHeaders = []
+        self._raw_headers = raw_headers
+        if headers:
+            raw_headers += [
+                (key.encode('latin-1'), str(val).encode('latin-1'))
+                for key, val in (headers.items() if hasattr(headers, 'items') else headers)
+            ]
+
+        self._status = self._status_code if status_code is None else status_code
+
+        content_type_header = (
+            self._content_type_header if content_type is None else
+            encode_content_type(content_type, self.charset))
+        if content_type_header and not (
+                headers and any(name.lower() == b'content-type' for name, _ in raw_headers)):
+            raw_headers.append((b'content-type', content_type_header))
 
     def __str__(self) -> str:
         """Stringify the response."""
@@ -79,11 +133,50 @@ class Response:
 
     async def __call__(self, scope: t.Any, receive: t.Any, send: Send) -> None:
         """Behave as an ASGI application."""
-        self.headers.setdefault('content-length', str(len(self.__content__)))
+        self._set_header('content-length', str(len(self.__content__)), replace=False)
 
         await send(self.msg_start())
         await send({"type": "http.response.body", "body": self.__content__})
 
+    @property
+    def headers(self) -> MultiDict:
+        """Multidict of response's headers, it's created on first access."""
+        if self._headers is None:
+            self._headers = MultiDict([
+                (name.decode('latin-1'), value.decode('latin-1'))
+                for name, value in self._raw_headers or []
+            ])
+            self._raw_headers = None
+
+        return self._headers
+
+    @headers.setter
+    def headers(self, headers: MultiDict):
+        self._headers = headers
+        self._raw_headers = None
+
+    @property
+    def cookies(self) -> cookies.SimpleCookie:
+        """ Set/Update cookies, they are created on first access.
+
+        * `response.cookies[name] = value` ``str`` -- set a cookie's value
+        * `response.cookies[name]['path'] = value` ``str`` -- set a cookie's path
+        * `response.cookies[name]['expires'] = value` ``int`` -- set a cookie's expire
+        * `response.cookies[name]['domain'] = value` ``str`` -- set a cookie's domain
+        * `response.cookies[name]['max-age'] = value` ``int`` -- set a cookie's max-age
+        * `response.cookies[name]['secure'] = value` ``bool``-- is the cookie should only be sent if request is SSL
+        * `response.cookies[name]['httponly'] = value` ``bool`` -- is the cookie should be available through HTTP request only (not from JS)
+        * `response.cookies[name]['samesite'] = value` ``str`` -- set a cookie's strategy ('lax'|'strict'|'none')
+
+        """
+        if self._cookies is None:
+            self._cookies = cookies.SimpleCookie()
+        return self._cookies
+
+    @cookies.setter
+    def cookies(self, value: cookies.SimpleCookie):
+        self._cookies = value
+
     @property
     def content(self):
         """Get self content."""
@@ -106,13 +199,16 @@ class Response:
 
     def msg_start(self) -> Message:
         """Get ASGI response start message."""
-        headers = [
-            (key.encode('latin-1'), str(val).encode('latin-1'))
-            for key, val in self.headers.items()
-        ]
+        headers = self._raw_headers
+        if headers is None:
+            headers = [
+                (key.encode('latin-1'), str(val).encode('latin-1'))
+                for key, val in self.headers.items()
+            ]
 
-        for cookie in self.cookies.values():
-            headers.append((b"set-cookie", cookie.output(header='').strip().encode('latin-1')))
+        if self._cookies:
+            headers = headers + [
+                (b"set-cookie", dump_cookie(morsel)) for morsel in self._cookies.values()]
 
         return {
             "type": "http.response.start",
@@ -120,16 +216,66 @@ class Response:
             "headers": headers,
         }
 
+    def _set_header(self, name: str, value: t.Optional[str], replace: bool = True) -> None:
+        """Set a header without creating the headers multidict.
+
+        :param name: A lowercased header's name
+        :param value: A header's value (None to remove the header)
+        :param replace: Replace the header if it exists, otherwise keep the existing one
+        """
+        raw_headers = self._raw_headers
+        if raw_headers is None:
+            headers = self.headers
+            names = {key for key in headers if key.lower() == name}
+            if names and not replace and value is not None:
+                return
+
+            for key in names:
+                headers.popall(key)
+
+            if value is not None:
+                headers[name] = value
+            return
+
+        bname = name.encode('latin-1')
+        if any(key.lower() == bname for key, _ in raw_headers):
+            if not replace:
+                return
+            raw_headers[:] = [item for item in raw_headers if item[0].lower() != bname]
+
+        if value is not None:
+            raw_headers.append((bname, value.encode('latin-1')))
+
+
+class Response(BaseResponse, metaclass=ABCMeta):
+    """A base class to make ASGI_ responses.
+
+    :param content: A response's body
+    :type content: str | bytes
+    :param status_code: An HTTP status code
+    :type status_code: int
+    :param headers: A dictionary of HTTP headers
+    :type headers: dict[str, str]
+    :param content_type: A string with the content-type
+    :type content_type: str
+    """
+
+    __slots__ = '__content__', '_status', '_headers', '_raw_headers', '_cookies'
+
 
 class ResponseText(Response):
     """A helper to return plain text responses (text/plain)."""
 
+    __slots__ = ()
+
     content_type = 'text/plain'
 
 
 class ResponseHTML(Response):
     """A helper to return HTML responses (text/html)."""
 
+    __slots__ = ()
+
     content_type = 'text/html'
 
 
@@ -140,29 +286,141 @@ class ResponseJSON(Response):
     <https://pypi.org/project/orjson/>`_ JSON libraries. Install one of them to use instead
     the standard library.
 
+    :param stream: Stream the given list (iterable, async iterable) as JSON array chunks
+    :type stream: bool
+    :param batch_size: Serialize lists by batches of the size
+    :type batch_size: int
+
+    The content is serialized when the response is sent (or :attr:`content` is accessed).
+    Big lists are serialized by batches (`batch_size` items) letting the event loop
+    to process other connections between them.
+
+    .. code-block:: python
+
+        async def rows():
+            async for row in db.fetch_rows():
+                yield row
+
+        return ResponseJSON(rows(), stream=True)
+
     """
 
+    __slots__ = 'data', 'stream', 'batch_size'
+
     content_type = 'application/json'
 
-    def dumps(self, content: ResponseContent) -> bytes:
-        """Dumps the given content."""
+    def __init__(self, content: ResponseContent = None, *args, stream: bool = False,
+                 batch_size: int = 10000, **kwargs):
+        """Setup the response."""
+        super(ResponseJSON, self).__init__(content, *args, **kwargs)
+        self.stream = stream
+        self.batch_size = batch_size
+
+    def dumps(self, content: t.Any) -> bytes:
+        """Dumps the given content (any JSON serializable data)."""
         return json_dumps(content)
 
-    @Response.content.setter  # type: ignore
+    @property
+    def content(self):
+        """Get self content, serialize the data on first access."""
+        if self.__content__ is None:
+            self.__content__ = self.dumps(self.data)
+        return self.__content__
+
+    @content.setter
     def content(self, content: ResponseContent):
-        """Jsonify the content."""
-        self.__content__ = self.dumps(content)
+        """Store the content to serialize it later."""
+        self.data = content
+        self.__content__ = None
+
+    async def __call__(self, scope: t.Any, receive: t.Any, send: Send) -> None:
+        """Behave as an ASGI application."""
+        data = self.data
+        if self.__content__ is None:
+            if self.stream and (hasattr(data, '__aiter__') or (
+                    hasattr(data, '__iter__') and not isinstance(data, (dict, str, bytes)))):
+                response = ResponseStream(self.dumps_array(data), status_code=self.status_code)
+                response._raw_headers, response._headers = self._raw_headers, self._headers
+                response._cookies = self._cookies
+                return await response(scope, receive, send)
+
+            if isinstance(data, (list, tuple)) and len(data) > self.batch_size:
+                self.__content__ = b''.join([chunk async for chunk in self.dumps_array(data)])
+            else:
+                self.__content__ = self.dumps(data)
+
+        await super(ResponseJSON, self).__call__(scope, receive, send)
+
+    async def dumps_array(self, items: t.Union[t.Iterable, t.AsyncIterable]) -> t.AsyncGenerator[bytes, None]:
+        """Serialize the given items as JSON array chunks."""
+        batch_size = self.batch_size
+        dumps = self.dumps
+        sep = b'['
+        if hasattr(items, '__aiter__'):
+            batch: t.List[t.Any] = []
+            async for item in items:  # type: ignore
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    yield sep + dumps(batch).strip()[1:-1]
+                    sep, batch = b',', []
+
+            if batch:
+                yield sep + dumps(batch).strip()[1:-1]
+                sep = b','
+
+        else:
+            array = items if isinstance(items, (list, tuple)) else list(items)  # type: ignore
+            for idx in range(0, len(array), batch_size):
+                if idx:
+                    await aio_sleep(0)
+                yield sep + dumps(array[idx:idx + batch_size]).strip()[1:-1]
+                sep = b','
+
+        yield b'[]' if sep == b'[' else b']'
 
 
 class ResponseStream(Response):
-    """A helper to stream a response's body.
+    r"""A helper to stream a response's body.
+
+    :param content: An async iterable to stream the response's body
+    :type content: AsyncIterable
+    :param buffer_size: Coalesce small chunks into messages up to the size in bytes
+                        (0 sends every chunk as a message)
+    :type buffer_size: int
+    :param flush_interval: Max time in seconds to keep coalesced chunks before sending them
+                           (without a queue it's checked when the next chunk arrives)
+    :type flush_interval: float
+    :param queue_size: Read the generator in a separate task ahead of sending, keeping up to
+                       the number of chunks (slow clients block the generator when the queue
+                       is full)
+    :type queue_size: int
+
+    When the buffering is enabled, an empty chunk flushes the coalesced ones.
+
+    .. code-block:: python
+
+        async def rows():
+            async for row in db.fetch_rows():
+                yield ','.join(row) + '\n'
+
+        return ResponseStream(rows(), buffer_size=64 * 1024, flush_interval=.5, queue_size=32)
 
-    :param content: An async generator to stream the response's body
-    :type content: AsyncGenerator
     """
 
+    __slots__ = 'buffer_size', 'flush_interval', 'queue_size'
+
+    def __init__(self, content: t.AsyncIterable[t.Any] = None, *args,
+                 buffer_size: int = 0, flush_interval: float = None, queue_size: int = 0,
+                 **kwargs):
+        """Setup the response."""
+        super(ResponseStream, self).__init__(None, *args, **kwargs)
+        self.content = content
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+
     @Response.content.setter  # type: ignore
-    def content(self, content: t.AsyncGenerator[ResponseContent, None] = None):
+    def content(self, content: t.AsyncIterable[t.Any] = None):
         """Store self content as is."""
         self.__content__ = content  # type: ignore
 
@@ -182,20 +440,110 @@ class ResponseStream(Response):
     async def stream_response(self, send: Send):
         """Stream response content."""
         await send(self.msg_start())
-        if self.content:
-            async for chunk in self.content:
-                await send({"type": "http.response.body",
-                            "body": self.prepare_chunk(chunk), "more_body": True})
+        content = self.content
+        if content:
+            if self.queue_size:
+                await self.stream_queued(send)
+
+            elif self.buffer_size or self.flush_interval:
+                chunks = content.__aiter__()
+
+                async def next_chunk() -> t.Optional[bytes]:
+                    try:
+                        return self.prepare_chunk(await chunks.__anext__())
+                    except StopAsyncIteration:
+                        return None
+
+                await self.send_chunks(next_chunk, send)
+
+            else:
+                async for chunk in content:
+                    await send({"type": "http.response.body",
+                                "body": self.prepare_chunk(chunk), "more_body": True})
 
         await send({"type": "http.response.body", "body": b""})
 
+    async def stream_queued(self, send: Send):
+        """Read the content in a separate task through a bounded queue and send the chunks."""
+        receive_chunk, send_chunk = aio_channel(self.queue_size)
+        async with aio_spawn(self.produce_chunks, send_chunk) as task:
+            try:
+                await self.send_chunks(partial(receive_item_or_raise, receive_chunk), send)
+            except BaseException:
+                await aio_cancel(task)
+                raise
+
+    async def produce_chunks(self, send_chunk: t.Callable[[t.Any], t.Awaitable]):
+        """Read the content into the given channel (None marks the end)."""
+        prepare_chunk = self.prepare_chunk
+        try:
+            async for chunk in self.content:
+                await send_chunk(prepare_chunk(chunk))
+
+        except Exception as exc:
+            await send_chunk(exc)
+
+        else:
+            await send_chunk(None)
+
+    async def send_chunks(self, next_chunk: t.Callable[[], t.Awaitable], send: Send):
+        """Send the prepared chunks, coalesce them when the buffering is enabled."""
+        if self.buffer_size or self.flush_interval:
+            return await self.send_buffered(next_chunk, send)
+
+        while True:
+            chunk = await next_chunk()
+            if chunk is None:
+                return
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+    async def send_buffered(self, next_chunk: t.Callable[[], t.Awaitable], send: Send):
+        """Coalesce the prepared chunks into messages up to the buffer size/flush interval."""
+        flush_interval = self.flush_interval
+        # The buffer is reused for every message
+        view = memoryview(bytearray(self.buffer_size or 64 * 1024))
+        buffer_size = len(view)
+        size, deadline = 0, 0.0
+        # Without a queue the interval is checked only when the next chunk arrives
+        wait_chunks = bool(self.queue_size and flush_interval)
+        while True:
+            # The deadline is armed only for a pending partial buffer (a timer, not a task)
+            if size and wait_chunks:
+                chunk = await wait_chunk(next_chunk, deadline)
+            else:
+                chunk = await next_chunk()
+
+            if chunk is None:
+                break
+
+            chunk_size = len(chunk)
+            if size and (not chunk_size or size + chunk_size > buffer_size):
+                await send({"type": "http.response.body", "body": bytes(view[:size]),
+                            "more_body": True})
+                size = 0
+
+            if chunk_size >= buffer_size:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                continue
+
+            if not size and flush_interval:
+                deadline = monotonic() + flush_interval
+
+            view[size:size + chunk_size] = chunk
+            size += chunk_size
+            if size == buffer_size or (flush_interval and monotonic() >= deadline):
+                await send({"type": "http.response.body", "body": bytes(view[:size]),
+                            "more_body": True})
+                size = 0
+
+        if size:
+            await send({"type": "http.response.body", "body": bytes(view[:size]),
+                        "more_body": True})
+
     async def __call__(self, scope: t.Any, receive: t.Any, send: Send) -> None:
         """Behave as an ASGI application."""
-        await aio_wait(
-            self.listen_for_disconnect(receive),
-            self.stream_response(send),
-            strategy=FIRST_COMPLETED,
-        )
+        # Stream in the current task, the only extra task watches for the client's disconnect
+        await aio_watch(self.stream_response(send), self.listen_for_disconnect, receive)
 
 
 class ResponseSSE(ResponseStream):
@@ -205,22 +553,18 @@ class ResponseSSE(ResponseStream):
     :type content: AsyncGenerator
     """
 
+    __slots__ = ()
+
     content_type = 'text/event-stream'
 
     def msg_start(self) -> Message:
         """Set cache-control header."""
-        self.headers.setdefault('Cache-Control', 'no-cache')
+        self._set_header('cache-control', 'no-cache', replace=False)
         return super(ResponseSSE, self).msg_start()
 
     def prepare_chunk(self, chunk: t.Any) -> bytes:
         """Prepare a chunk from stream generator to send."""
-        if isinstance(chunk, dict):
-            chunk = '\n'.join(f"{k}: {v}" for k, v in chunk.items())
-
-        if not isinstance(chunk, bytes):
-            chunk = str(chunk).encode(self.charset)
-
-        return chunk + b'\n\n'
+        return encode_sse_event(chunk, self.charset)
 
 
 class ResponseFile(ResponseStream):
@@ -234,34 +578,190 @@ class ResponseFile(ResponseStream):
     :type filename: str
     :param headers_only: Return only file headers
     :type headers_only: bool
+    :param stat: The file's stat result (if it's known already)
+    :type stat: os.stat_result
+
+    The response supports conditional (`If-None-Match`, `If-Modified-Since`) and range
+    (`Range`, `If-Range`) requests and answers 304 Not Modified/206 Partial Content.
+
+    If the server supports `http.response.pathsend` or `http.response.zerocopysend`
+    extensions, the file is sent by the server (with `sendfile`) instead of streaming.
 
     """
 
+    __slots__ = ('filepath', 'chunk_size', 'headers_only', 'stat', 'ranges', 'file_type',
+                 'last_modified', 'etag')
+
     def __init__(self, filepath: t.Union[str, Path], *, chunk_size: int = 32 * 1024,
-                 filename: str = None, headers_only: bool = False, **kwargs) -> None:
+                 filename: str = None, headers_only: bool = False,
+                 stat: os.stat_result = None, **kwargs) -> None:
         """Store filepath to self."""
-        try:
-            stat = os.stat(filepath)
-        except FileNotFoundError as exc:
-            raise ASGIError(*exc.args)
+        if stat is None:
+            try:
+                stat = os.stat(filepath)
+            except FileNotFoundError as exc:
+                raise ASGIError(*exc.args)
 
         if S_ISDIR(stat.st_mode):
             raise ASGIError(f"It's a directory: {filepath}")
 
-        stream = aio_stream_file(filepath, chunk_size) if not headers_only else None
-        super(ResponseFile, self).__init__(stream, **kwargs)  # type: ignore
+        super(ResponseFile, self).__init__(None, **kwargs)  # type: ignore
+        self.filepath = filepath
+        self.chunk_size = chunk_size
+        self.headers_only = headers_only
+        self.stat = stat
+        self.ranges: t.Optional[t.List[t.Tuple[int, int]]] = None
+
+        set_header = self._set_header
+        if filename:
+            set_header(
+                'content-disposition', f'attachment; filename="{quote(filename)}"', replace=False)
+
+        self.file_type = guess_type(filename or str(filepath))[0] or "text/plain"
+        set_header('content-type', self.file_type, replace=False)
+        set_header('content-length', str(stat.st_size), replace=False)
+        set_header('accept-ranges', 'bytes', replace=False)
+        self.last_modified = formatdate(stat.st_mtime, usegmt=True)
+        set_header('last-modified', self.last_modified, replace=False)
+        etag = str(stat.st_mtime) + "-" + str(stat.st_size)
+        self.etag = md5(etag.encode()).hexdigest()
+        set_header('etag', self.etag, replace=False)
+
+    def clone(self, headers_only: bool = False) -> ResponseFile:
+        """Copy the prepared response to send the file again without filesystem calls."""
+        response = copy(self)
+        response.headers_only = headers_only
+        if self._headers is None:
+            response._raw_headers = list(self._raw_headers or ())
+        else:
+            response._headers = self._headers.copy()
 
-        headers = self.headers
-        if filename and 'content-disposition' not in headers:
-            headers['content-disposition'] = f'attachment; filename="{quote(filename)}"'
+        if self._cookies is not None:
+            response._cookies = copy(self._cookies)
 
-        if 'content-type' not in headers:
-            headers['content-type'] = guess_type(filename or str(filepath))[0] or "text/plain"
+        return response
 
-        headers.setdefault('content-length', str(stat.st_size))
-        headers.setdefault('last-modified', formatdate(stat.st_mtime, usegmt=True))
-        etag = str(stat.st_mtime) + "-" + str(stat.st_size)
-        headers.setdefault('etag', md5(etag.encode()).hexdigest())
+    def process_conditions(self, scope: Scope) -> None:
+        """Check the request's conditional and range headers, update the response."""
+        method = scope.get('method')
+        if method not in {'GET', 'HEAD'}:
+            return
+
+        headers = {
+            name.lower(): value.decode('latin-1') for name, value in scope.get('headers') or []
+            if name.lower() in {b'if-none-match', b'if-modified-since', b'range', b'if-range'}
+        }
+        if not headers:
+            return
+
+        if self.is_not_modified(headers.get(b'if-none-match'), headers.get(b'if-modified-since')):
+            self.status_code = 304
+            self.headers_only = True
+            for name in ('content-length', 'content-type', 'content-disposition'):
+                self._set_header(name, None)
+            return
+
+        range_header = headers.get(b'range')
+        if not range_header or method != 'GET':
+            return
+
+        if_range = headers.get(b'if-range')
+        if if_range and if_range.strip().strip('"') not in {self.etag, self.last_modified}:
+            return
+
+        size = self.stat.st_size
+        ranges = parse_ranges(range_header, size)
+        if ranges is None:
+            return
+
+        if not ranges:
+            self.status_code = 416
+            self.headers_only = True
+            self._set_header('content-range', f"bytes */{size}")
+            self._set_header('content-length', '0')
+            return
+
+        self.status_code = 206
+        self.ranges = ranges
+        if len(ranges) == 1:
+            start, end = ranges[0]
+            self._set_header('content-range', f"bytes {start}-{end}/{size}")
+            self._set_header('content-length', str(end - start + 1))
+
+    def is_not_modified(self, if_none_match: t.Optional[str],
+                        if_modified_since: t.Optional[str]) -> bool:
+        """Check the response for the given conditions."""
+        if if_none_match is not None:
+            if if_none_match.strip() == '*':
+                return True
+
+            return self.etag in parse_etags(if_none_match)
+
+        if if_modified_since:
+            try:
+                return int(self.stat.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+
+        return False
+
+    async def stream_ranges(self, boundary: bytes) -> t.AsyncGenerator[bytes, None]:
+        """Stream the response's ranges as multipart/byteranges."""
+        for start, end in self.ranges or []:
+            yield self.range_head(boundary, start, end)
+            async for chunk in aio_stream_file(self.filepath, self.chunk_size, start, end - start + 1):
+                yield chunk
+            yield b"\r\n"
+
+        yield b"--%b--\r\n" % boundary
+
+    def range_head(self, boundary: bytes, start: int, end: int) -> bytes:
+        """Prepare a multipart/byteranges part's head."""
+        return (
+            b"--%b\r\ncontent-type: %b\r\ncontent-range: bytes %d-%d/%d\r\n\r\n" %
+            (boundary, self.file_type.encode('latin-1'), start, end, self.stat.st_size))
+
+    async def __call__(self, scope: t.Any, receive: t.Any, send: Send) -> None:
+        """Behave as an ASGI application."""
+        if scope and self.status_code == 200:
+            self.process_conditions(scope)
+
+        if not self.headers_only and self.__content__ is None:
+            extensions = scope and scope.get('extensions') or {}
+            ranges = self.ranges
+            if ranges and len(ranges) > 1:
+                boundary = binascii.hexlify(os.urandom(8))
+                self._set_header('content-type', f"multipart/byteranges; boundary={boundary.decode()}")
+                self._set_header('content-length', str(
+                    sum(len(self.range_head(boundary, start, end)) + end - start + 3 for start, end in ranges) +
+                    len(boundary) + 6))
+                self.content = self.stream_ranges(boundary)
+
+            elif ranges:
+                start, end = ranges[0]
+                if 'http.response.zerocopysend' in extensions:
+                    with open(self.filepath, 'rb') as fp:
+                        await send(self.msg_start())
+                        return await send({
+                            "type": "http.response.zerocopysend", "file": fp,
+                            "offset": start, "count": end - start + 1})
+
+                self.content = aio_stream_file(self.filepath, self.chunk_size, start, end - start + 1)
+
+            elif 'http.response.pathsend' in extensions:
+                await send(self.msg_start())
+                return await send({
+                    "type": "http.response.pathsend", "path": os.path.abspath(self.filepath)})
+
+            elif 'http.response.zerocopysend' in extensions:
+                with open(self.filepath, 'rb') as fp:
+                    await send(self.msg_start())
+                    return await send({"type": "http.response.zerocopysend", "file": fp})
+
+            else:
+                self.content = aio_stream_file(self.filepath, self.chunk_size)
+
+        await super(ResponseFile, self).__call__(scope, receive, send)
 
 
 class ResponseWebSocket(Response):
@@ -273,6 +773,8 @@ class ResponseWebSocket(Response):
     :param send: ASGI send function
     """
 
+    __slots__ = '_receive', '_send', 'state', 'partner_state'
+
     class STATES(Enum):
         """Represent websocket states."""
 
@@ -347,6 +849,116 @@ class ResponseWebSocket(Response):
         """Serialize the given data to JSON and send to a client."""
         return await self._send({'type': 'websocket.send', 'bytes': json_dumps(data)})
 
+    async def send_many(self, messages: t.Iterable[t.Union[t.Dict, str, bytes]],
+                        type='websocket.send') -> None:
+        """Send the given messages to a client (the connection's state is checked once)."""
+        if self.state == self.STATES.disconnected:
+            raise ASGIConnectionClosed('Cannot send once the connection has been disconnected.')
+
+        send = self._send
+        for msg in messages:
+            if not isinstance(msg, dict):
+                msg = {'type': type, (isinstance(msg, str) and 'text' or 'bytes'): msg}
+            await send(msg)
+
+    async def send_json_many(self, items: t.Union[t.Iterable, t.AsyncIterable],
+                             window: float = 0) -> None:
+        """Serialize the given items to JSON and send them to a client.
+
+        :param items: An iterable or an async iterable with the items
+        :param window: Coalesce the items produced within the time window (in seconds)
+                       into JSON arrays (0 sends every item as a message)
+        """
+        if self.state == self.STATES.disconnected:
+            raise ASGIConnectionClosed('Cannot send once the connection has been disconnected.')
+
+        if window:
+            return await self.send_json_batches(items, window)
+
+        send, dumps = self._send, json_dumps
+        if hasattr(items, '__aiter__'):
+            async for item in items:  # type: ignore
+                await send({'type': 'websocket.send', 'bytes': dumps(item)})
+        else:
+            for item in items:  # type: ignore
+                await send({'type': 'websocket.send', 'bytes': dumps(item)})
+
+    async def send_json_batches(self, items: t.Union[t.Iterable, t.AsyncIterable],
+                                window: float) -> None:
+        """Send the items produced within the time window as JSON arrays."""
+        receive_item, send_item = aio_channel()
+        end = object()
+
+        batch: t.List = []
+
+        async def collect_items() -> bool:
+            while True:
+                item = await receive_item_or_raise(receive_item)
+                if item is end:
+                    return True
+                batch.append(item)
+
+        send, dumps = self._send, json_dumps
+        finished = False
+        async with aio_spawn(self.produce_items, items, send_item, end) as task:
+            try:
+                while not finished:
+                    item = await receive_item_or_raise(receive_item)
+                    if item is end:
+                        break
+
+                    # Collect the others produced within the window (a single timeout per batch)
+                    batch.append(item)
+                    try:
+                        finished = await aio_timeout(window, collect_items)
+                    except TimeoutError:
+                        pass
+
+                    await send({'type': 'websocket.send', 'bytes': dumps(batch)})
+                    batch.clear()
+
+            except BaseException:
+                await aio_cancel(task)
+                raise
+
+    async def produce_items(self, items: t.Union[t.Iterable, t.AsyncIterable],
+                            send_item: t.Callable[[t.Any], t.Awaitable], end: t.Any):
+        """Read the items into the given channel (the given end marks the end)."""
+        try:
+            if hasattr(items, '__aiter__'):
+                async for item in items:  # type: ignore
+                    await send_item(item)
+            else:
+                for item in items:  # type: ignore
+                    await send_item(item)
+
+        except Exception as exc:
+            await send_item(exc)
+
+        else:
+            await send_item(end)
+
+    def __aiter__(self) -> ResponseWebSocket:
+        """Iterate over the client's messages until it's disconnected (``async for msg in ws``)."""
+        if self.partner_state == self.STATES.disconnected:
+            raise ASGIConnectionClosed('Cannot receive once a connection has been disconnected.')
+
+        return self
+
+    async def __anext__(self) -> t.Union[Message, str]:
+        """Receive the next message."""
+        msg = await self._receive()
+        msg_type = msg['type']
+        if msg_type == 'websocket.disconnect':
+            self.partner_state = self.STATES.disconnected
+            raise StopAsyncIteration
+
+        if msg_type == 'websocket.connect':
+            self.partner_state = self.STATES.connected
+            return await self.__anext__()
+
+        return parse_websocket_msg(msg, charset=self.charset)
+
     async def receive(self, raw: bool = False) -> t.Union[Message, str]:
         """Receive messages from a client.
 
@@ -366,23 +978,30 @@ class ResponseWebSocket(Response):
         return raw and msg or parse_websocket_msg(msg, charset=self.charset)
 
 
-class ResponseRedirect(Response, BaseException):
+if t.TYPE_CHECKING:
+    # The exception responses are Response's virtual subclasses
+    ExceptionResponse = Response
+else:
+    ExceptionResponse = BaseResponse
+
+
+class ResponseRedirect(ExceptionResponse, BaseException):
     """A helper to return HTTP redirects. Uses a 307 status code by default.
 
     :param url: A string with the new location
     :type url: str
     """
 
-    status_code: int = HTTPStatus.TEMPORARY_REDIRECT.value
+    status_code = HTTPStatus.TEMPORARY_REDIRECT.value
 
     def __init__(self, url: str, status_code: int = None, **kwargs) -> None:
         """Set status code and prepare location."""
         super(ResponseRedirect, self).__init__(status_code=status_code, **kwargs)
         assert 300 <= self.status_code < 400, f"Invalid status code for redirection: {self.status_code}"  # noqa
-        self.headers["location"] = quote_plus(str(url), safe=":/%#?&=@[]!$&'()*+,;")
+        self._set_header('location', quote_plus(str(url), safe=":/%#?&=@[]!$&'()*+,;"))
 
 
-class ResponseErrorMeta(type):
+class ResponseErrorMeta(ABCMeta):
     """Generate Response Errors by HTTP names."""
 
     # XXX: From python 3.9 -> partial['ResponseError]
@@ -392,7 +1011,7 @@ class ResponseErrorMeta(type):
         return partial(cls, status_code=status.value)
 
 
-class ResponseError(Response, BaseException, metaclass=ResponseErrorMeta):
+class ResponseError(ExceptionResponse, BaseException, metaclass=ResponseErrorMeta):
     """A helper to return HTTP errors. Uses a 500 status code by default.
 
     :param message: A string with the error's message (HTTPStatus messages will be used by default)
@@ -409,7 +1028,7 @@ class ResponseError(Response, BaseException, metaclass=ResponseErrorMeta):
 
     """
 
-    status_code: int = HTTPStatus.INTERNAL_SERVER_ERROR.value
+    status_code = HTTPStatus.INTERNAL_SERVER_ERROR.value
 
     # Typing annotations
     if t.TYPE_CHECKING:
@@ -464,6 +1083,10 @@ class ResponseError(Response, BaseException, metaclass=ResponseErrorMeta):
         self.content = message or HTTPStatus(self.status_code).description
 
 
+Response.register(ResponseRedirect)
+Response.register(ResponseError)
+
+
 CAST_RESPONSE: t.Dict[t.Type, t.Type[Response]] = {
     bool: ResponseJSON,
     bytes: ResponseHTML,
@@ -478,7 +1101,7 @@ CAST_RESPONSE: t.Dict[t.Type, t.Type[Response]] = {
 def parse_response(response: t.Any, headers: t.Dict = None) -> Response:
     """Parse the given object and convert it into a asgi_tools.Response."""
     rtype = type(response)
-    if issubclass(rtype, Response):
+    if issubclass(rtype, BaseResponse):
         return response
 
     ResponseType = CAST_RESPONSE.get(rtype)
@@ -497,6 +1120,118 @@ def parse_response(response: t.Any, headers: t.Dict = None) -> Response:
     return ResponseText(str(response), headers=headers)
 
 
+def parse_ranges(value: str, size: int,
+                 max_ranges: int = MAX_RANGES) -> t.Optional[t.List[t.Tuple[int, int]]]:
+    """Parse the given Range header value, merge overlapping and adjacent ranges.
+
+    Return None for invalid values or too many ranges and an empty list when the ranges are
+    not satisfiable.
+    """
+    unit, _, ranges_spec = value.partition('=')
+    if unit.strip().lower() != 'bytes':
+        return None
+
+    specs = ranges_spec.split(',')
+    if len(specs) > max_ranges:
+        return None
+
+    ranges: t.List[t.Tuple[int, int]] = []
+    try:
+        for spec in specs:
+            byte_range = parse_range(spec, size)
+            if byte_range:
+                ranges.append(byte_range)
+
+    except ValueError:
+        return None
+
+    return merge_ranges(ranges)
+
+
+def parse_range(spec: str, size: int) -> t.Optional[t.Tuple[int, int]]:
+    """Parse the given byte range spec, return None when the range is not satisfiable.
+
+    Raise ValueError for invalid specs.
+    """
+    first, sep, last = spec.strip().partition('-')
+    if not sep:
+        raise ValueError(f"Invalid range: {spec}")
+
+    # Suffix range (the last N bytes)
+    if not first:
+        length = int(last)
+        return (max(size - length, 0), size - 1) if length > 0 and size else None
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and end < start:
+        raise ValueError(f"Invalid range: {spec}")
+
+    return (start, min(end, size - 1)) if start < size else None
+
+
+def merge_ranges(ranges: t.List[t.Tuple[int, int]]) -> t.List[t.Tuple[int, int]]:
+    """Sort the given ranges, merge the overlapping and adjacent ones."""
+    merged: t.List[t.Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+        else:
+            merged.append((start, end))
+
+    return merged
+
+
+def parse_etags(value: str) -> t.Set[str]:
+    """Parse the given If-None-Match header value (weak tags are compared as strong ones)."""
+    etags = set()
+    for etag in value.split(','):
+        etag = etag.strip()
+        if etag.startswith('W/'):
+            etag = etag[2:]
+        etags.add(etag.strip('"'))
+
+    return etags
+
+
+async def receive_item_or_raise(receive: t.Callable[[], t.Awaitable]) -> t.Any:
+    """Receive an item from the given channel, raise the producer's errors."""
+    item = await receive()
+    if isinstance(item, Exception):
+        raise item
+    return item
+
+
+async def wait_chunk(next_chunk: t.Callable[[], t.Awaitable], deadline: float) -> t.Any:
+    """Wait for the next chunk until the deadline, return an empty chunk on timeout."""
+    try:
+        return await aio_timeout(max(deadline - monotonic(), 0), next_chunk)
+    except TimeoutError:
+        return b''
+
+
+def encode_sse_event(event: t.Any, charset: str = DEFAULT_CHARSET) -> bytes:
+    """Encode the given SSE event (a dict, str or bytes)."""
+    if isinstance(event, dict):
+        event = '\n'.join(f"{k}: {v}" for k, v in event.items())
+
+    if not isinstance(event, bytes):
+        event = str(event).encode(charset)
+
+    return event + b'\n\n'
+
+
+def encode_websocket_msg(data: t.Any) -> Message:
+    """Prepare a websocket message (str as text, bytes as is, others as JSON bytes)."""
+    if isinstance(data, str):
+        return {'type': 'websocket.send', 'text': data}
+
+    if isinstance(data, bytes):
+        return {'type': 'websocket.send', 'bytes': data}
+
+    return {'type': 'websocket.send', 'bytes': json_dumps(data)}
+
+
 def parse_websocket_msg(msg: Message, charset: str = None) -> t.Union[Message, str]:
     """Prepare websocket message."""
     data = msg.get('text')
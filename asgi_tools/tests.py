@@ -3,7 +3,6 @@ import io
 import mimetypes
 import os
 import typing as t
-from collections import deque
 from contextlib import asynccontextmanager
 from functools import partial
 from http import cookies
@@ -14,9 +13,9 @@ from urllib.parse import urlencode
 from yarl import URL
 
 from . import ASGIConnectionClosed
-from ._compat import aio_sleep, aio_spawn, aio_wait, aio_cancel, FIRST_COMPLETED
+from ._compat import aio_sleep, aio_spawn, aio_channel, aio_wait, aio_cancel, FIRST_COMPLETED
 from .response import Response, ResponseWebSocket, parse_websocket_msg
-from .utils import to_awaitable, parse_headers, CIMultiDict
+from .utils import parse_headers, CIMultiDict
 from .typing import JSONType, Scope, Receive, Send, Message, ASGIApp
 
 
@@ -258,14 +257,8 @@ def encode_multipart(data: t.Dict) -> t.Tuple[bytes, str]:
 
 
 def simple_stream(maxlen=None):
-    queue = deque(maxlen=maxlen)
-
-    async def receive():
-        while not queue:
-            await aio_sleep(1e-3)
-        return queue.popleft()
-
-    return receive, to_awaitable(queue.append)
+    """Create a (receive, send) pair to exchange ASGI messages."""
+    return aio_channel(maxlen or 0)
 
 
 async def raise_timeout(timeout: t.Union[int, float]):
@@ -1,10 +1,11 @@
 """ASGI-Tools Utils."""
 
-from functools import wraps
+from functools import wraps, lru_cache
 from inspect import iscoroutinefunction, isasyncgenfunction
 from typing import Callable, Awaitable
+from urllib.parse import parse_qsl
 
-from multidict import CIMultiDict
+from multidict import CIMultiDict, MultiDict, MultiDictProxy
 
 from .typing import ScopeHeaders
 
@@ -29,3 +30,10 @@ def to_awaitable(fn: Callable) -> Callable[..., Awaitable]:
 def parse_headers(headers: ScopeHeaders) -> CIMultiDict:
     """Decode the given headers list."""
     return CIMultiDict([(n.decode('latin-1'), v.decode('latin-1')) for n, v in headers])
+
+
+@lru_cache(maxsize=1024)
+def parse_query(query_string: bytes) -> MultiDictProxy:
+    """Parse the given query string (the results are immutable, so they are cached)."""
+    return MultiDictProxy(MultiDict(
+        parse_qsl(query_string.decode('latin-1'), keep_blank_values=True)))
@@ -1,5 +1,793 @@
+"""Gunicorn worker to run ASGI applications.
+
+.. code-block:: console
+
+    $ gunicorn --worker-class asgi_tools.worker.ASGIWorker --workers 4 app:app
+
+"""
+
+import asyncio
+import os
+import re
+import signal
+import sys
+import time
+import typing as t
+from email.utils import formatdate
+from http import HTTPStatus
+from urllib.parse import unquote
+
 from gunicorn.workers.base import Worker
 
+from . import asgi_logger
+from .typing import ASGIApp, Message, Scope
+
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None  # type: ignore
+
+
+MAX_HEADERS_SIZE = 64 * 1024
+HIGH_WATER_LIMIT = 64 * 1024
+
+STATUS_LINES: t.Dict[int, bytes] = {
+    status.value: f"HTTP/1.1 {status.value} {status.phrase}\r\n".encode('latin-1')
+    for status in HTTPStatus
+}
+
+RESPONSE_400 = b'HTTP/1.1 400 Bad Request\r\ncontent-length: 0\r\nconnection: close\r\n\r\n'
+RESPONSE_431 = (
+    b'HTTP/1.1 431 Request Header Fields Too Large\r\n'
+    b'content-length: 0\r\nconnection: close\r\n\r\n'
+)
+RESPONSE_500 = (
+    b'HTTP/1.1 500 Internal Server Error\r\n'
+    b'content-type: text/plain; charset=utf-8\r\ncontent-length: 21\r\n'
+    b'connection: close\r\n\r\nInternal Server Error'
+)
+
+# Strict formats of body lengths (no signs, underscores, spaces or prefixes)
+CONTENT_LENGTH_RE = re.compile(rb'[0-9]+')
+CHUNK_SIZE_RE = re.compile(rb'[0-9A-Fa-f]+')
+
+# Chunked request body parser states
+CHUNK_SIZE = -1
+CHUNK_END = -2
+CHUNK_TRAILERS = -3
+
+
+class HTTPProtocol(asyncio.Protocol):
+    """A lean HTTP/1.1 protocol which builds ASGI scopes and calls an application.
+
+    The protocol supports keep-alive connections, pipelined requests, chunked request/response
+    bodies and write backpressure (:meth:`RequestCycle.send` waits while the transport's buffer
+    is full).
+
+    :param app: An ASGI application
+    :param keepalive: Seconds to keep an idle connection open
+    :param root_path: ASGI root path
+    :param connections: A set to track the opened connections
+    :param on_request: A callback which is called for every parsed request
+    :param logger: A logger to report application errors
+
+    """
+
+    def __init__(self, app: ASGIApp, *, keepalive: float = 5.0, root_path: str = '',
+                 max_headers_size: int = MAX_HEADERS_SIZE, connections: t.Set = None,
+                 on_request: t.Callable = None, logger=asgi_logger) -> None:
+        """Initialize the protocol."""
+        self.app = app
+        self.keepalive = keepalive
+        self.root_path = root_path
+        self.max_headers_size = max_headers_size
+        self.connections = set() if connections is None else connections
+        self.on_request = on_request
+        self.logger = logger
+
+        self.loop = asyncio.get_event_loop()
+        self.transport: t.Optional[asyncio.Transport] = None
+        self.server: t.Optional[t.Tuple[str, int]] = None
+        self.client: t.Optional[t.Tuple[str, int]] = None
+        self.scheme = 'http'
+
+        self.buffer = bytearray()
+        self.cycle: t.Optional[RequestCycle] = None
+        self.closed = False
+        self.reading_paused = False
+        self.writable = asyncio.Event()
+        self.writable.set()
+        self.keepalive_handle: t.Optional[asyncio.TimerHandle] = None
+
+    # Protocol interface
+    # ------------------
+
+    def connection_made(self, transport):  # type: ignore
+        """Initialize the connection."""
+        self.transport = transport
+        self.connections.add(self)
+        self.server = get_address(transport.get_extra_info('sockname'))
+        self.client = get_address(transport.get_extra_info('peername'))
+        if transport.get_extra_info('sslcontext'):
+            self.scheme = 'https'
+
+    def connection_lost(self, exc: t.Optional[Exception]) -> None:
+        """Notify the current request cycle that the client has gone."""
+        self.closed = True
+        self.connections.discard(self)
+        self.cancel_keepalive()
+        self.writable.set()
+        if self.cycle:
+            self.cycle.disconnected = True
+            self.cycle.event.set()
+
+    def data_received(self, data: bytes) -> None:
+        """Buffer the data and process it."""
+        self.cancel_keepalive()
+        self.buffer += data
+        self.process()
+
+    def eof_received(self) -> None:
+        """Close the connection when the client stops writing."""
+        pass
+
+    def pause_writing(self) -> None:
+        """Block the senders until the transport's buffer is drained."""
+        self.writable.clear()
+
+    def resume_writing(self) -> None:
+        """Unblock the senders."""
+        self.writable.set()
+
+    # Processing
+    # ----------
+
+    def process(self) -> None:
+        """Parse the buffered data, start request cycles and feed their bodies."""
+        buffer = self.buffer
+        while not self.closed:
+            cycle = self.cycle
+            if cycle is None:
+                if not buffer or not self.start_cycle():
+                    break
+                continue
+
+            if cycle.more_body:
+                if not self.feed_body(cycle):
+                    return
+
+                if cycle.more_body:
+                    break
+
+            # Keep pipelined requests in the buffer until the current response is complete
+            if not cycle.response_complete:
+                if len(buffer) > HIGH_WATER_LIMIT:
+                    self.pause_reading()
+                break
+
+            self.cycle = None
+
+        if self.cycle is None and not buffer and not self.closed:
+            self.cancel_keepalive()
+            self.keepalive_handle = self.loop.call_later(self.keepalive, self.shutdown)
+
+    def start_cycle(self) -> bool:
+        """Parse a request's head and run the application."""
+        buffer = self.buffer
+        while buffer[:2] == b'\r\n':
+            del buffer[:2]
+
+        idx = buffer.find(b'\r\n\r\n')
+        if idx < 0:
+            if len(buffer) > self.max_headers_size:
+                self.abort(RESPONSE_431)
+            return False
+
+        head = bytes(buffer[:idx])
+        del buffer[:idx + 4]
+        try:
+            self.cycle = cycle = RequestCycle(self, *parse_head(head))
+        except ValueError:
+            self.abort(RESPONSE_400)
+            return False
+
+        if self.on_request is not None:
+            self.on_request()
+
+        cycle.task = self.loop.create_task(self.run_asgi(cycle))
+        return True
+
+    def feed_body(self, cycle: 'RequestCycle') -> bool:
+        """Move the request's body from the buffer to the request cycle."""
+        buffer = self.buffer
+        body = cycle.body
+        if cycle.chunk_left is None:
+            size = min(len(buffer), cycle.body_left)
+            body += buffer[:size]
+            del buffer[:size]
+            cycle.body_left -= size
+            cycle.more_body = cycle.body_left > 0
+
+        else:
+            try:
+                cycle.more_body = feed_chunked(cycle, buffer)
+            except ValueError:
+                self.abort(RESPONSE_400)
+                return False
+
+        # The response has been sent already, drop the unread body
+        if cycle.response_complete:
+            body.clear()
+
+        elif len(body) > HIGH_WATER_LIMIT:
+            self.pause_reading()
+
+        cycle.event.set()
+        return True
+
+    async def run_asgi(self, cycle: 'RequestCycle') -> None:
+        """Run the application for the given request cycle."""
+        try:
+            await self.app(cycle.scope, cycle.receive, cycle.send)
+
+        except BaseException as exc:  # noqa
+            self.logger.exception(exc)
+            if not cycle.response_started:
+                return self.abort(RESPONSE_500)
+
+            if not cycle.response_complete:
+                return self.abort()
+
+        else:
+            if not cycle.response_started:
+                self.abort(RESPONSE_500)
+
+            elif not cycle.response_complete:
+                self.abort()
+
+    def response_complete(self, cycle: 'RequestCycle') -> None:
+        """Start processing the next request or close the connection."""
+        if self.closed:
+            return
+
+        if not cycle.keep_alive:
+            self.closed = True
+            self.transport.close()  # type: ignore
+            return
+
+        self.resume_reading()
+        self.process()
+
+    # Connection management
+    # ---------------------
+
+    def pause_reading(self) -> None:
+        """Stop reading from the transport."""
+        if not self.reading_paused:
+            self.reading_paused = True
+            self.transport.pause_reading()  # type: ignore
+
+    def resume_reading(self) -> None:
+        """Continue reading from the transport."""
+        if self.reading_paused:
+            self.reading_paused = False
+            self.transport.resume_reading()  # type: ignore
+
+    def cancel_keepalive(self) -> None:
+        """Cancel the keep-alive timeout."""
+        if self.keepalive_handle is not None:
+            self.keepalive_handle.cancel()
+            self.keepalive_handle = None
+
+    def shutdown(self) -> None:
+        """Close the connection when the current response is complete."""
+        if self.cycle is None or self.cycle.response_complete:
+            self.abort()
+
+        else:
+            self.cycle.keep_alive = False
+
+    def abort(self, response: bytes = b'') -> None:
+        """Write the given response and close the connection."""
+        if self.closed:
+            return
+
+        self.closed = True
+        if response:
+            self.transport.write(response)  # type: ignore
+        self.transport.close()  # type: ignore
+
+
+class RequestCycle:
+    """Keep a request's state and implement ASGI receive/send callables."""
+
+    __slots__ = (
+        'protocol', 'scope', 'body', 'body_left', 'chunk_left', 'more_body', 'keep_alive',
+        'expect_100', 'event', 'task', 'request_sent', 'disconnected', 'response_started',
+        'response_complete', 'response_chunked', 'headers_only'
+    )
+
+    def __init__(self, protocol: HTTPProtocol, scope: Scope, body_left: int,
+                 chunked: bool, keep_alive: bool, expect_100: bool) -> None:
+        """Initialize the cycle."""
+        self.protocol = protocol
+        scope['server'] = protocol.server
+        scope['client'] = protocol.client
+        scope['scheme'] = protocol.scheme
+        scope['root_path'] = protocol.root_path
+        self.scope = scope
+        self.body = bytearray()
+        self.body_left = body_left
+        self.chunk_left: t.Optional[int] = CHUNK_SIZE if chunked else None
+        self.more_body = chunked or body_left > 0
+        self.keep_alive = keep_alive
+        self.expect_100 = expect_100
+        self.event = asyncio.Event()
+        self.task: t.Optional[asyncio.Task] = None
+
+        self.request_sent = False
+        self.disconnected = False
+        self.response_started = False
+        self.response_complete = False
+        self.response_chunked = False
+        self.headers_only = scope['method'] == 'HEAD'
+
+    async def receive(self) -> Message:
+        """Receive the request's body, wait for the client's disconnect."""
+        protocol = self.protocol
+        if self.expect_100:
+            self.expect_100 = False
+            if not self.response_started:
+                protocol.transport.write(b'HTTP/1.1 100 Continue\r\n\r\n')  # type: ignore
+
+        while not (self.disconnected or self.response_complete):
+            if self.body or not (self.more_body or self.request_sent):
+                body = bytes(self.body)
+                self.body.clear()
+                self.request_sent = True
+                protocol.resume_reading()
+                return {'type': 'http.request', 'body': body, 'more_body': self.more_body}
+
+            self.event.clear()
+            await self.event.wait()
+
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message: Message) -> None:
+        """Write the given message to the transport."""
+        protocol = self.protocol
+        if self.disconnected:
+            return
+
+        if not protocol.writable.is_set():
+            await protocol.writable.wait()
+            if self.disconnected:
+                return
+
+        if not self.response_started:
+            return self.start_response(message)
+
+        if self.response_complete:
+            raise RuntimeError('Response already completed')
+
+        if message['type'] == 'http.response.pathsend':
+            if not self.headers_only:
+                await self.sendfile(message['path'])
+
+            more_body = False
+
+        elif message['type'] != 'http.response.body':
+            raise RuntimeError(f"Expected 'http.response.body', got '{message['type']}'")
+
+        else:
+            more_body = self.write_body(message.get('body', b''), message.get('more_body', False))
+
+        if not more_body:
+            self.response_complete = True
+            self.event.set()
+            protocol.response_complete(self)
+
+    def start_response(self, message: Message) -> None:
+        """Write the response's head to the transport."""
+        if message['type'] != 'http.response.start':
+            raise RuntimeError(f"Expected 'http.response.start', got '{message['type']}'")
+
+        self.response_started = True
+        head = self.build_head(message['status'], message.get('headers', []))
+        self.protocol.transport.write(head)  # type: ignore
+
+    def write_body(self, body: bytes, more_body: bool) -> bool:
+        """Write the given body chunk to the transport."""
+        transport = self.protocol.transport
+        if not self.headers_only:
+            if self.response_chunked:
+                if body:
+                    transport.write(b'%x\r\n%b\r\n' % (len(body), body))  # type: ignore
+                if not more_body:
+                    transport.write(b'0\r\n\r\n')  # type: ignore
+
+            elif body:
+                transport.write(body)  # type: ignore
+
+        return more_body
+
+    async def sendfile(self, path: str) -> None:
+        """Send the given file with `os.sendfile` if the transport supports it.
+
+        Otherwise the file is read in the loop's default executor to not block the loop.
+        """
+        protocol = self.protocol
+        loop = asyncio.get_event_loop()
+        with open(path, 'rb') as fp:
+            if not self.response_chunked:
+                try:
+                    await loop.sendfile(protocol.transport, fp, fallback=False)  # type: ignore
+                    return
+                # The loop (uvloop) or the transport (SSL) doesn't support sendfile
+                except (NotImplementedError, RuntimeError):
+                    pass
+
+            while not self.disconnected:
+                chunk = await loop.run_in_executor(None, fp.read, HIGH_WATER_LIMIT)
+                if not chunk:
+                    break
+
+                self.write_body(chunk, True)
+                if not protocol.writable.is_set():
+                    await protocol.writable.wait()
+
+        self.write_body(b'', False)
+
+    def build_head(self, status: int, headers: t.Iterable[t.Tuple[bytes, bytes]]) -> bytes:
+        """Prepare the response's status line and headers."""
+        head = bytearray(STATUS_LINES.get(status) or b'HTTP/1.1 %d \r\n' % status)
+        has_length = has_date = False
+        for name, value in headers:
+            lname = name.lower()
+            if lname == b'content-length':
+                has_length = True
+            elif lname == b'date':
+                has_date = True
+            elif lname == b'connection' and value.lower() == b'close':
+                self.keep_alive = False
+            head += b'%b: %b\r\n' % (name, value)
+
+        if not has_date:
+            head += get_date_header()
+
+        if not (has_length or self.headers_only or status < 200 or status in {204, 304}):
+            if self.keep_alive and self.scope['http_version'] == '1.1':
+                self.response_chunked = True
+                head += b'transfer-encoding: chunked\r\n'
+            else:
+                self.keep_alive = False
+
+        # We are not going to read the rest of unread body
+        if self.more_body and self.chunk_left is None and self.body_left > HIGH_WATER_LIMIT:
+            self.keep_alive = False
+
+        if not self.keep_alive:
+            head += b'connection: close\r\n'
+
+        head += b'\r\n'
+        return bytes(head)
+
+
+class Lifespan:
+    """Run the application's lifespan protocol."""
+
+    def __init__(self, app: ASGIApp, logger=asgi_logger) -> None:
+        """Initialize the lifespan."""
+        self.app = app
+        self.logger = logger
+        self.receive_queue: asyncio.Queue = asyncio.Queue()
+        self.send_queue: asyncio.Queue = asyncio.Queue()
+        self.task: t.Optional[asyncio.Task] = None
+
+    async def run(self) -> None:
+        """Call the application with lifespan scope."""
+        try:
+            await self.app(
+                {'type': 'lifespan', 'asgi': {'version': '3.0', 'spec_version': '2.0'}},
+                self.receive_queue.get, self.send_queue.put)
+        except BaseException as exc:  # noqa
+            self.logger.debug("ASGI 'lifespan' protocol is unsupported: %r", exc)
+        finally:
+            await self.send_queue.put(None)
+
+    async def startup(self) -> bool:
+        """Send the startup event and wait for the result."""
+        self.task = asyncio.get_event_loop().create_task(self.run())
+        return await self.event('startup')
+
+    async def shutdown(self) -> bool:
+        """Send the shutdown event and wait for the result."""
+        if self.task is None or self.task.done():
+            return True
+
+        return await self.event('shutdown')
+
+    async def event(self, name: str) -> bool:
+        """Send the given event and wait for the response."""
+        await self.receive_queue.put({'type': f'lifespan.{name}'})
+        msg = await self.send_queue.get()
+        if msg and msg['type'] == f'lifespan.{name}.failed':
+            self.logger.error(msg.get('message', f"Lifespan {name} failed"))
+            return False
+
+        return True
+
 
 class ASGIWorker(Worker):
-    pass
+    """Run ASGI applications with gunicorn's process manager.
+
+    Every worker process runs its own event loop (uvloop if installed) and serves the
+    inherited sockets with :class:`HTTPProtocol`.
+
+    """
+
+    exit_code: int = 0
+    protocol_class: t.Type[HTTPProtocol] = HTTPProtocol
+
+    def init_process(self) -> None:
+        """Create an event loop for the process."""
+        if uvloop is not None:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        super(ASGIWorker, self).init_process()
+
+    def init_signals(self) -> None:
+        """Handle signals with the event loop."""
+        for sig in self.SIGNALS:
+            signal.signal(sig, signal.SIG_DFL)
+
+        loop = self.loop
+        loop.add_signal_handler(signal.SIGQUIT, self.handle_quit, signal.SIGQUIT, None)
+        loop.add_signal_handler(signal.SIGTERM, self.handle_exit, signal.SIGTERM, None)
+        loop.add_signal_handler(signal.SIGINT, self.handle_quit, signal.SIGINT, None)
+        loop.add_signal_handler(signal.SIGWINCH, self.handle_winch, signal.SIGWINCH, None)
+        loop.add_signal_handler(signal.SIGUSR1, self.handle_usr1, signal.SIGUSR1, None)
+        loop.add_signal_handler(signal.SIGABRT, self.handle_abort, signal.SIGABRT, None)
+
+        # Don't let SIGTERM and SIGUSR1 disturb active requests by interrupting system calls
+        signal.siginterrupt(signal.SIGTERM, False)
+        signal.siginterrupt(signal.SIGUSR1, False)
+
+    def handle_quit(self, sig, frame) -> None:
+        """Stop the worker."""
+        self.alive = False
+        self.cfg.worker_int(self)
+
+    def handle_abort(self, sig, frame) -> None:
+        """Abort the worker."""
+        self.alive = False
+        self.exit_code = 1
+        self.cfg.worker_abort(self)
+        sys.exit(1)
+
+    def run(self) -> None:
+        """Serve the application until the worker is alive."""
+        try:
+            self.loop.run_until_complete(self.serve())
+        finally:
+            self.loop.close()
+
+        sys.exit(self.exit_code)
+
+    async def serve(self) -> None:
+        """Start servers, notify the arbiter, close the connections gracefully."""
+        app, cfg, loop = self.wsgi, self.cfg, self.loop
+
+        lifespan = Lifespan(app, logger=self.log)
+        if not await lifespan.startup():
+            self.exit_code = 3  # gunicorn.arbiter.Arbiter.WORKER_BOOT_ERROR
+            return
+
+        connections: t.Set[HTTPProtocol] = set()
+
+        def on_request():
+            self.nr += 1
+
+        def protocol_factory():
+            return self.protocol_class(
+                app, keepalive=cfg.keepalive, connections=connections,
+                on_request=on_request, logger=self.log)
+
+        ssl = None
+        if cfg.is_ssl:
+            from gunicorn.sock import ssl_context
+
+            ssl = ssl_context(cfg)
+
+        servers = [
+            await loop.create_server(
+                protocol_factory, sock=sock.sock, backlog=cfg.backlog, ssl=ssl)
+            for sock in self.sockets
+        ]
+
+        try:
+            while self.alive:
+                self.notify()
+                if self.nr >= self.max_requests:
+                    self.log.info("Max requests, shutting down: %s", self)
+                    break
+
+                if self.ppid != os.getppid():
+                    self.log.info("Parent changed, shutting down: %s", self)
+                    break
+
+                await asyncio.sleep(1.0)
+
+        finally:
+            self.alive = False
+            for server in servers:
+                server.close()
+
+            for conn in list(connections):
+                conn.shutdown()
+
+            deadline = loop.time() + cfg.graceful_timeout
+            while connections and loop.time() < deadline:
+                self.notify()
+                await asyncio.sleep(0.1)
+
+            for conn in list(connections):
+                conn.abort()
+
+            await lifespan.shutdown()
+
+
+def parse_head(head: bytes) -> t.Tuple[Scope, int, bool, bool, bool]:
+    """Parse a request's head into an ASGI scope.
+
+    Returns the scope, the request's body length, is the body chunked, is the connection
+    keep-alive, is the client waiting for `100 Continue`.
+    """
+    lines = head.split(b'\r\n')
+    method, target, version = lines[0].split(b' ')
+    if version == b'HTTP/1.1':
+        http_version, keep_alive = '1.1', True
+    elif version == b'HTTP/1.0':
+        http_version, keep_alive = '1.0', False
+    else:
+        raise ValueError(f"Unsupported HTTP version: {version!r}")
+
+    headers = []
+    for line in lines[1:]:
+        name, sep, value = line.partition(b':')
+        if not sep or not name or name[-1:] in b' \t':
+            raise ValueError(f"Invalid header: {line!r}")
+
+        headers.append((name.lower(), value.strip()))
+
+    body_length, chunked = parse_framing(headers)
+    expect_100 = False
+    for name, value in headers:
+        if name == b'connection':
+            value = value.lower()
+            if value == b'close':
+                keep_alive = False
+            elif value == b'keep-alive':
+                keep_alive = True
+
+        elif name == b'expect':
+            expect_100 = value.lower() == b'100-continue'
+
+    raw_path, _, query_string = target.partition(b'?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0', 'spec_version': '2.3'},
+        'http_version': http_version,
+        'method': method.decode('ascii'),
+        'path': unquote(raw_path.decode('latin-1')),
+        'raw_path': raw_path,
+        'query_string': query_string,
+        'headers': headers,
+        'extensions': {'http.response.pathsend': {}},
+    }
+    return scope, body_length, chunked, keep_alive, expect_100 and http_version == '1.1'
+
+
+def parse_framing(headers: t.List[t.Tuple[bytes, bytes]]) -> t.Tuple[int, bool]:
+    """Get the request's body length and is the body chunked.
+
+    Ambiguous framings (which allow request smuggling behind proxies) are rejected.
+    """
+    content_length: t.Optional[bytes] = None
+    codings: t.List[bytes] = []
+    for name, value in headers:
+        if name == b'content-length':
+            if content_length is not None:
+                raise ValueError('Duplicate content length')
+
+            if not CONTENT_LENGTH_RE.fullmatch(value):
+                raise ValueError(f"Invalid content length: {value!r}")
+
+            content_length = value
+
+        elif name == b'transfer-encoding':
+            codings += [coding.strip().lower() for coding in value.split(b',')]
+
+    if not codings:
+        return int(content_length or 0), False
+
+    if content_length is not None:
+        raise ValueError('Both transfer encoding and content length are given')
+
+    if codings[-1] != b'chunked':
+        raise ValueError(f"Unsupported transfer encoding: {codings!r}")
+
+    return 0, True
+
+
+def feed_chunked(cycle: RequestCycle, buffer: bytearray) -> bool:
+    """Decode a chunked body from the buffer. Return True if more data is expected."""
+    body = cycle.body
+    while True:
+        chunk_left = t.cast(int, cycle.chunk_left)
+        if chunk_left > 0:
+            size = min(len(buffer), chunk_left)
+            body += buffer[:size]
+            del buffer[:size]
+            chunk_left -= size
+            if chunk_left:
+                cycle.chunk_left = chunk_left
+                return True
+            chunk_left = CHUNK_END
+
+        if chunk_left == CHUNK_END:
+            if len(buffer) < 2:
+                cycle.chunk_left = chunk_left
+                return True
+            if buffer[:2] != b'\r\n':
+                raise ValueError('Invalid chunk end')
+            del buffer[:2]
+            chunk_left = CHUNK_SIZE
+
+        idx = buffer.find(b'\r\n')
+        if idx < 0:
+            cycle.chunk_left = chunk_left
+            return True
+
+        line = bytes(buffer[:idx])
+        del buffer[:idx + 2]
+        if chunk_left == CHUNK_TRAILERS:
+            if not line:
+                cycle.chunk_left = None
+                return False
+            cycle.chunk_left = chunk_left
+            continue
+
+        cycle.chunk_left = parse_chunk_size(line) or CHUNK_TRAILERS
+
+
+def parse_chunk_size(line: bytes) -> int:
+    """Parse a chunk's size line (the extensions are ignored)."""
+    size = line.split(b';', 1)[0].rstrip(b' \t')
+    if not CHUNK_SIZE_RE.fullmatch(size):
+        raise ValueError(f"Invalid chunk size: {size!r}")
+
+    return int(size, 16)
+
+
+def get_address(address: t.Any) -> t.Optional[t.Tuple[str, int]]:
+    """Convert a socket's address into ASGI format."""
+    if isinstance(address, (tuple, list)) and len(address) >= 2:
+        return str(address[0]), int(address[1])
+
+    return None
+
+
+DATE_HEADER: t.List = [0, b'']
+
+
+def get_date_header() -> bytes:
+    """Get a date header (cached for a second)."""
+    now = int(time.time())
+    if DATE_HEADER[0] != now:
+        DATE_HEADER[:] = now, b'date: %b\r\n' % formatdate(now, usegmt=True).encode()
+
+    return DATE_HEADER[1]
@@ -43,6 +43,8 @@ setup(
         'build': parse_requirements('requirements/requirements-build.txt'),
         'docs': parse_requirements('requirements/requirements-docs.txt'),
         'examples': parse_requirements('requirements/requirements-examples.txt'),
+        'brotli': parse_requirements('requirements/requirements-brotli.txt'),
+        'gunicorn': parse_requirements('requirements/requirements-gunicorn.txt'),
         'orjson': parse_requirements('requirements/requirements-orjson.txt'),
         'ujson': parse_requirements('requirements/requirements-ujson.txt'),
     },
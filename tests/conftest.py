@@ -55,3 +55,39 @@ def GenRequest(client):
         return request
 
     return gen_request
+
+
+@pytest.fixture(scope='session')
+def Transport():
+    import asyncio
+
+    class Transport(asyncio.Transport):
+        """Collect written data in memory."""
+
+        def __init__(self):
+            super().__init__()
+            self.data = bytearray()
+            self.closed = False
+            self.paused = False
+
+        def get_extra_info(self, name, default=None):
+            return {
+                'sockname': ('127.0.0.1', 8000), 'peername': ('127.0.0.1', 54321)
+            }.get(name, default)
+
+        def write(self, data):
+            self.data += data
+
+        def is_closing(self):
+            return self.closed
+
+        def close(self):
+            self.closed = True
+
+        def pause_reading(self):
+            self.paused = True
+
+        def resume_reading(self):
+            self.paused = False
+
+    return Transport
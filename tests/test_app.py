@@ -389,3 +389,223 @@ async def test_nested(app, client):
     assert await res.text() == 'OK from subapp'
     assert res.headers['x-subapp'] == 'OK'
     assert res.headers['x-app'] == 'OK'
+
+
+async def test_app_compile_pipeline(Client):
+    from asgi_tools import App, ResponseError, StaticFilesMiddleware
+
+    app = App(compile_pipeline=True, static_folders=[Path(__file__).parent])
+    client = Client(app)
+
+    @app.route('/')
+    async def index(request):
+        return 'OK'
+
+    @app.middleware
+    async def internal_md(app, request, receive, send):
+        response = await app(request, receive, send)
+        response.headers['x-internal'] = 'passed'
+        return response
+
+    instances = []
+
+    @app.middleware
+    def classic_md(app):
+        instances.append(app)
+
+        async def middleware(scope, receive, send):
+            if not scope.headers.get('authorization'):
+                raise ResponseError.UNAUTHORIZED()
+            await app(scope, receive, send)
+
+        return middleware
+
+    async with client.lifespan():
+        assert app.__dispatch__
+
+        res = await client.get('/')
+        assert res.status_code == 401
+
+        res = await client.get('/', headers={'authorization': 'any'})
+        assert res.status_code == 200
+        assert res.headers['x-internal'] == 'passed'
+        assert await res.text() == 'OK'
+
+        res = await client.get('/static/test_app.py', headers={'authorization': 'any'})
+        assert res.status_code == 200
+
+        # Middlewares are recompiled
+        app.middleware(StaticFilesMiddleware.setup(url_prefix='/assets', folders=['tests']))
+        assert app.__dispatch__ is None
+
+        res = await client.get('/assets/test_app.py', headers={'authorization': 'any'})
+        assert res.status_code == 200
+        assert app.__dispatch__
+
+    # The middlewares are initialized once
+    assert len(instances) == 1
+
+
+async def test_app_compile_layers(Client):
+    from asgi_tools import App, ResponseWebSocket
+    from asgi_tools.middleware import BaseMiddeware
+
+    app = App(compile_pipeline=True)
+    client = Client(app)
+    processed = []
+
+    @app.route('/')
+    async def index(request):
+        return 'OK'
+
+    @app.route('/ws')
+    async def websocket(request):
+        async with ResponseWebSocket(request) as ws:
+            await ws.send('OK')
+
+    def layer(name, scopes=BaseMiddeware.scopes):
+
+        class Layer(BaseMiddeware):
+
+            async def __process__(self, scope, receive, send):
+                processed.append((scope['type'], name))
+                return await self.app(scope, receive, send)
+
+        Layer.scopes = scopes
+        return Layer
+
+    app.middleware(layer('first'))
+    app.middleware(layer('second', {'http'}))
+    app.middleware(layer('third'))
+
+    async with client.lifespan():
+        first, second, third = app.classic_middlewares
+        assert first.app is app.__internal__
+        # The http layer goes to the first one without a check
+        assert second.app == first.__process__
+        # The scope types go different ways after the third layer
+        assert third.app is second
+
+        res = await client.get('/')
+        assert res.status_code == 200
+        assert await res.text() == 'OK'
+        assert processed == [('http', 'third'), ('http', 'second'), ('http', 'first')]
+
+        processed.clear()
+        async with client.websocket('/ws') as ws:
+            assert await ws.receive() == 'OK'
+
+        assert processed == [('websocket', 'third'), ('websocket', 'first')]
+
+
+async def test_app_route_cache(Client):
+    from asgi_tools.app import App
+
+    app = App(route_cache_size=4)
+    client = Client(app)
+
+    @app.route('/user/{id:int}')
+    async def user(request):
+        request.path_params['id'] += 1
+        return str(request.path_params['id'])
+
+    res = await client.get('/user/42')
+    assert await res.text() == '43'
+    assert app.route_cache.misses == 1
+
+    res = await client.get('/user/42')
+    assert await res.text() == '43'
+    assert app.route_cache.hits == 1
+
+    res = await client.post('/user/42')
+    assert res.status_code == 200
+
+    res = await client.get('/unknown')
+    assert res.status_code == 404
+    assert len(app.route_cache) == 3
+
+    # The cache is bounded
+    for num in range(5):
+        res = await client.get(f"/user/{num}")
+        assert res.status_code == 200
+    assert len(app.route_cache.matches) == 4
+
+    # The cache is invalidated when routes are changed
+    @app.route('/unknown')
+    async def unknown(request):
+        return 'known'
+
+    assert not len(app.route_cache)
+    res = await client.get('/unknown')
+    assert res.status_code == 200
+
+    res = await client.get('/sub/page')
+    assert res.status_code == 404
+    assert app.route_cache.negatives
+
+    subapp = App()
+
+    @subapp.route('/page')
+    async def page(request):
+        return 'subpage'
+
+    app.route('/sub')(subapp)
+    res = await client.get('/sub/page')
+    assert res.status_code == 200
+    assert await res.text() == 'subpage'
+
+
+async def test_app_max_body_size(Client):
+    from asgi_tools import App
+
+    app = App(max_body_size=10)
+    client = Client(app)
+
+    @app.route('/')
+    async def index(request):
+        return await request.body()
+
+    @app.route('/upload', methods='POST', max_body_size=20)
+    async def upload(request):
+        return await request.body()
+
+    res = await client.post('/', data='0123456789')
+    assert res.status_code == 200
+    assert await res.text() == '0123456789'
+
+    res = await client.post('/', data='0123456789ABCDEF')
+    assert res.status_code == 413
+
+    # Content-Length is unknown
+    async def stream():
+        for _ in range(3):
+            yield b'01234'
+
+    res = await client.post('/', data=stream())
+    assert res.status_code == 413
+
+    res = await client.post('/upload', data='0123456789ABCDEF')
+    assert res.status_code == 200
+    assert await res.text() == '0123456789ABCDEF'
+
+    res = await client.post('/upload', data='0123456789ABCDEF0123456789')
+    assert res.status_code == 413
+
+    # The route's target is still introspectable
+    route, = app.router.plain['/upload']
+    assert route.target.__wrapped__ is upload
+    assert route.target.__name__ == 'upload'
+
+    # Mounted applications apply their limits
+    subapp = App(max_body_size=5)
+
+    @subapp.route('/upload', methods='POST')
+    async def subupload(request):
+        return await request.body()
+
+    app.route('/sub')(subapp)
+    res = await client.post('/sub/upload', data='01234')
+    assert res.status_code == 200
+
+    res = await client.post('/sub/upload', data='0123456789')
+    assert res.status_code == 413
@@ -2,11 +2,15 @@ import pytest
 
 
 @pytest.mark.benchmark(group="req-res", disable_gc=True)
-def test_benchmark_req_res(benchmark, GenRequest):
+@pytest.mark.parametrize('lookup', ['headers', 'get_header'])
+@pytest.mark.parametrize('num_headers', [1, 32])
+def test_benchmark_req_res(benchmark, GenRequest, num_headers, lookup):
     from asgi_tools import Request, parse_response
 
+    headers = {f"x-header-{idx}": 'value' for idx in range(num_headers - 1)}
+    headers['header'] = 'value'
     scope = GenRequest(
-        '/test', query={'param': 'value'}, headers={'header': 'value'}, cookies={'cookie': 'value'}
+        '/test', query={'param': 'value'}, headers=headers, cookies={'cookie': 'value'}
     ).scope
 
     async def send(msg):
@@ -16,8 +20,12 @@ def test_benchmark_req_res(benchmark, GenRequest):
         request = Request(scope)
         assert request.method
         assert request.query['param']
-        assert request.headers['header']
+        if lookup == 'headers':
+            assert request.headers['header']
+        else:
+            assert request.get_header(b'header')
         assert request.cookies['cookie']
+        assert request.content_type is not None
 
         response = parse_response('body')
         coro = response(None, None, send)
@@ -44,6 +52,334 @@ def test_benchmark_formdata(benchmark):
     assert dict(form) == {'value': 'test passed'}
 
 
+@pytest.mark.benchmark(group="multipart", disable_gc=True)
+@pytest.mark.parametrize('parser', ['python', 'extension'])
+def test_benchmark_multipart(benchmark, parser):
+    import os
+    import importlib.util
+    import asgi_tools.multipart
+
+    module = asgi_tools.multipart
+    if parser == 'extension' and module.__file__.endswith('.py'):
+        return pytest.skip('The extension is not built')
+
+    if parser == 'python':
+        spec = importlib.util.spec_from_file_location(
+            'multipart', os.path.join(os.path.dirname(module.__file__), 'multipart.py'))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+    # 100 MB file in 64 KB chunks
+    chunk = os.urandom(64 * 1024)
+    chunks = [
+        b'--boundary\r\nContent-Disposition: form-data; name="file"; filename="test.bin"\r\n'
+        b'Content-Type: application/octet-stream\r\n\r\n',
+        *[chunk] * 1600,
+        b'\r\n--boundary--\r\n'
+    ]
+
+    def run_benchmark():
+        size = 0
+
+        def on_part_data(data, start, end):
+            nonlocal size
+            size += end - start
+
+        parser = module.MultipartParser('boundary', {'part_data': on_part_data})
+        for chunk in chunks:
+            parser.write(chunk)
+
+        return size
+
+    size = benchmark.pedantic(run_benchmark, rounds=5)
+    assert size == 100 * 1024 * 1024
+
+
+@pytest.mark.benchmark(group="body", disable_gc=True)
+@pytest.mark.parametrize('method', ['body', 'body_view'])
+def test_benchmark_body(benchmark, GenRequest, method):
+    chunk = b'x' * 64 * 1024
+    size = 16 * 1024 * 1024
+
+    def run_benchmark():
+        request = GenRequest(body=[chunk] * (size // len(chunk)))
+        coro = getattr(request, method)()
+        try:
+            coro.send(None)
+        except StopIteration as exc:
+            return exc.value
+
+    body = benchmark(run_benchmark)
+    assert len(body) == size
+
+
+@pytest.mark.benchmark(group="body-buffer", disable_gc=True)
+@pytest.mark.parametrize('strategy', ['join', 'grow', 'preallocate'])
+@pytest.mark.parametrize('size', [256 * 1024, 16 * 1024 * 1024])
+def test_benchmark_body_buffer(benchmark, size, strategy):
+    """Compare the ways to collect a body of known length (see Request.body)."""
+    chunks = [b'x' * 64 * 1024] * (size // (64 * 1024))
+
+    def join():
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+        return b''.join(parts)
+
+    def grow():
+        buffer = bytearray()
+        for chunk in chunks:
+            buffer += chunk
+        return buffer
+
+    def preallocate():
+        buffer = bytearray(size)
+        view, pos = memoryview(buffer), 0
+        for chunk in chunks:
+            view[pos:pos + len(chunk)] = chunk
+            pos += len(chunk)
+        return buffer
+
+    strategies = {'join': join, 'grow': grow, 'preallocate': preallocate}
+    body = benchmark(strategies[strategy])
+    assert len(body) == size
+
+
+@pytest.mark.benchmark(group="memory", disable_gc=True)
+@pytest.mark.parametrize('name', [
+    'Request', 'Response', 'ResponseHTML', 'ResponseJSON', 'ResponseStream', 'ResponseError'])
+def test_benchmark_memory(benchmark, GenRequest, name):
+    import gc
+    import tracemalloc
+    import asgi_tools
+
+    scope = GenRequest('/test', headers={'x-header': 'value'}).scope
+    factory = {
+        'Request': lambda: asgi_tools.Request(scope),
+        'Response': lambda: asgi_tools.Response(),
+        'ResponseHTML': lambda: asgi_tools.ResponseHTML('<p>Hello</p>'),
+        'ResponseJSON': lambda: asgi_tools.ResponseJSON({'hello': 'world'}),
+        'ResponseStream': lambda: asgi_tools.ResponseStream(None),
+        'ResponseError': lambda: asgi_tools.ResponseError.NOT_FOUND(),
+    }[name]
+
+    # Report the per-object footprint
+    num = 10000
+    gc.collect()
+    tracemalloc.start()
+    snapshot = tracemalloc.take_snapshot()
+    objects = [factory() for _ in range(num)]
+    stats = tracemalloc.take_snapshot().compare_to(snapshot, 'filename')
+    tracemalloc.stop()
+    benchmark.extra_info['bytes'] = sum(stat.size_diff for stat in stats) // num
+    benchmark.extra_info['allocations'] = sum(stat.count_diff for stat in stats) // num
+
+    if name != 'ResponseError':
+        assert not hasattr(objects[0], '__dict__')
+
+    del objects
+    benchmark(factory)
+
+
+@pytest.mark.benchmark(group="cookies-parse", disable_gc=True)
+@pytest.mark.parametrize('parser', ['stdlib', 'asgi-tools'])
+def test_benchmark_cookies_parse(benchmark, parser):
+    from http.cookies import SimpleCookie
+    from asgi_tools.cookies import parse_cookie
+
+    header = '; '.join(f"cookie{idx}=value{idx}" for idx in range(10)) + '; quoted="a\\"b"'
+
+    def stdlib(header):
+        cookies = SimpleCookie()
+        cookies.load(header)
+        return {name: morsel.value for name, morsel in cookies.items()}
+
+    cookies = benchmark(stdlib if parser == 'stdlib' else parse_cookie, header)
+    assert cookies['cookie9'] == 'value9'
+    assert cookies['quoted'] == 'a"b'
+
+
+@pytest.mark.benchmark(group="cookies-dump", disable_gc=True)
+@pytest.mark.parametrize('serializer', ['stdlib', 'asgi-tools'])
+def test_benchmark_cookies_dump(benchmark, serializer):
+    from http.cookies import SimpleCookie
+    from asgi_tools.cookies import dump_cookie
+
+    cookies = SimpleCookie()
+    for idx in range(5):
+        name = f"cookie{idx}"
+        cookies[name] = 'value'
+        cookies[name]['path'] = '/'
+        cookies[name]['max-age'] = 3600
+        cookies[name]['httponly'] = True
+        cookies[name]['samesite'] = 'lax'
+
+    def stdlib():
+        return [
+            morsel.output(header='').strip().encode('latin-1') for morsel in cookies.values()]
+
+    def asgi_tools():
+        return [dump_cookie(morsel) for morsel in cookies.values()]
+
+    headers = benchmark(stdlib if serializer == 'stdlib' else asgi_tools)
+    assert headers[0] == b'cookie0=value; HttpOnly; Max-Age=3600; Path=/; SameSite=lax'
+
+
+@pytest.mark.benchmark(group="stream", disable_gc=True)
+@pytest.mark.parametrize('buffer_size', [0, 64 * 1024])
+def test_benchmark_stream(benchmark, buffer_size):
+    from asgi_tools import ResponseStream
+
+    async def rows():
+        for idx in range(10000):
+            yield f"{idx},name-{idx},value-{idx}\n"
+
+    messages = []
+
+    async def send(msg):
+        messages.append(msg)
+
+    def run_benchmark():
+        messages.clear()
+        response = ResponseStream(rows(), buffer_size=buffer_size)
+        coro = response.stream_response(send)
+        try:
+            coro.send(None)
+        except StopIteration:
+            pass
+
+        return len(messages)
+
+    benchmark.extra_info['messages'] = benchmark(run_benchmark)
+    assert b''.join(msg.get('body', b'') for msg in messages).startswith(b'0,name-0,value-0\n')
+
+
+@pytest.mark.benchmark(group="sse-streams")
+@pytest.mark.parametrize('watcher', ['wait', 'watch'])
+def test_benchmark_sse_streams(benchmark, watcher):
+    import asyncio
+    import tracemalloc
+    from asgi_tools import ResponseSSE
+    from asgi_tools._compat import aio_wait, FIRST_COMPLETED
+
+    num = 10000
+
+    async def run_streams(on_opened=lambda: None):
+        opened, disconnected = asyncio.Event(), asyncio.Event()
+        counter = {'events': 0}
+
+        async def events():
+            yield {'data': 'ping'}
+            await disconnected.wait()
+
+        async def receive():
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(msg):
+            if msg.get('body'):
+                counter['events'] += 1
+                if counter['events'] == num:
+                    opened.set()
+
+        async def stream():
+            response = ResponseSSE(events())
+            if watcher == 'watch':
+                return await response(None, receive, send)
+
+            # The previous implementation: a task for each side
+            await aio_wait(
+                response.listen_for_disconnect(receive), response.stream_response(send),
+                strategy=FIRST_COMPLETED)
+
+        tasks = [asyncio.create_task(stream()) for _ in range(num)]
+        await opened.wait()
+        on_opened()
+
+        disconnected.set()
+        await asyncio.gather(*tasks)
+
+    def trace_streams():
+        stats = []
+        tracemalloc.start()
+        snapshot = tracemalloc.take_snapshot()
+        asyncio.run(run_streams(
+            lambda: stats.extend(tracemalloc.take_snapshot().compare_to(snapshot, 'filename'))))
+        tracemalloc.stop()
+        return sum(stat.size_diff for stat in stats) // num
+
+    # Report the memory per an open stream
+    benchmark.extra_info['bytes'] = trace_streams()
+    benchmark.pedantic(asyncio.run, setup=lambda: ((run_streams(),), {}), rounds=3)
+
+
+@pytest.mark.benchmark(group="broadcast", disable_gc=True)
+@pytest.mark.parametrize('fanout', ['per-stream', 'broadcast'])
+def test_benchmark_broadcast(benchmark, fanout):
+    from collections import deque
+    from asgi_tools import Broadcast
+    from asgi_tools.response import encode_sse_event
+
+    num = 1000
+    event = {'event': 'price', 'data': '{"symbol": "ACME", "price": 42.42}'}
+    broadcast = Broadcast(queue_size=1)
+    subscriptions = [broadcast.subscribe(format='sse') for _ in range(num)]
+    queues = [deque(maxlen=1) for _ in range(num)]
+
+    def run_benchmark():
+        if fanout == 'broadcast':
+            coro = broadcast.publish(event)
+            try:
+                coro.send(None)
+            except StopIteration:
+                pass
+
+        else:
+            for queue in queues:
+                queue.append(encode_sse_event(event))
+
+    benchmark(run_benchmark)
+    if fanout == 'broadcast':
+        assert subscriptions[0].queue[0] is subscriptions[-1].queue[0]
+
+
+@pytest.mark.benchmark(group="websocket")
+@pytest.mark.parametrize('method', ['send', 'send_many', 'send_json', 'send_json_many'])
+def test_benchmark_websocket(benchmark, Client, method):
+    import asyncio
+    from asgi_tools import ResponseWebSocket
+
+    num = 10000
+    items = [{'symbol': 'ACME', 'price': idx} for idx in range(num)]
+    messages = [f"ACME:{idx}" for idx in range(num)]
+
+    async def app(scope, receive, send):
+        async with ResponseWebSocket(scope, receive, send) as ws:
+            if method == 'send':
+                for msg in messages:
+                    await ws.send(msg)
+
+            elif method == 'send_json':
+                for item in items:
+                    await ws.send_json(item)
+
+            elif method == 'send_many':
+                await ws.send_many(messages)
+
+            else:
+                await ws.send_json_many(items)
+
+    async def run_benchmark():
+        async with Client(app).websocket('/') as ws:
+            for _ in range(num):
+                await ws.receive(raw=True)
+
+    benchmark.pedantic(asyncio.run, setup=lambda: ((run_benchmark(),), {}), rounds=5)
+    # The stats are missing with --benchmark-disable
+    if benchmark.stats:
+        benchmark.extra_info['messages/sec'] = int(num / benchmark.stats.stats.mean)
+
+
 @pytest.mark.benchmark(group="app", disable_gc=True)
 def test_benchmark_app(benchmark, app, client):
 
@@ -93,3 +429,93 @@ def test_benchmark_app(benchmark, app, client):
         }
 
     ]
+
+
+@pytest.mark.benchmark(group="middlewares", disable_gc=True)
+@pytest.mark.parametrize('compiled', [False, True], ids=['chained', 'compiled'])
+@pytest.mark.parametrize('kind', ['coroutine', 'classic'])
+@pytest.mark.parametrize('count', [0, 5, 10, 20])
+def test_benchmark_middlewares(benchmark, client, count, kind, compiled):
+    """Measure per-request overhead of middlewares."""
+    from asgi_tools import App
+    from asgi_tools.middleware import BaseMiddeware
+
+    app = App(compile_pipeline=compiled)
+
+    @app.route('/path')
+    async def page(request):
+        return 'OK'
+
+    def gen_middleware():
+        async def md(app, request, receive, send):
+            return await app(request, receive, send)
+
+        return md
+
+    class Middleware(BaseMiddeware):
+
+        async def __process__(self, scope, receive, send):
+            return await self.app(scope, receive, send)
+
+    for _ in range(count):
+        app.middleware(gen_middleware() if kind == 'coroutine' else Middleware)
+
+    scope = client.build_scope('/path', type='http', method='GET')
+
+    async def send(msg):
+        pass
+
+    def run_benchmark():
+        coro = app(dict(scope), None, send)
+        try:
+            coro.send(None)
+        except StopIteration:
+            pass
+
+    benchmark(run_benchmark)
+
+
+@pytest.mark.benchmark(group="worker", disable_gc=True)
+@pytest.mark.parametrize('server', ['asgi-tools', 'uvicorn'])
+def test_benchmark_worker(benchmark, app, Transport, server):
+    """Compare the worker's protocol with uvicorn on 100 pipelined requests."""
+    pytest.importorskip('gunicorn')
+    import asyncio
+
+    if server == 'uvicorn':
+        uvicorn = pytest.importorskip('uvicorn')
+        from uvicorn.server import ServerState
+
+        config = uvicorn.Config(app, lifespan='off', access_log=False)
+        config.load()
+
+        def protocol_factory():
+            return config.http_protocol_class(
+                config=config, server_state=ServerState(), app_state={})
+
+    else:
+        from asgi_tools.worker import HTTPProtocol
+
+        def protocol_factory():
+            return HTTPProtocol(app)
+
+    requests = b'GET / HTTP/1.1\r\nhost: localhost\r\n\r\n' * 100
+
+    async def process():
+        transport = Transport()
+        protocol = protocol_factory()
+        protocol.connection_made(transport)
+        protocol.data_received(requests)
+        while transport.data.count(b'HTTP/1.1 200 OK') < 100:
+            await asyncio.sleep(0)
+        protocol.connection_lost(None)
+        return transport.data
+
+    # Run on a private loop and leave the current one (if any) untouched
+    loop = asyncio.new_event_loop()
+    try:
+        data = benchmark(lambda: loop.run_until_complete(process()))
+    finally:
+        loop.close()
+
+    assert data.count(b'HTTP/1.1 200 OK') == 100
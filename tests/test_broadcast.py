@@ -0,0 +1,153 @@
+import json
+
+import pytest
+
+
+async def test_broadcast():
+    from asgi_tools import Broadcast
+
+    broadcast = Broadcast(queue_size=2)
+    everything = broadcast.subscribe()
+    news = broadcast.subscribe('news', format='sse')
+    sports = broadcast.subscribe('sports', 'news', format='websocket', overflow='disconnect')
+    assert len(broadcast) == 3
+
+    assert await broadcast.publish('hello', 'news') == 3
+    assert await broadcast.publish({'data': 42}, 'sports') == 2
+    assert await broadcast.publish('all') == 3
+
+    assert list(everything.queue) == [{'data': 42}, 'all']
+    assert everything.dropped == 1
+    assert list(news.queue) == [b'hello\n\n', b'all\n\n']
+    assert not news.dropped
+
+    # The slow subscriber has been disconnected
+    assert sports.closed
+    assert not sports.queue
+    assert sports.dropped == 1
+    assert len(broadcast) == 2
+    assert set(broadcast.topics) == {None, 'news'}
+
+    # Events are encoded once
+    broadcast = Broadcast()
+    first, second = broadcast.subscribe(format='sse'), broadcast.subscribe(format='sse')
+    await broadcast.publish('event')
+    assert first.queue[0] is second.queue[0]
+
+    await broadcast.close()
+    assert not len(broadcast)
+    assert [event async for event in first] == [b'event\n\n']
+
+
+async def test_broadcast_subscription():
+    from asgi_tools import Broadcast
+    from asgi_tools._compat import aio_spawn, aio_sleep
+
+    broadcast = Broadcast()
+    subscription = broadcast.subscribe('numbers')
+
+    async def publish():
+        for num in range(5):
+            await aio_sleep(.001)
+            await broadcast.publish(num, 'numbers')
+        await broadcast.close()
+
+    async with aio_spawn(publish):
+        events = [event async for event in subscription]
+
+    assert events == [0, 1, 2, 3, 4]
+
+
+async def test_broadcast_sse():
+    from functools import partial
+    from asgi_tools import Broadcast
+    from asgi_tools._compat import aio_spawn, aio_sleep, aio_wait
+    from asgi_tools.utils import to_awaitable
+
+    broadcast = Broadcast()
+    messages = []
+
+    async def publish():
+        while not len(broadcast):
+            await aio_sleep(.001)
+
+        await broadcast.publish({'event': 'ping', 'data': 1})
+        await broadcast.publish('data: 2')
+        await broadcast.close()
+
+    response = broadcast.sse()
+    async with aio_spawn(publish):
+        # Run the response in a regular task
+        await aio_wait(response(None, partial(aio_sleep, 10), to_awaitable(messages.append)))
+
+    assert messages[0]['type'] == 'http.response.start'
+    assert [msg['body'] for msg in messages[1:]] == [
+        b'event: ping\ndata: 1\n\n', b'data: 2\n\n', b'']
+    assert response.content.closed
+
+
+async def test_broadcast_websocket(app, Client):
+    from asgi_tools import Broadcast, ResponseWebSocket
+    from asgi_tools._compat import aio_sleep
+
+    broadcast = Broadcast()
+
+    @app.route('/ws')
+    async def websocket(request):
+        async with ResponseWebSocket(request) as ws:
+            await broadcast.websocket(ws, 'prices')
+
+    async with Client(app).websocket('/ws') as ws:
+        while not len(broadcast):
+            await aio_sleep(.001)
+
+        await broadcast.publish('text', 'prices')
+        await broadcast.publish(b'bytes', 'prices')
+        await broadcast.publish({'price': 42}, 'prices')
+        await broadcast.publish('skip', 'news')
+
+        assert await ws.receive() == 'text'
+        assert await ws.receive() == 'bytes'
+        assert json.loads(await ws.receive()) == {'price': 42}
+
+    while len(broadcast):
+        await aio_sleep(.001)
+
+
+async def test_broadcast_websocket_messages():
+    from asgi_tools import Broadcast, ResponseWebSocket
+    from asgi_tools._compat import aio_sleep, aio_wait
+
+    broadcast = Broadcast()
+    received = []
+
+    class WebSocket:
+        STATES = ResponseWebSocket.STATES
+        partner_state = STATES.connected
+
+        async def receive(self, raw=False):
+            await aio_sleep(10)
+
+        async def send(self, msg):
+            # Senders may update the messages
+            received.append(msg.pop('text'))
+
+    async def publish():
+        while len(broadcast) < 2:
+            await aio_sleep(.001)
+
+        await broadcast.publish('event')
+        await broadcast.close()
+
+    await aio_wait(broadcast.websocket(WebSocket()), broadcast.websocket(WebSocket()), publish())
+    assert received == ['event', 'event']
+
+
+def test_broadcast_invalid():
+    from asgi_tools import Broadcast
+
+    with pytest.raises(AssertionError):
+        Broadcast(overflow='unknown')
+
+    with pytest.raises(AssertionError):
+        Broadcast().subscribe(format='unknown')
@@ -1,3 +1,6 @@
+import pytest
+
+
 async def test_compat_aio():
     from asgi_tools._compat import aio_wait, aio_sleep, FIRST_COMPLETED
 
@@ -12,6 +15,121 @@ async def test_compat_aio():
     assert result == 1
 
 
+async def test_compat_channel():
+    from asgi_tools._compat import aio_channel, aio_wait
+
+    receive, send = aio_channel()
+    await send(1)
+    await send(2)
+    assert await receive() == 1
+    assert await receive() == 2
+
+    async def consumer():
+        return await receive()
+
+    async def producer():
+        await send('msg')
+
+    result = await aio_wait(consumer(), producer())
+    assert 'msg' in result
+
+
+async def test_compat_timeout():
+    from asgi_tools._compat import aio_timeout, aio_sleep, aio_channel
+
+    receive, send = aio_channel()
+    with pytest.raises(TimeoutError):
+        await aio_timeout(.01, receive)
+
+    await send('msg')
+    assert await aio_timeout(.01, receive) == 'msg'
+
+    with pytest.raises(TimeoutError):
+        await aio_timeout(.01, aio_sleep, 1)
+
+
+@pytest.mark.parametrize('aiolib', [
+    ('asyncio', {'use_uvloop': False}),
+    pytest.param(('asyncio', {'use_uvloop': True}), id='uvloop'),
+])
+async def test_compat_timeout_tasks(aiolib):
+    import asyncio
+    from unittest import mock
+    from asgi_tools import _compat
+    from asgi_tools._compat import aio_channel, aio_timeout
+
+    async def check():
+        receive, send = aio_channel()
+        with mock.patch('asyncio.wait_for', side_effect=AssertionError('A task is spawned')):
+            with pytest.raises(TimeoutError):
+                await aio_timeout(.01, receive)
+
+            await send('msg')
+            assert await aio_timeout(.01, receive) == 'msg'
+
+            # Python < 3.11
+            with mock.patch.object(_compat, 'asyncio_timeout', None):
+                with pytest.raises(TimeoutError):
+                    await aio_timeout(.01, receive)
+
+                await send('msg')
+                assert await aio_timeout(.01, receive) == 'msg'
+                await asyncio.sleep(.02)
+
+    # Run the checks in a regular task
+    await asyncio.create_task(check())
+
+
+async def test_compat_watch():
+    from asgi_tools._compat import aio_watch, aio_wait, aio_sleep
+
+    results = []
+
+    async def work(seconds):
+        await aio_sleep(seconds)
+        results.append(seconds)
+
+    async def fail():
+        raise RuntimeError
+
+    async def check():
+        assert await aio_watch(work(0), aio_sleep, 1)
+        assert results == [0]
+
+        assert not await aio_watch(work(1), aio_sleep, .01)
+        assert results == [0]
+
+        with pytest.raises(RuntimeError):
+            await aio_watch(work(1), fail)
+
+    # Run the checks in a regular task
+    await aio_wait(check())
+
+
+@pytest.mark.parametrize('aiolib', [
+    ('asyncio', {'use_uvloop': False}),
+    pytest.param(('asyncio', {'use_uvloop': True}), id='uvloop'),
+])
+async def test_compat_watch_cancel(aiolib):
+    import asyncio
+    from asgi_tools._compat import aio_watch
+
+    async def check():
+        task = asyncio.current_task()
+
+        async def watcher():
+            # The outer cancellation coincides with the watcher's completion
+            asyncio.get_running_loop().call_soon(task.cancel)
+
+        # The watcher's own cancellation is withdrawn
+        assert not await aio_watch(asyncio.sleep(1), asyncio.sleep, .01)
+
+        with pytest.raises(asyncio.CancelledError):
+            await aio_watch(asyncio.sleep(1), watcher)
+
+    await asyncio.create_task(check())
+
+
 def test_compat_json():
     from asgi_tools._compat import json_loads, json_dumps
 
@@ -0,0 +1,130 @@
+import pytest
+
+
+@pytest.fixture
+def manager():
+    from asgi_tools import WebSocketManager
+
+    return WebSocketManager()
+
+
+@pytest.fixture
+def ws_app(app, manager):
+    from asgi_tools import ResponseWebSocket
+
+    async def echo(ws):
+        async for msg in ws:
+            await ws.send(msg)
+
+    @app.route('/ws')
+    async def websocket(request):
+        async with ResponseWebSocket(request) as ws:
+            await manager.run(ws, echo)
+
+    return app
+
+
+async def test_manager(ws_app, manager, Client):
+    from asgi_tools._compat import aio_sleep
+
+    async with Client(ws_app).websocket('/ws') as ws:
+        await ws.send('ping')
+        assert await ws.receive() == 'ping'
+        await ws.send('пинг')
+        assert await ws.receive() == 'пинг'
+
+        assert len(manager) == 1
+        connection, = manager.connections
+        assert connection.messages_in == 2
+        assert connection.messages_out == 2
+        assert connection.bytes_in == 12
+        # Trio's channels return from send after the message is received
+        assert connection.pending <= 1
+        assert manager.stats == {
+            'connections': 1, 'bytes_in': 12, 'bytes_out': 12, 'pending': connection.pending}
+
+    while len(manager):
+        await aio_sleep(.001)
+
+    assert manager.stats['connections'] == 0
+    assert manager.stats['bytes_out'] == 12
+    assert connection.closed_by is None
+
+
+async def test_manager_timeouts(ws_app, manager, Client):
+    from asgi_tools import ASGIConnectionClosed
+
+    manager.idle_timeout = .02
+    async with Client(ws_app).websocket('/ws') as ws:
+        await ws.send('ping')
+        assert await ws.receive() == 'ping'
+        connection, = manager.connections
+
+        with pytest.raises(ASGIConnectionClosed):
+            await ws.receive()
+
+    assert connection.closed_by == 'idle'
+
+    manager.idle_timeout, manager.receive_timeout = .1, .02
+    async with Client(ws_app).websocket('/ws') as ws:
+        await ws.send('ping')
+        assert await ws.receive() == 'ping'
+        connection, = manager.connections
+        with pytest.raises(ASGIConnectionClosed):
+            await ws.receive()
+
+    assert connection.closed_by == 'receive'
+
+
+async def test_manager_shutdown(ws_app, manager, Client):
+    from asgi_tools import ASGIConnectionClosed
+
+    manager.bind_lifespan(ws_app)
+    async with Client(ws_app).websocket('/ws') as ws:
+        await ws.send('ping')
+        assert await ws.receive() == 'ping'
+        connection, = manager.connections
+
+        await ws_app.lifespan.run('shutdown')
+        assert not len(manager)
+        assert connection.closed_by == 'shutdown'
+
+        with pytest.raises(ASGIConnectionClosed):
+            await ws.receive()
+
+    # New connections are closed as well
+    async with Client(ws_app).websocket('/ws') as ws:
+        with pytest.raises(ASGIConnectionClosed):
+            await ws.receive()
+
+
+async def test_manager_close(manager):
+    from time import monotonic
+    from asgi_tools import ResponseWebSocket
+    from asgi_tools._compat import aio_sleep, aio_spawn
+
+    def register():
+        return manager.register(ResponseWebSocket({'type': 'websocket'}, aio_sleep, aio_sleep))
+
+    # The manager waits for the connections up to the timeout
+    connection = register()
+    await manager.close(timeout=.01)
+    assert len(manager) == 1
+    assert manager.notify_closed is None
+
+    await manager.unregister(connection)
+    assert not len(manager)
+
+    # The manager is notified about the last closed connection
+    connection = register()
+
+    async def unregister():
+        await aio_sleep(.01)
+        await manager.unregister(connection)
+
+    started = monotonic()
+    async with aio_spawn(unregister):
+        await manager.close(timeout=10)
+
+    assert monotonic() - started < 1
+    assert not len(manager)
@@ -0,0 +1,37 @@
+def test_parse_cookie():
+    from asgi_tools.cookies import parse_cookie
+
+    assert parse_cookie('') == {}
+    assert parse_cookie('session=test; lang=en') == {'session': 'test', 'lang': 'en'}
+
+    # Malformed pairs
+    assert parse_cookie(';; flag ; =value; key=a=b;') == {'flag': '', 'key': 'a=b'}
+
+    # Quoted values
+    assert parse_cookie('name="John \\"Doe\\"\\054 Jr"') == {'name': 'John "Doe", Jr'}
+    assert parse_cookie('name="') == {'name': '"'}
+
+
+def test_dump_cookie():
+    from http.cookies import SimpleCookie
+    from asgi_tools.cookies import dump_cookie
+
+    cookies = SimpleCookie()
+    cookies['session'] = 'test'
+    cookies['name'] = 'John "Doe"; Jr'
+    cookies['name']['path'] = '/'
+    cookies['name']['httponly'] = True
+    cookies['name']['samesite'] = 'lax'
+    cookies['lang'] = 'en'
+    cookies['lang']['max-age'] = 3600
+    cookies['lang']['domain'] = 'example.com'
+    cookies['lang']['comment'] = 'a comment'
+    cookies['lang']['secure'] = False
+    cookies['lang']['expires'] = 'Wed, 21 Oct 2015 07:28:00 GMT'
+
+    for morsel in cookies.values():
+        assert dump_cookie(morsel) == morsel.OutputString().encode()
+
+    cookies['lang']['expires'] = 3600
+    assert dump_cookie(cookies['lang']).startswith(
+        b'lang=en; Comment="a comment"; Domain=example.com; expires=')
@@ -39,6 +39,52 @@ async def test_formdata(GenRequest, tmp_path):
     assert b'test_multipart_parser' in formdata['file2'].read()
 
 
+async def test_form_stream(GenRequest):
+    from asgi_tools import ASGIDecodeError
+    from asgi_tools.tests import encode_multipart
+
+    source = Path(__file__).read_bytes()
+    data, content_type = encode_multipart({
+        'name': 'value',
+        'file1': open(__file__),
+        'file2': open(__file__),
+    })
+    body = [data[idx:idx + 512] for idx in range(0, len(data), 512)]
+    request = GenRequest(body=body, headers={'content-type': content_type})
+
+    parts = []
+    async for part in request.form_stream():
+        parts.append(part)
+        if part.name == 'name':
+            assert part.filename is None
+            assert await part.read() == b'value'
+
+        elif part.name == 'file1':
+            assert part.filename == Path(__file__).name
+            assert part.content_type == 'text/x-python'
+            chunks = [chunk async for chunk in part]
+            assert max(len(chunk) for chunk in chunks) <= 512
+            assert b''.join(chunks) == source
+
+    # file2 is skipped by the consumer
+    assert [p.name for p in parts] == ['name', 'file1', 'file2']
+    assert not parts[2].chunks
+
+    request = GenRequest(body=body[:3], headers={'content-type': content_type})
+    stream = request.form_stream()
+    with pytest.raises(ASGIDecodeError):
+        async for part in stream:
+            await part.read()
+
+    await stream.aclose()
+
+    # The body is cut off before the first part
+    request = GenRequest(body=[data[:20]], headers={'content-type': content_type})
+    with pytest.raises(ASGIDecodeError):
+        async for part in request.form_stream():
+            pass
+
+
 @pytest.mark.parametrize('sample', [
     (b'foo=bar', {'foo': 'bar'}),
     (b'&foo=bar', {'foo': 'bar'}),
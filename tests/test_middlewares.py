@@ -145,3 +145,338 @@ async def test_staticfiles_middleware(Client, app):
 
     res = await client.get('/static')
     assert res.status_code == 404
+
+    # Conditional requests
+    res = await client.get('/static/test_middlewares.py')
+    etag, last_modified = res.headers['etag'], res.headers['last-modified']
+    assert res.headers['accept-ranges'] == 'bytes'
+
+    res = await client.get('/static/test_middlewares.py', headers={'if-none-match': f'"{etag}"'})
+    assert res.status_code == 304
+    assert 'content-length' not in res.headers
+    assert not await res.body()
+
+    res = await client.get('/static/test_middlewares.py', headers={'if-none-match': 'unknown'})
+    assert res.status_code == 200
+
+    res = await client.get(
+        '/static/test_middlewares.py', headers={'if-modified-since': last_modified})
+    assert res.status_code == 304
+
+    # Range requests
+    with open(__file__, 'rb') as f:
+        source = f.read()
+
+    res = await client.get('/static/test_middlewares.py', headers={'range': 'bytes=3-24'})
+    assert res.status_code == 206
+    assert res.headers['content-range'] == f"bytes 3-24/{len(source)}"
+    assert res.headers['content-length'] == '22'
+    assert await res.body() == source[3:25]
+
+    res = await client.get('/static/test_middlewares.py', headers={'range': 'bytes=-10'})
+    assert res.status_code == 206
+    assert await res.body() == source[-10:]
+
+    res = await client.get('/static/test_middlewares.py', headers={
+        'range': 'bytes=0-9', 'if-range': 'outdated'})
+    assert res.status_code == 200
+
+    res = await client.get(
+        '/static/test_middlewares.py', headers={'range': f"bytes={len(source)}-"})
+    assert res.status_code == 416
+    assert res.headers['content-range'] == f"bytes */{len(source)}"
+
+    res = await client.get('/static/test_middlewares.py', headers={'range': 'bytes=0-2,10-19'})
+    assert res.status_code == 206
+    content_type = res.headers['content-type']
+    assert content_type.startswith('multipart/byteranges; boundary=')
+    body = await res.body()
+    assert len(body) == int(res.headers['content-length'])
+    boundary = content_type.split('=')[1].encode()
+    assert body.startswith(b'--' + boundary + b'\r\n')
+    assert b'content-range: bytes 0-2/' in body
+    assert b'\r\n\r\n' + source[:3] + b'\r\n' in body
+    assert b'\r\n\r\n' + source[10:20] + b'\r\n' in body
+    assert body.endswith(b'--' + boundary + b'--\r\n')
+
+    # Overlapping and adjacent ranges are merged
+    res = await client.get('/static/test_middlewares.py', headers={'range': 'bytes=5-9,0-4,3-7'})
+    assert res.status_code == 206
+    assert res.headers['content-range'] == f"bytes 0-9/{len(source)}"
+    assert await res.body() == source[:10]
+
+    # Too many ranges
+    ranges = ','.join(f"{idx * 2}-{idx * 2}" for idx in range(17))
+    res = await client.get('/static/test_middlewares.py', headers={'range': f"bytes={ranges}"})
+    assert res.status_code == 200
+    assert await res.body() == source
+
+
+async def test_staticfiles_middleware_cache(Client, app, tmp_path):
+    import gzip
+    import os
+    from asgi_tools import StaticFilesMiddleware
+
+    style = tmp_path / 'style.css'
+    style.write_text('body { color: red; }\n' * 100)
+    image = tmp_path / 'image.png'
+    image.write_bytes(b'PNG' * 1000)
+
+    app = StaticFilesMiddleware(
+        app, folders=[str(tmp_path)], cache_size=8 * 1024, cache_check_interval=0)
+    cache = app.cache
+    assert cache is not None
+
+    client = Client(app)
+    res = await client.get('/static/style.css')
+    assert res.status_code == 200
+    assert res.headers['content-type'] == 'text/css'
+    assert await res.text() == style.read_text()
+    assert len(cache) == 1
+    assert cache.misses == 1
+    assert cache.size
+
+    res = await client.get('/static/style.css', headers={'accept-encoding': 'gzip, deflate'})
+    assert res.status_code == 200
+    assert res.headers['content-encoding'] == 'gzip'
+    assert res.headers['vary'] == 'accept-encoding'
+    body = await res.body()
+    assert len(body) == int(res.headers['content-length'])
+    assert gzip.decompress(body).decode() == style.read_text()
+    assert cache.hits == 1
+    assert cache.hit_ratio == 0.5
+
+    # Encodings are negotiated by their qualities
+    res = await client.get('/static/style.css', headers={'accept-encoding': 'br;q=0, gzip;q=0.5'})
+    assert res.headers['content-encoding'] == 'gzip'
+
+    res = await client.get('/static/style.css', headers={'accept-encoding': 'gzip;q=0'})
+    assert 'content-encoding' not in res.headers
+    assert await res.text() == style.read_text()
+
+    res = await client.get('/static/style.css', headers={'if-none-match': res.headers['etag']})
+    assert res.status_code == 304
+    assert not await res.body()
+
+    res = await client.head('/static/style.css')
+    assert res.status_code == 200
+    assert res.headers['content-length'] == str(style.stat().st_size)
+    assert not await res.body()
+
+    # Range requests are served from disk
+    res = await client.get('/static/style.css', headers={'range': 'bytes=0-3'})
+    assert res.status_code == 206
+    assert await res.text() == 'body'
+
+    # Binary files are not compressed
+    res = await client.get('/static/image.png', headers={'accept-encoding': 'gzip'})
+    assert res.status_code == 200
+    assert 'content-encoding' not in res.headers
+    assert len(cache) == 2
+
+    # Invalidate changed files
+    style.write_text('p { color: blue; }')
+    os.utime(style, (1, 1))
+    res = await client.get('/static/style.css')
+    assert await res.text() == 'p { color: blue; }'
+
+    # Evict old files
+    (tmp_path / 'big.txt').write_text('x' * 7000)
+    res = await client.get('/static/big.txt')
+    assert res.status_code == 200
+    assert cache.size <= 8 * 1024
+    assert 'image.png' not in cache.files
+    assert 'style.css' in cache.files
+
+
+async def test_staticfiles_middleware_index(Client, app, tmp_path):
+    from unittest import mock
+    from asgi_tools import StaticFilesMiddleware
+
+    (tmp_path / 'secret.txt').write_text('secret')
+    static1, static2 = tmp_path / 'static1', tmp_path / 'static2'
+    (static1 / 'css').mkdir(parents=True)
+    (static1 / 'css' / 'style.css').write_text('style1')
+    (static1 / 'link.txt').symlink_to(tmp_path / 'secret.txt')
+    static2.mkdir()
+    (static2 / 'app.js').write_text('app')
+    (static2 / 'css').mkdir()
+    (static2 / 'css' / 'style.css').write_text('style2')
+
+    app = StaticFilesMiddleware(app, folders=[str(static1), str(static2)], index=True)
+    assert sorted(app.index) == ['app.js', 'css/style.css']
+
+    client = Client(app)
+    res = await client.get('/static/css/style.css')
+    assert res.status_code == 200
+    assert await res.text() == 'style1'
+
+    res = await client.get('/static/app.js', headers={'range': 'bytes=1-'})
+    assert res.status_code == 206
+    assert await res.text() == 'pp'
+
+    res = await client.get('/static/link.txt')
+    assert res.status_code == 404
+
+    res = await client.get('/static/../secret.txt')
+    assert res.status_code == 404
+
+    (static2 / 'new.txt').write_text('new')
+    res = await client.get('/static/new.txt')
+    assert res.status_code == 404
+
+    app.reindex()
+    res = await client.get('/static/new.txt')
+    assert res.status_code == 200
+    assert await res.text() == 'new'
+
+    # Indexed files are served with the prepared headers, without filesystem calls
+    etag = res.headers['etag']
+    with mock.patch('os.stat', side_effect=AssertionError('os.stat is called')):
+        res = await client.head('/static/new.txt')
+        assert res.status_code == 200
+        assert res.headers['etag'] == etag
+        assert res.headers['content-length'] == '3'
+
+    (static2 / 'new.txt').write_text('updated')
+    app.reindex()
+    res = await client.get('/static/new.txt')
+    assert res.headers['content-length'] == '7'
+    assert await res.text() == 'updated'
+
+    (static2 / 'new.txt').unlink()
+    app.reindex()
+    res = await client.get('/static/new.txt')
+    assert res.status_code == 404
+
+
+async def test_compression_middleware(Client, aiolib):
+    import gzip
+    import zlib
+    from asgi_tools import App, CompressionMiddleware
+
+    app = App()
+    app.middleware(CompressionMiddleware.setup(minimum_size=100, executor_size=10 * 1024))
+
+    @app.route('/text')
+    async def text(request):
+        return 'text' * int(request.query.get('size', 100))
+
+    @app.route('/image')
+    async def image(request):
+        return 200, {'content-type': 'image/png'}, b'PNG' * 1000
+
+    @app.route('/tagged')
+    async def tagged(request):
+        etag = request.query.get('etag', '"tag"')
+        return 200, {'etag': etag, 'vary': 'origin'}, 'text' * 100
+
+    client = Client(app)
+    res = await client.get('/text', headers={'accept-encoding': 'gzip, deflate'})
+    assert res.status_code == 200
+    assert res.headers['content-encoding'] == 'gzip'
+    assert res.headers['vary'] == 'accept-encoding'
+    body = await res.body()
+    assert int(res.headers['content-length']) == len(body)
+    assert gzip.decompress(body) == b'text' * 100
+
+    res = await client.get('/text', headers={'accept-encoding': 'deflate, gzip;q=0.5'})
+    assert res.headers['content-encoding'] == 'deflate'
+    assert zlib.decompress(await res.body()) == b'text' * 100
+
+    try:
+        import brotli
+        res = await client.get('/text', headers={'accept-encoding': 'gzip, deflate, br'})
+        assert res.headers['content-encoding'] == 'br'
+        assert brotli.decompress(await res.body()) == b'text' * 100
+    except ImportError:
+        pass
+
+    # Use the thread pool for big bodies
+    res = await client.get('/text?size=10000', headers={'accept-encoding': 'gzip'})
+    assert gzip.decompress(await res.body()) == b'text' * 10000
+
+    # Skip small bodies
+    res = await client.get('/text?size=10', headers={'accept-encoding': 'gzip'})
+    assert 'content-encoding' not in res.headers
+    assert await res.text() == 'text' * 10
+
+    # Skip incompressible types
+    res = await client.get('/image', headers={'accept-encoding': 'gzip'})
+    assert 'content-encoding' not in res.headers
+
+    res = await client.get('/text', headers={'accept-encoding': 'identity'})
+    assert 'content-encoding' not in res.headers
+
+    # Keep the headers consistent with the compressed body
+    res = await client.get('/tagged', headers={'accept-encoding': 'gzip'})
+    assert res.headers['content-encoding'] == 'gzip'
+    assert res.headers['etag'] == 'W/"tag"'
+    assert res.headers.getall('vary') == ['origin, accept-encoding']
+    assert gzip.decompress(await res.body()) == b'text' * 100
+
+    # Unquoted tags (e.g. ResponseFile's ones) are quoted
+    res = await client.get('/tagged?etag=tag', headers={'accept-encoding': 'gzip'})
+    assert res.headers['etag'] == 'W/"tag"'
+
+
+async def test_compression_middleware_streams(Client, aiolib):
+    import gzip
+    import zlib
+    from asgi_tools import App, CompressionMiddleware, ResponseSSE, ResponseStream
+
+    app = App()
+    app.middleware(CompressionMiddleware.setup(minimum_size=100))
+
+    @app.route('/stream')
+    async def stream(request):
+
+        async def content():
+            for _ in range(10):
+                yield 'chunk' * 10
+
+        return ResponseStream(content(), content_type='text/plain')
+
+    @app.route('/sse')
+    async def sse(request):
+
+        async def events():
+            for num in range(3):
+                yield {'data': num}
+
+        return ResponseSSE(events())
+
+    client = Client(app)
+    res = await client.get('/stream', headers={'accept-encoding': 'gzip'})
+    assert res.headers['content-encoding'] == 'gzip'
+    assert 'content-length' not in res.headers
+    assert gzip.decompress(await res.body()) == b'chunk' * 100
+
+    # SSE events are flushed
+    res = await client.get('/sse', headers={'accept-encoding': 'gzip'})
+    assert res.headers['content-encoding'] == 'gzip'
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    events = [decompressor.decompress(chunk) async for chunk in res.stream()]
+    assert events[:3] == [b'data: 0\n\n', b'data: 1\n\n', b'data: 2\n\n']
+
+
+def test_compression_negotiate():
+    from asgi_tools.middleware import negotiate_encoding
+
+    encodings = ['br', 'gzip', 'deflate']
+    assert negotiate_encoding('gzip, deflate, br', encodings) == 'br'
+    assert negotiate_encoding('gzip, deflate, br;q=0', encodings) == 'gzip'
+    assert negotiate_encoding('*', encodings) == 'br'
+    assert negotiate_encoding('*;q=0, deflate', encodings) == 'deflate'
+    assert negotiate_encoding('identity', encodings) is None
+
+
+def test_compression_types():
+    from asgi_tools.middleware import is_compressible
+
+    assert is_compressible('text/html; charset=utf-8')
+    assert is_compressible('application/json')
+    assert is_compressible('image/svg+xml')
+    assert not is_compressible('image/png')
+    assert not is_compressible('application/octet-stream')
+    assert not is_compressible('application/x-custom')
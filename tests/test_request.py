@@ -80,6 +80,21 @@ async def test_multipart(Client):
     assert res.headers['content-length'] == str(len('"""Test Request."""'))
 
 
+async def test_query(GenRequest):
+    req = GenRequest(query={'page': '2', 'q': 'hello world'})
+    assert req.query['page'] == '2'
+    assert req.query['q'] == 'hello world'
+    assert req._url is None
+
+    req = GenRequest('/', query_string=b'a=1&a=2&b&c=%E2%9C%93+x')
+    assert req.query.getall('a') == ['1', '2']
+    assert req.query['b'] == ''
+    assert req.query['c'] == '\u2713 x'
+    assert list(req.query.items()) == list(req.url.query.items())
+
+    assert GenRequest('/', query_string=b'').query == {}
+
+
 async def test_media(GenRequest):
     req = GenRequest()
     assert req.media
@@ -106,6 +121,28 @@ async def test_json(GenRequest):
     assert json == {'test': 42}
 
 
+async def test_json_stream(GenRequest):
+    from asgi_tools import ASGIDecodeError, ResponseError
+
+    req = GenRequest(body=[b'{"id": 1}\n{"id"', b': 2}\n\n{"id": 3}\n{"i', b'd": 4}'])
+    records = [record async for record in req.json_stream()]
+    assert records == [{'id': 1}, {'id': 2}, {'id': 3}, {'id': 4}]
+
+    req = GenRequest(body=[b'{"id": 1}\n', b'invalid\n'])
+    with pytest.raises(ASGIDecodeError):
+        [record async for record in req.json_stream()]
+
+    req = GenRequest(body=[b'{"id": 1}\n', b'{"id": 2}\n', b'{"id": 3}\n'])
+    with pytest.raises(ResponseError) as exc:
+        [record async for record in req.json_stream(max_size=20)]
+    assert exc.value.status_code == 413
+
+    req = GenRequest(body=[b'{"id": 1}\n'], headers={'content-length': '1000'})
+    with pytest.raises(ResponseError) as exc:
+        [record async for record in req.json_stream(max_size=20)]
+    assert exc.value.status_code == 413
+
+
 async def test_data(Client, GenRequest):
     from asgi_tools import ResponseMiddleware, Request
 
@@ -142,3 +179,65 @@ async def test_data(Client, GenRequest):
 
     with pytest.raises(ValueError):
         await req.data(True)
+
+
+async def test_get_header(GenRequest):
+    req = GenRequest(headers={'content-type': 'application/json', 'x-custom': 'value'})
+    assert req.get_header(b'content-type') == 'application/json'
+    assert req.get_header('X-Custom') == 'value'
+    assert req.get_header(b'unknown') is None
+    assert req.get_header(b'unknown', 'default') == 'default'
+    assert req.content_type == 'application/json'
+    assert req._headers is None
+
+
+async def test_max_body_size(GenRequest):
+    from asgi_tools import ResponseError
+
+    req = GenRequest(body=[b'0123456789', b'ABCDEF'])
+    req.max_body_size = 10
+    with pytest.raises(ResponseError) as exc:
+        await req.body()
+    assert exc.value.status_code == 413
+
+    req = GenRequest(body=[b'0123456789'], headers={'content-length': '100'})
+    req.max_body_size = 10
+    with pytest.raises(ResponseError) as exc:
+        await req.body()
+    assert exc.value.status_code == 413
+    assert not req._is_read
+
+    # The smallest limit wins
+    req = GenRequest(body=[b'0123456789', b'ABCDEF'])
+    req.max_body_size = 100
+    with pytest.raises(ResponseError) as exc:
+        await req.form(max_size=10)
+    assert exc.value.status_code == 413
+
+    req = GenRequest(body=[b'0123456789', b'ABCDEF'])
+    req.max_body_size = 100
+    assert await req.body() == b'0123456789ABCDEF'
+
+
+async def test_body_view(GenRequest):
+    chunks = [b'0123456789', b'ABCDEF', b'', b'abcdef']
+
+    req = GenRequest(body=chunks)
+    view = await req.body_view()
+    assert isinstance(view, memoryview)
+    assert view == b'0123456789ABCDEFabcdef'
+
+    body = await req.body()
+    assert isinstance(body, bytes)
+    assert body == b'0123456789ABCDEFabcdef'
+
+    # A single chunk isn't copied
+    chunk = b'0123456789'
+    req = GenRequest(body=[chunk])
+    view = await req.body_view()
+    assert view.obj is chunk
+    assert await req.body() is chunk
+
+    req = GenRequest(body=[b'{"test": ', b'42}'])
+    assert await req.json() == {'test': 42}
+    assert await req.text() == '{"test": 42}'
@@ -37,6 +37,74 @@ async def test_response():
     ]
 
 
+async def test_response_layout():
+    from asgi_tools import Response, ResponseText, ResponseError, ResponseRedirect
+
+    response = ResponseText('Content')
+    assert not hasattr(response, '__dict__')
+    assert response._cookies is None
+    assert response.msg_start()['headers'] == [(b'content-type', b'text/plain; charset=utf-8')]
+    assert response._cookies is None
+
+    class Created(ResponseText):
+        status_code = 201
+
+    assert Created('Content').status_code == 201
+    assert Created('Content', status_code=202).status_code == 202
+
+    class Accepted(ResponseText):
+        __slots__ = ()
+        status_code = 202
+
+    response = Accepted('Content')
+    assert not hasattr(response, '__dict__')
+    assert response.status_code == 202
+    response.status_code = 200
+    assert response.status_code == 200
+
+    # Classes give their default status codes
+    assert Response.status_code == 200
+    assert Accepted.status_code == 202
+    assert ResponseRedirect.status_code == 307
+    assert ResponseError.status_code == 500
+
+    assert isinstance(ResponseError.NOT_FOUND(), Response)
+    assert issubclass(ResponseRedirect, Response)
+
+
+async def test_response_headers():
+    from asgi_tools import Response, ResponseJSON
+
+    assert ResponseJSON._content_type_header == b'application/json'
+
+    response = ResponseJSON({}, headers={'x-custom': 'value'})
+    messages = await read_response(response)
+    assert response._headers is None
+    assert messages[0]['headers'] == [
+        (b'x-custom', b'value'), (b'content-type', b'application/json'),
+        (b'content-length', b'2')]
+
+    response = Response('OK', headers={'Content-Type': 'text/plain'}, content_type='text/html')
+    assert response.headers == {'Content-Type': 'text/plain'}
+    assert response._raw_headers is None
+
+    response.headers['x-custom'] = 'value'
+    messages = await read_response(response)
+    assert messages[0]['headers'] == [
+        (b'Content-Type', b'text/plain'), (b'x-custom', b'value'), (b'content-length', b'2')]
+
+    # Header names are case-insensitive on both paths
+    response = Response('OK', headers={'Content-Type': 'text/plain'})
+    response.headers['X-Custom'] = 'value'
+    response._set_header('content-type', 'text/html', replace=False)
+    response._set_header('x-custom', 'other')
+    assert response.headers == {'Content-Type': 'text/plain', 'x-custom': 'other'}
+
+    response = Response('OK', headers={'Content-Type': 'text/plain'})
+    response._set_header('content-type', 'text/html')
+    assert response._raw_headers == [(b'content-type', b'text/html')]
+
+
 async def test_html_response():
     from asgi_tools import ResponseHTML
 
@@ -70,6 +138,7 @@ async def test_text_response():
 
 
 async def test_json_response():
+    import json
     from asgi_tools import ResponseJSON
 
     response = ResponseJSON([1, 2, 3])
@@ -92,6 +161,35 @@ async def test_json_response():
             'headers': [(b'content-type', b'application/json'), (b'content-length', b'4')]
         }, {'type': 'http.response.body', 'body': b'null'}]
 
+    # Serialize big lists by batches
+    data = [{'id': idx} for idx in range(25)]
+    response = ResponseJSON(data)
+    response.batch_size = 10
+    messages = await read_response(response)
+    assert json.loads(messages[1]['body']) == data
+
+    # Streaming
+    response = ResponseJSON(data, stream=True, headers={'x-custom': 'value'})
+    response.batch_size = 10
+    messages = await read_response(response)
+    assert messages[0]['headers'] == [
+        (b'x-custom', b'value'), (b'content-type', b'application/json')]
+    assert len(messages) == 6
+    assert json.loads(b''.join(msg['body'] for msg in messages[1:])) == data
+
+    async def rows():
+        for idx in range(25):
+            yield {'id': idx}
+
+    response = ResponseJSON(rows(), stream=True)
+    response.batch_size = 10
+    messages = await read_response(response)
+    assert json.loads(b''.join(msg['body'] for msg in messages[1:])) == data
+
+    response = ResponseJSON([], stream=True)
+    messages = await read_response(response)
+    assert b''.join(msg['body'] for msg in messages[1:]) == b'[]'
+
 
 async def test_redirect_response():
     from asgi_tools import ResponseRedirect
@@ -148,6 +246,142 @@ async def test_stream_response(Client):
     assert await res.text() == '0123456789'
 
 
+async def test_stream_response_disconnect():
+    from asgi_tools import ResponseSSE
+    from asgi_tools._compat import aio_sleep, aio_wait
+    from asgi_tools.utils import to_awaitable
+
+    state = {'sent': 0, 'closed': False}
+
+    async def events():
+        try:
+            while True:
+                await aio_sleep(.001)
+                state['sent'] += 1
+                yield {'data': state['sent']}
+        finally:
+            state['closed'] = True
+
+    async def receive():
+        await aio_sleep(.02)
+        return {'type': 'http.disconnect'}
+
+    messages = []
+    response = ResponseSSE(events())
+
+    # Run the response in a regular task
+    await aio_wait(response(None, receive, to_awaitable(messages.append)))
+    assert state['closed']
+    assert state['sent']
+    assert messages[0]['type'] == 'http.response.start'
+    assert len(messages) <= state['sent'] + 1
+
+
+async def test_stream_response_buffered():
+    from functools import partial
+    from asgi_tools import ResponseStream
+    from asgi_tools._compat import aio_sleep
+
+    async def filler(num=100, chunk='0123456789'):
+        for _ in range(num):
+            yield chunk
+
+    def bodies(messages):
+        return [msg['body'] for msg in messages[1:-1]]
+
+    # Coalesce by size
+    response = ResponseStream(filler(), buffer_size=100)
+    messages = await read_response(response)
+    assert bodies(messages) == [b'0123456789' * 10] * 10
+    assert messages[-1] == {'body': b'', 'type': 'http.response.body'}
+
+    # Big chunks are sent as is
+    response = ResponseStream(filler(3, 'x' * 150), buffer_size=100)
+    messages = await read_response(response)
+    assert bodies(messages) == [b'x' * 150] * 3
+
+    response = ResponseStream(filler(15), buffer_size=100, queue_size=4)
+    messages = await read_response(response)
+    assert bodies(messages) == [b'0123456789' * 10, b'0123456789' * 5]
+
+    # Slow clients block the generator
+    produced = []
+
+    async def counter():
+        for idx in range(20):
+            produced.append(idx)
+            yield idx
+
+    async def slow_send(messages, msg):
+        await aio_sleep(.001)
+        if msg['type'] == 'http.response.body' and msg['body']:
+            assert len(produced) - len(messages) <= 4
+        messages.append(msg)
+
+    messages = []
+    response = ResponseStream(counter(), queue_size=2)
+    await response(None, partial(aio_sleep, 10), partial(slow_send, messages))
+    assert len(produced) == 20
+    assert len(bodies(messages)) == 20
+
+    # Errors are raised from the generator
+    async def broken():
+        yield 'chunk'
+        raise ValueError('broken')
+
+    response = ResponseStream(broken(), queue_size=2)
+    with pytest.raises(ValueError):
+        await read_response(response)
+
+
+async def test_stream_response_flush():
+    from asgi_tools import ResponseStream
+    from asgi_tools._compat import aio_sleep
+
+    def bodies(messages):
+        return [msg['body'] for msg in messages[1:-1]]
+
+    # Coalesce by time
+    async def slow_filler():
+        yield 'first'
+        yield 'second'
+        await aio_sleep(.05)
+        yield 'third'
+
+    response = ResponseStream(slow_filler(), buffer_size=100, flush_interval=.01, queue_size=4)
+    messages = await read_response(response)
+    assert bodies(messages) == [b'firstsecond', b'third']
+
+    response = ResponseStream(slow_filler(), buffer_size=100, queue_size=4)
+    messages = await read_response(response)
+    assert bodies(messages) == [b'firstsecondthird']
+
+    # Without a queue the interval is checked when the next chunk arrives
+    async def late_filler():
+        yield 'first'
+        await aio_sleep(.05)
+        yield 'second'
+        yield 'third'
+
+    response = ResponseStream(late_filler(), buffer_size=100, flush_interval=.01)
+    messages = await read_response(response)
+    assert bodies(messages) == [b'firstsecond', b'third']
+
+    response = ResponseStream(late_filler(), buffer_size=100, flush_interval=.01, queue_size=4)
+    messages = await read_response(response)
+    assert bodies(messages) == [b'first', b'secondthird']
+
+    # Empty chunks flush the buffer
+    async def flushing_filler():
+        yield 'first'
+        yield ''
+        yield 'second'
+
+    response = ResponseStream(flushing_filler(), buffer_size=100)
+    messages = await read_response(response)
+    assert bodies(messages) == [b'first', b'second']
+
+
 async def test_sse_response(Client):
     from asgi_tools import ResponseSSE
     from asgi_tools._compat import aio_sleep
@@ -196,6 +430,34 @@ async def test_file_response():
     messages = await read_response(response)
     assert len(messages) == 2
 
+    # Prepared responses are cloned with their headers
+    prepared = ResponseFile(__file__)
+    response = prepared.clone(headers_only=True)
+    response.headers['x-custom'] = 'value'
+    assert response.etag == prepared.etag
+    assert 'x-custom' not in prepared.headers
+    assert len(await read_response(response)) == 2
+
+    response = ResponseFile(__file__)
+    messages = await read_response(response, {'extensions': {'http.response.pathsend': {}}})
+    assert len(messages) == 2
+    assert messages[1] == {'type': 'http.response.pathsend', 'path': __file__}
+
+    response = ResponseFile(__file__)
+    messages = await read_response(response, {'extensions': {'http.response.zerocopysend': {}}})
+    assert len(messages) == 2
+    assert messages[1]['type'] == 'http.response.zerocopysend'
+    assert messages[1]['file'].name == __file__
+
+    response = ResponseFile(__file__)
+    messages = await read_response(response, {
+        'method': 'GET', 'headers': [(b'range', b'bytes=10-19')],
+        'extensions': {'http.response.zerocopysend': {}}})
+    assert messages[0]['status'] == 206
+    assert messages[1]['type'] == 'http.response.zerocopysend'
+    assert messages[1]['offset'] == 10
+    assert messages[1]['count'] == 10
+
     with pytest.raises(ASGIError):
         response = ResponseFile('unknown')
 
@@ -236,6 +498,97 @@ async def test_websocket_response(Client):
             await ws.receive()
 
 
+async def test_websocket_response_many(Client):
+    from asgi_tools import ResponseWebSocket, ASGIConnectionClosed
+    from asgi_tools._compat import aio_sleep
+    import json
+
+    received = []
+
+    async def prices():
+        for price in range(5):
+            yield {'price': price}
+            if price == 2:
+                await aio_sleep(.05)
+
+    async def app(scope, receive, send):
+        async with ResponseWebSocket(scope, receive, send) as ws:
+            async for msg in ws:
+                received.append(msg)
+                if msg == 'stop':
+                    break
+
+            await ws.send_many(['text', b'bytes', {'type': 'websocket.send', 'text': 'raw'}])
+            await ws.send_json_many([1, 2])
+            await ws.send_json_many(prices(), window=.02)
+
+    async with Client(app).websocket('/') as ws:
+        await ws.send('ping')
+        await ws.send(b'pong')
+        await ws.send('stop')
+        assert [await ws.receive() for _ in range(5)] == ['text', 'bytes', 'raw', '1', '2']
+        assert json.loads(await ws.receive()) == [{'price': 0}, {'price': 1}, {'price': 2}]
+        assert json.loads(await ws.receive()) == [{'price': 3}, {'price': 4}]
+        with pytest.raises(ASGIConnectionClosed):
+            await ws.receive()
+
+    assert received == ['ping', 'pong', 'stop']
+
+    async def echo(scope, receive, send):
+        ws = ResponseWebSocket(scope, receive, send)
+        await ws.accept()
+        messages = [msg async for msg in ws]
+        assert messages == ['ping']
+        assert not ws.connected
+        with pytest.raises(ASGIConnectionClosed):
+            await ws.receive()
+
+        await ws.close()
+        with pytest.raises(ASGIConnectionClosed):
+            await ws.send_many(['pong'])
+
+    async with Client(echo).websocket('/') as ws:
+        await ws.send('ping')
+
+
+@pytest.mark.parametrize('aiolib', [
+    ('asyncio', {'use_uvloop': False}),
+    pytest.param(('asyncio', {'use_uvloop': True}), id='uvloop'),
+])
+async def test_websocket_json_batches(aiolib):
+    import asyncio
+    import json
+    from unittest import mock
+    from asgi_tools import ResponseWebSocket
+    from asgi_tools._compat import aio_timeout
+
+    sent = []
+
+    async def send(msg):
+        sent.append(msg)
+
+    async def items():
+        for idx in range(50):
+            yield idx
+            if idx % 10 == 9:
+                await asyncio.sleep(.05)
+
+    ws = ResponseWebSocket({'type': 'websocket'}, asyncio.sleep, send)
+
+    async def check():
+        with mock.patch('asyncio.wait_for', side_effect=AssertionError('A task is spawned')), \
+                mock.patch('asgi_tools.response.aio_timeout', wraps=aio_timeout) as timeout:
+            await ws.send_json_batches(items(), .02)
+
+        # A single timeout per batch
+        assert timeout.call_count == 5
+
+    # Run the checks in a regular task
+    await asyncio.create_task(check())
+    assert [json.loads(msg['bytes']) for msg in sent] == [
+        list(range(idx, idx + 10)) for idx in range(0, 50, 10)]
+
+
 async def test_parse_response():
     from asgi_tools import parse_response
 
@@ -258,11 +611,11 @@ async def test_parse_response():
         parse_response((None, 'SERVER ERROR'))
 
 
-async def read_response(response):
+async def read_response(response, scope=None):
     from functools import partial
     from asgi_tools._compat import aio_sleep
     from asgi_tools.utils import to_awaitable
 
     messages = []
-    await response(None, partial(aio_sleep, 10), to_awaitable(messages.append))
+    await response(scope, partial(aio_sleep, 10), to_awaitable(messages.append))
     return messages
@@ -0,0 +1,185 @@
+"""Test Gunicorn Worker."""
+
+import pytest
+
+
+pytest.importorskip('gunicorn')
+
+
+@pytest.fixture
+def aiolib():
+    return ('asyncio', {'use_uvloop': False})
+
+
+async def run(app, Transport, *chunks, wait=lambda transport: transport.closed):
+    from asgi_tools._compat import aio_sleep
+    from asgi_tools.worker import HTTPProtocol
+
+    transport = Transport()
+    protocol = HTTPProtocol(app, keepalive=1e-2)
+    protocol.connection_made(transport)
+    for chunk in chunks:
+        protocol.data_received(chunk)
+        await aio_sleep(0)
+
+    for _ in range(100):
+        if wait(transport):
+            break
+        await aio_sleep(1e-3)
+
+    return transport
+
+
+async def test_protocol(app, Transport):
+
+    @app.route('/echo', methods='POST')
+    async def echo(request):
+        return await request.body()
+
+    transport = await run(app, Transport, b'GET / HTTP/1.1\r\nHost: localhost\r\n\r\n')
+    assert transport.data.startswith(b'HTTP/1.1 200 OK\r\n')
+    assert b'content-length: 2\r\n' in transport.data
+    assert transport.data.endswith(b'\r\n\r\nOK')
+
+    # Pipelining
+    transport = await run(
+        app, Transport,
+        b'GET / HTTP/1.1\r\n\r\n' * 2 + b'GET /unknown HTTP/1.1\r\nConnection: close\r\n\r\n')
+    assert transport.data.count(b'HTTP/1.1 200 OK\r\n') == 2
+    assert transport.data.count(b'HTTP/1.1 404 Not Found\r\n') == 1
+    assert transport.data.endswith(b'Nothing matches the given URI')
+    assert transport.closed
+
+    # Request bodies
+    transport = await run(
+        app, Transport,
+        b'POST /echo HTTP/1.1\r\nContent-Length: 10\r\n\r\n01234', b'56789',
+        b'POST /echo HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n3\r\nabc\r\n',
+        b'2\r\nde\r\n0\r\n\r\n',
+        wait=lambda transport: transport.data.count(b'HTTP/1.1 200') == 2)
+    assert transport.data.count(b'HTTP/1.1 200 OK\r\n') == 2
+    assert b'\r\n\r\n0123456789HTTP/1.1 200 OK' in transport.data
+    assert transport.data.endswith(b'\r\n\r\nabcde')
+
+    # HTTP/1.0
+    transport = await run(app, Transport, b'GET / HTTP/1.0\r\n\r\n')
+    assert b'connection: close\r\n' in transport.data
+    assert transport.closed
+
+    # Invalid requests
+    transport = await run(app, Transport, b'GET /\r\n\r\n')
+    assert transport.data.startswith(b'HTTP/1.1 400 Bad Request\r\n')
+    assert transport.closed
+
+
+@pytest.mark.parametrize('head', [
+    b'Content-Length: +5',
+    b'Content-Length: 1_0',
+    b'Content-Length: 0x10',
+    b'Content-Length: 5\r\nContent-Length: 5',
+    b'Content-Length: 5\r\nContent-Length: 6',
+    b'Content-Length: 5\r\nTransfer-Encoding: chunked',
+    b'Transfer-Encoding: chunked, gzip',
+    b'Transfer-Encoding: identity',
+])
+async def test_protocol_framing(app, Transport, head):
+    transport = await run(app, Transport, b'POST / HTTP/1.1\r\n' + head + b'\r\n\r\nhello')
+    assert transport.data.startswith(b'HTTP/1.1 400 Bad Request\r\n')
+    assert transport.closed
+
+
+@pytest.mark.parametrize('size', [b'0x3', b'+3', b'3_0'])
+async def test_protocol_chunk_size(app, Transport, size):
+    transport = await run(
+        app, Transport,
+        b'POST / HTTP/1.1\r\nTransfer-Encoding: gzip, chunked\r\n\r\n' + size + b'\r\nabc\r\n')
+    assert transport.data.startswith(b'HTTP/1.1 400 Bad Request\r\n')
+    assert transport.closed
+
+
+async def test_protocol_stream(Transport):
+    from asgi_tools import ResponseStream
+
+    async def numbers():
+        for num in range(3):
+            yield num
+
+    async def app(scope, receive, send):
+        await ResponseStream(numbers())(scope, receive, send)
+
+    transport = await run(
+        app, Transport, b'GET / HTTP/1.1\r\n\r\n',
+        wait=lambda transport: transport.data.endswith(b'0\r\n\r\n'))
+    assert b'transfer-encoding: chunked\r\n' in transport.data
+    assert transport.data.endswith(b'1\r\n0\r\n1\r\n1\r\n1\r\n2\r\n0\r\n\r\n')
+
+    transport = await run(
+        app, Transport, b'HEAD / HTTP/1.1\r\n\r\n',
+        wait=lambda transport: transport.data.endswith(b'\r\n\r\n'))
+    assert b'transfer-encoding' not in transport.data
+
+
+@pytest.mark.parametrize('aiolib', [
+    ('asyncio', {'use_uvloop': False}),
+    pytest.param(('asyncio', {'use_uvloop': True}), id='uvloop'),
+])
+async def test_protocol_sendfile(Transport, aiolib):
+    import asyncio
+    from pathlib import Path
+    from asgi_tools import ResponseFile
+    from asgi_tools.worker import HTTPProtocol
+
+    async def app(scope, receive, send):
+        assert 'http.response.pathsend' in scope['extensions']
+        await ResponseFile(__file__)(scope, receive, send)
+
+    source = Path(__file__).read_bytes()
+
+    # The transport doesn't support sendfile
+    transport = await run(
+        app, Transport, b'GET / HTTP/1.1\r\n\r\n',
+        wait=lambda transport: transport.data.endswith(source))
+    assert transport.data.endswith(b'\r\n\r\n' + source)
+
+    # Real sockets (uvloop doesn't support sendfile, the file is read in a thread)
+    loop = asyncio.get_event_loop()
+    assert ('uvloop' in type(loop).__module__) == aiolib[1]['use_uvloop']
+    server = await loop.create_server(lambda: HTTPProtocol(app), '127.0.0.1', 0)
+    reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname())
+    writer.write(b'GET / HTTP/1.1\r\nConnection: close\r\n\r\n')
+    data = await reader.read()
+    writer.close()
+    server.close()
+    await server.wait_closed()
+    assert data.startswith(b'HTTP/1.1 200 OK\r\n')
+    assert data.endswith(b'\r\n\r\n' + source)
+
+
+async def test_protocol_errors(Transport):
+
+    async def app(scope, receive, send):
+        raise RuntimeError('Unhandled')
+
+    transport = await run(app, Transport, b'GET / HTTP/1.1\r\n\r\n')
+    assert transport.data.startswith(b'HTTP/1.1 500 Internal Server Error\r\n')
+    assert transport.closed
+
+
+async def test_lifespan(app):
+    from asgi_tools.worker import Lifespan
+
+    SIDE_EFFECTS = {}
+
+    @app.on_startup
+    def start():
+        SIDE_EFFECTS['started'] = True
+
+    @app.on_shutdown
+    def finish():
+        SIDE_EFFECTS['finished'] = True
+
+    lifespan = Lifespan(app)
+    assert await lifespan.startup()
+    assert SIDE_EFFECTS == {'started': True}
+    assert await lifespan.shutdown()
+    assert SIDE_EFFECTS == {'started': True, 'finished': True}